@@ -0,0 +1,254 @@
+"""
+Assignment bangunan ke tempat evakuasi dengan batas kapasitas
+Kapasitas diambil dari kolom col_* tempatevakuasinew.geojson (angka di dalam teks,
+mis. "500 orang", "1.200 jiwa"). Penduduk bangunan diagregasi per node jalan, lalu
+dialokasikan ke k tempat evakuasi terdekat (jarak jaringan) sebagai transportation
+problem min-cost (scipy linprog / HiGHS), dengan biaya waktu tempuh (default) atau panjang
+jalan (--weight length). Demand yang tidak tertampung tercatat
+sebagai unassigned, bukan dipaksa ke tempat evakuasi yang sudah penuh.
+
+Contoh:
+  python src/assign_shelters.py --persons 4 --k 10
+  python src/assign_shelters.py --capacity-col col_5 --unassigned-cost 50000
+  python src/assign_shelters.py --weight length --raw-graph
+"""
+
+import re
+import argparse
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import shapely
+from scipy.optimize import linprog
+from scipy.sparse import csr_matrix, hstack, identity
+from scipy.sparse.csgraph import dijkstra
+
+from building_metrics import to_utm
+from building_schema import load_buildings
+from routing import load_road_csr, to_csgraph
+from instrument import span, event
+from region import REGION
+
+PERSONS_PER_BUILDING = 4
+K_NEAREST = 10
+SHELTER_CHUNK = 32
+UNASSIGNED_COST = 100_000  # biaya per bangunan tanpa tempat (lebih mahal dari jarak/waktu mana pun)
+
+ASSIGNMENT_PATH = REGION.path("shelter_assignment.csv")
+LOAD_PATH = REGION.path("shelter_load.csv")
+
+# angka di awal teks, boleh diawali "±", "~", "sekitar", "kurang lebih"
+NUMBER_RE = re.compile(r"^\s*(?:±|~|\+/-|sekitar|kurang lebih|kl\.?)?\s*(\d+(?:[.,]\d{3})*(?:[.,]\d+)?)",
+                       re.IGNORECASE)
+
+
+def parse_capacity(value):
+    # "1.200 jiwa" -> 1200, "± 300-500 orang" -> 300 (batas bawah), "tidak ada" -> NaN
+    if pd.isna(value):
+        return np.nan
+    if isinstance(value, (int, float, np.number)):
+        return float(value)
+    m = NUMBER_RE.search(str(value))
+    if not m:
+        return np.nan
+    num = m.group(1)
+    if re.fullmatch(r"\d{1,3}([.,]\d{3})+", num):
+        num = re.sub(r"[.,]", "", num)  # pemisah ribuan
+    try:
+        return float(num.replace(",", "."))
+    except ValueError:
+        return np.nan
+
+
+def detect_capacity_column(evac, exclude=("col_0", "col_3", "col_4")):
+    # kolom col_* dengan proporsi angka bulat positif tertinggi (bukan nomor urut / koordinat)
+    best, best_score = None, 0.0
+    for col in evac.columns:
+        if not str(col).startswith("col_") or col in exclude:
+            continue
+        vals = evac[col].map(parse_capacity)
+        ok = vals.dropna()
+        if len(ok) < max(3, 0.5 * len(evac)):
+            continue
+        if ok.is_monotonic_increasing and ok.is_unique:
+            continue
+        score = len(ok) / len(evac) * ((ok > 0) & (ok == ok.round())).mean()
+        if score > best_score:
+            best, best_score = col, score
+    return best
+
+
+def shelter_capacity(evac, column=None):
+    column = column or detect_capacity_column(evac)
+    if column is None:
+        raise ValueError("Kolom kapasitas tidak terdeteksi, gunakan --capacity-col")
+    cap = evac[column].map(parse_capacity).to_numpy(dtype=float, copy=True)
+    missing = ~np.isfinite(cap) | (cap <= 0)
+    fill = np.nanmedian(cap[~missing]) if (~missing).any() else 0.0
+    cap[missing] = fill
+    return cap, column, int(missing.sum()), fill
+
+
+def shelter_distances(csr, shelter_nodes, demand_nodes, weight=None, chunk=SHELTER_CHUNK):
+    # matrix jarak jaringan (shelter x demand node) dari node demand menuju shelter;
+    # weight = array bobot per edge (mis. csr.travel_time), None = csr.weight (panjang)
+    graph = to_csgraph(csr, weight, reverse=True)
+    out = np.empty((len(shelter_nodes), len(demand_nodes)), dtype=np.float32)
+    for i in range(0, len(shelter_nodes), chunk):
+        d = dijkstra(graph, directed=True, indices=shelter_nodes[i:i + chunk])
+        out[i:i + chunk] = d[:, demand_nodes]
+    return out
+
+
+def candidate_pairs(dist, k=K_NEAREST):
+    # k shelter terdekat yang terjangkau per demand node -> (demand, shelter, biaya)
+    k = min(k, dist.shape[0])
+    nearest = np.argpartition(dist, k - 1, axis=0)[:k] if k < dist.shape[0] else \
+        np.broadcast_to(np.arange(dist.shape[0])[:, None], dist.shape)
+    demand = np.broadcast_to(np.arange(dist.shape[1]), nearest.shape).ravel()
+    shelter = nearest.ravel()
+    cost = dist[shelter, demand].astype(float)
+    ok = np.isfinite(cost)
+    return demand[ok], shelter[ok], cost[ok]
+
+
+def solve_assignment(demand, capacity, pair_d, pair_s, pair_cost, unassigned_cost=UNASSIGNED_COST):
+    # min sum(cost * x) + unassigned_cost * u
+    # s.t. sum_j x_ij + u_i = demand_i ; sum_i x_ij <= capacity_j ; x, u >= 0
+    n_d, n_s, n_p = len(demand), len(capacity), len(pair_d)
+    ones = np.ones(n_p)
+    A_eq = hstack([csr_matrix((ones, (pair_d, np.arange(n_p))), shape=(n_d, n_p)),
+                   identity(n_d, format="csr")]).tocsr()
+    A_ub = hstack([csr_matrix((ones, (pair_s, np.arange(n_p))), shape=(n_s, n_p)),
+                   csr_matrix((n_s, n_d))]).tocsr()
+    c = np.concatenate([pair_cost, np.full(n_d, float(unassigned_cost))])
+    res = linprog(c, A_ub=A_ub, b_ub=capacity, A_eq=A_eq, b_eq=demand,
+                  bounds=(0, None), method="highs")
+    if res.status != 0:
+        raise RuntimeError(f"linprog gagal: {res.message}")
+    # transportation problem dengan data bulat: solusi vertex bulat, round membersihkan noise numerik
+    flow = np.round(res.x[:n_p])
+    unassigned = np.round(res.x[n_p:])
+    return flow, unassigned, res
+
+
+def _group_cumsum(keys, values):
+    # cumsum yang reset di setiap key (keys sudah terurut)
+    total = np.cumsum(values)
+    first = np.r_[True, keys[1:] != keys[:-1]]
+    base = np.maximum.accumulate(np.where(first, total - values, 0))
+    return total - base
+
+
+def split_to_buildings(b_demand_idx, flow, pair_d, pair_s):
+    # flow dalam satuan bangunan: bangunan ke-r di node d mendapat shelter dengan kuota ke-r
+    order = np.argsort(b_demand_idx, kind="stable")
+    b_sorted = b_demand_idx[order]
+    rank = _group_cumsum(b_sorted, np.ones(len(b_sorted), dtype=np.int64)) - 1
+
+    used = flow > 0
+    f_order = np.lexsort((pair_s[used], pair_d[used]))
+    fd, fs, fq = pair_d[used][f_order], pair_s[used][f_order], flow[used][f_order].astype(np.int64)
+    f_end = _group_cumsum(fd, fq)
+    # cari kuota di node yang sama: key (node, rank) vs (node, batas akhir kuota)
+    big = int(max(rank.max(initial=0), f_end.max(initial=0))) + 1
+    j = np.searchsorted(fd * big + f_end, b_sorted * big + rank, side="right")
+    ok = j < len(fd)
+    ok[ok] = fd[j[ok]] == b_sorted[ok]
+    shelter = np.full(len(b_sorted), -1, dtype=np.int64)
+    shelter[ok] = fs[j[ok]]
+    out = np.empty_like(shelter)
+    out[order] = shelter
+    return out
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Assignment bangunan ke tempat evakuasi (kapasitas)")
+    parser.add_argument("--persons", type=float, default=PERSONS_PER_BUILDING,
+                        help="jumlah penduduk per bangunan")
+    parser.add_argument("--k", type=int, default=K_NEAREST, help="kandidat shelter terdekat per node")
+    parser.add_argument("--capacity-col", help="kolom kapasitas (default: deteksi otomatis)")
+    parser.add_argument("--unassigned-cost", type=float, default=UNASSIGNED_COST)
+    parser.add_argument("--weight", choices=["travel_time", "length"], default="travel_time",
+                        help="biaya assignment: waktu tempuh (detik) atau panjang jalan (meter)")
+    parser.add_argument("--raw-graph", action="store_true",
+                        help="pakai road.graphml mentah, bukan graph turunan road_graph.py")
+    args = parser.parse_args()
+
+    with span("load"):
+        csr = load_road_csr(REGION.path("road.graphml"), derived=not args.raw_graph)
+        evac = gpd.read_file(REGION.path("tempatevakuasinew.geojson"))
+        building = load_buildings(REGION.path("building.geojson"), columns=["element", "id"])
+    weight = csr.travel_time if args.weight == "travel_time" else csr.weight
+    if weight is None:
+        event("❌ road.graphml mentah tidak punya travel_time: pakai graph turunan atau --weight length")
+        raise SystemExit(1)
+
+    capacity, cap_col, n_missing, fill = shelter_capacity(evac, args.capacity_col)
+    event(f"🏫 {len(evac)} tempat evakuasi, kapasitas dari {cap_col} "
+          f"(total {capacity.sum():,.0f} orang, {n_missing} kosong diisi median {fill:,.0f})")
+
+    with span("demand", rows=len(building)):
+        evac_utm = to_utm(np.asarray(evac.geometry.values), evac.crs or "EPSG:4326")
+        b_utm = to_utm(shapely.centroid(np.asarray(building.geometry.values)), building.crs or "EPSG:4326")
+        shelter_nodes, _ = csr.snap(evac_utm)
+        b_node, b_snap = csr.snap(b_utm)
+        demand_nodes, b_demand_idx = np.unique(b_node, return_inverse=True)
+        # LP dalam satuan bangunan agar aliran bisa dibagi utuh ke bangunan
+        demand = np.bincount(b_demand_idx, minlength=len(demand_nodes)).astype(float)
+        slots = np.floor(capacity / args.persons)
+    event(f"🏠 {len(building)} bangunan ({len(building) * args.persons:,.0f} orang) "
+          f"di {len(demand_nodes)} node jalan")
+
+    with span("distances", rows=len(shelter_nodes) * len(demand_nodes)):
+        dist = shelter_distances(csr, shelter_nodes, demand_nodes, weight)
+        pair_d, pair_s, pair_cost = candidate_pairs(dist, args.k)
+
+    with span("solve", rows=len(pair_d)):
+        flow, unassigned, res = solve_assignment(demand, slots, pair_d, pair_s, pair_cost,
+                                                 args.unassigned_cost)
+    event(f"🧮 HiGHS: {len(pair_d)} variabel, biaya {res.fun:,.0f} ({args.weight}), "
+          f"{unassigned.sum():,.0f} bangunan tidak tertampung")
+
+    with span("write", rows=len(building)):
+        shelter = split_to_buildings(b_demand_idx, flow, pair_d, pair_s)
+        s_idx = np.where(shelter >= 0, shelter, 0)
+        b_cost = np.where(shelter >= 0, dist[s_idx, b_demand_idx], np.nan)
+        names = evac["col_1"].astype(str).to_numpy() if "col_1" in evac.columns \
+            else np.arange(len(evac)).astype(str)
+        index = building.set_index(["element", "id"]).index \
+            if {"element", "id"} <= set(building.columns) else building.index
+        assignment = pd.DataFrame({
+            "node": csr.nodes[b_node],
+            "shelter": shelter,
+            "shelter_name": np.where(shelter >= 0, names[s_idx], None),
+            # waktu tempuh dihitung dari node jalan terdekat; snap_m = jarak bangunan ke node itu
+            "time_s" if args.weight == "travel_time" else "dist_m":
+                (b_cost if args.weight == "travel_time" else b_cost + b_snap).round(1),
+            "snap_m": b_snap.round(1),
+            "persons": args.persons,
+        }, index=index)
+        assignment.to_csv(ASSIGNMENT_PATH)
+
+        # pembanding: semua bangunan ke shelter terdekat tanpa batas kapasitas
+        reachable = np.isfinite(dist).any(axis=0)
+        nearest = np.argmin(dist, axis=0)
+        load = np.bincount(shelter[shelter >= 0], minlength=len(evac)) * args.persons
+        nearest_load = np.bincount(nearest[reachable], weights=demand[reachable],
+                                   minlength=len(evac)) * args.persons
+        report = pd.DataFrame({
+            "shelter": np.arange(len(evac)),
+            "name": names,
+            "capacity": capacity,
+            "load": load,
+            "utilization": (load / np.maximum(capacity, 1)).round(3),
+            "nearest_only_load": nearest_load,
+            "nearest_only_overload": np.maximum(nearest_load - capacity, 0),
+        })
+        report.to_csv(LOAD_PATH, index=False)
+
+    event(f"✅ Saved: {ASSIGNMENT_PATH}", path=ASSIGNMENT_PATH, rows=len(assignment))
+    event(f"✅ Saved: {LOAD_PATH}", path=LOAD_PATH, rows=len(report))
+    event(f"   Overload nearest-only: {int((report['nearest_only_overload'] > 0).sum())} tempat evakuasi; "
+          f"dengan kapasitas: {int((report['load'] > report['capacity']).sum())}")
@@ -0,0 +1,312 @@
+"""
+Benchmark suite untuk setiap tahap pipeline (offline, data sintetis)
+Hasil disimpan di benchmarks/results.jsonl agar regresi antar versi bisa dilacak
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import runpy
+import argparse
+import platform
+import subprocess
+import contextlib
+from datetime import datetime
+
+os.environ.setdefault("MPLBACKEND", "Agg")
+# benchmark punya penyimpanan hasil sendiri, laporan run instrument tidak ditulis
+os.environ.setdefault("INSTRUMENT_DIR", "")
+
+import instrument
+import synthetic_data
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(SRC_DIR)
+RESULTS_PATH = os.path.join(REPO_DIR, "benchmarks", "results.jsonl")
+WORKSPACE_DIR = os.path.join(REPO_DIR, "cache", "bench")
+
+# Registry tahap benchmark: nama -> fungsi(workspace) yang mengembalikan jumlah baris
+STAGES = {}
+
+
+def stage(name):
+    def register(fn):
+        STAGES[name] = fn
+        return fn
+    return register
+
+
+@contextlib.contextmanager
+def in_workspace(workspace, quiet=True):
+    # script pipeline memakai path relatif data_raw/ dan data_processed/
+    cwd = os.getcwd()
+    os.chdir(workspace)
+    try:
+        if quiet:
+            with contextlib.redirect_stdout(io.StringIO()):
+                yield
+        else:
+            yield
+    finally:
+        os.chdir(cwd)
+
+
+def run_script(name, workspace):
+    with in_workspace(workspace):
+        try:
+            return runpy.run_path(os.path.join(SRC_DIR, name), run_name="__main__")
+        except SystemExit as e:
+            if e.code not in (None, 0):
+                raise RuntimeError(f"{name} exit {e.code}")
+            return {}
+
+
+@stage("ingest_flood")
+def bench_ingest_flood(workspace):
+    ns = run_script("get_floodpoint.py", workspace)
+    return len(ns.get("gdf", []))
+
+
+@stage("ingest_evac")
+def bench_ingest_evac(workspace):
+    ns = run_script("get_evac_point.py", workspace)
+    return len(ns.get("gdf", []))
+
+
+@stage("desa_dissolve")
+def bench_desa_dissolve(workspace):
+    import geopandas as gpd
+    desa = gpd.read_file(os.path.join(workspace, "data_raw", "ADMINISTRASIDESA_AR_25K.shp"))
+    kecamatan = desa.dissolve(by="WADMKC", as_index=False)
+    return len(kecamatan)
+
+
+@stage("building_export")
+def bench_building_export(workspace):
+    import pandas as pd
+    from building_schema import save_lean
+    building = pd.read_pickle(os.path.join(workspace, "data_raw", "building_osm.pkl"))
+    with in_workspace(workspace):
+        lean, _ = save_lean(building, "data_processed/building.geojson",
+                            "data_processed/building_tags_extra.csv")
+    return len(lean)
+
+
+@stage("building_load")
+def bench_building_load(workspace):
+    from building_schema import load_buildings
+    return len(load_buildings(os.path.join(workspace, "data_processed", "building.geojson")))
+
+
+@stage("fgb_bbox_read")
+def bench_fgb_bbox_read(workspace, views=20, size_deg=0.03):
+    # baca per viewport dari FlatGeobuf (R-tree) vs load GeoJSON penuh lalu filter bbox
+    import numpy as np
+    import geopandas as gpd
+    from export_fgb import export_layer, read_bbox
+    src = os.path.join(workspace, "data_processed", "building.geojson")
+    with instrument.span("export"):
+        dst, _ = export_layer(src)
+    x0, y0, x1, y1 = synthetic_data.BBOX
+    rng = np.random.default_rng(0)
+    corners = np.column_stack([rng.uniform(x0, x1 - size_deg, views), rng.uniform(y0, y1 - size_deg, views)])
+    rows = 0
+    with instrument.span("bbox_read", views=views):
+        for x, y in corners:
+            rows += len(read_bbox(dst, (x, y, x + size_deg, y + size_deg)))
+    with instrument.span("geojson_full"):
+        full = gpd.read_file(src, engine="pyogrio")
+        for x, y in corners:
+            full.cx[x:x + size_deg, y:y + size_deg]
+    return rows
+
+
+@stage("graph_load")
+def bench_graph_load(workspace):
+    import osmnx as ox
+    G = ox.load_graphml(os.path.join(workspace, "data_processed", "road.graphml"))
+    return G.number_of_edges()
+
+
+@stage("routing_update")
+def bench_routing_update(workspace, batches=5, radius_m=250, shelters=320):
+    # latency update incremental vs full recompute untuk batch penutupan jalan yang sama
+    import numpy as np
+    import shapely
+    from routing import load_road_csr, DynamicRouter, nearest_shelter
+    with instrument.span("load"):
+        # graph mentah agar hasil sebanding dengan run sebelumnya (tanpa konsolidasi simpang)
+        csr = load_road_csr(os.path.join(workspace, "data_processed", "road.graphml"), derived=False)
+    rng = np.random.default_rng(0)
+    with instrument.span("init_full", rows=csr.n_edges):
+        router = DynamicRouter(csr, rng.choice(csr.n_nodes, min(shelters, csr.n_nodes), replace=False))
+    centers = rng.choice(csr.n_nodes, batches * 20, replace=False)
+    points = shapely.points(csr.x[centers], csr.y[centers])
+    for g in np.array_split(np.arange(len(points)), batches):
+        edges = csr.edges_near(points[g], radius_m)
+        with instrument.span("update", rows=len(edges)):
+            router.block(edges)
+        with instrument.span("full", rows=len(edges)):
+            nearest_shelter(csr, router.shelters, router.weight)
+    return csr.n_edges
+
+
+@stage("render_layer")
+def bench_render_layer(workspace):
+    import matplotlib.pyplot as plt
+    with in_workspace(workspace):
+        import layers  # CATALOG memeriksa file kecamatan relatif ke workspace saat import
+    # tanpa cache layer (memori/pickle): tiap ulangan parse ulang, sebanding dengan run sebelum katalog layer
+    cache, layers._CACHE = layers._CACHE, layers.LayerCache(disk_cache=False)
+    try:
+        ns = run_script("visualize_layer.py", workspace)
+    finally:
+        layers._CACHE = cache
+    with in_workspace(workspace):
+        plt.gcf().savefig("data_processed/layer_bench.png", dpi=100)
+    plt.close("all")
+    return len(ns.get("building", []))
+
+
+def warmup_imports():
+    # import library berat sebelum timing agar tidak ikut terukur di tahap pertama
+    import openpyxl  # noqa: F401
+    import geopandas  # noqa: F401
+    import osmnx  # noqa: F401
+    import matplotlib.pyplot  # noqa: F401
+
+
+def run_stage(name, workspace, repeat=1):
+    # ambil run tercepat; sub-span dari script pipeline ikut dicatat sebagai breakdown
+    fn = STAGES[name]
+    best = None
+    for _ in range(repeat):
+        n_before = len(instrument._run["spans"])
+        with instrument.span(name) as s:
+            s.set(rows=fn(workspace))
+        # sub-span dengan nama sama (mis. per batch) dijumlahkan
+        children = {}
+        for sp in instrument._run["spans"][n_before:]:
+            if sp["name"].startswith(name + "/"):
+                key = sp["name"][len(name) + 1:]
+                children[key] = round(children.get(key, 0) + sp["wall_s"], 6)
+        if best is None or s.record["wall_s"] < best["wall_s"]:
+            best = dict(s.record, substages=children)
+    return {
+        "wall_s": best["wall_s"],
+        "cpu_s": best["cpu_s"],
+        "rows": best.get("rows"),
+        "peak_rss_mb": best["peak_rss_mb"],
+        "substages": best["substages"],
+    }
+
+
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except Exception:
+        return None
+
+
+def load_results(path=RESULTS_PATH):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def save_result(record, path=RESULTS_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def compare(record, previous, threshold=1.2):
+    # bandingkan dengan run terakhir dengan dataset yang sama; return daftar tahap yang regresi
+    regressions = []
+    print(f"\n📊 Dibandingkan dengan {previous.get('commit')} ({previous['timestamp']}):")
+    for name, cur in record["stages"].items():
+        if "error" in cur:
+            continue
+        prev = previous["stages"].get(name)
+        if not prev or not prev.get("wall_s"):
+            print(f"   {name:<18} {cur['wall_s']:>9.3f}s   (baru)")
+            continue
+        ratio = cur["wall_s"] / prev["wall_s"]
+        flag = ""
+        if ratio > threshold:
+            flag = "  ⚠️ REGRESSION"
+            regressions.append(name)
+        print(f"   {name:<18} {prev['wall_s']:>9.3f}s -> {cur['wall_s']:>9.3f}s  x{ratio:.2f}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark pipeline dengan data sintetis")
+    parser.add_argument("--scale", default="small", choices=sorted(synthetic_data.SCALES))
+    parser.add_argument("--buildings", type=int, help="override jumlah bangunan (mis. 1000000)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--stages", default=",".join(STAGES),
+                        help="tahap yang dijalankan, pisahkan dengan koma")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--workspace", default=WORKSPACE_DIR)
+    parser.add_argument("--results", default=RESULTS_PATH)
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="rasio waktu yang dianggap regresi")
+    parser.add_argument("--no-save", action="store_true")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args(argv)
+
+    scale = dict(synthetic_data.SCALES[args.scale])
+    if args.buildings:
+        scale["buildings"] = args.buildings
+    dataset = f"{args.scale}-b{scale['buildings']}-s{args.seed}"
+    workspace = os.path.abspath(os.path.join(args.workspace, dataset))
+
+    print(f"🔄 Menyiapkan data sintetis: {dataset}")
+    t0 = time.perf_counter()
+    synthetic_data.generate(workspace, scale, seed=args.seed)
+    print(f"   siap dalam {time.perf_counter() - t0:.1f}s ({workspace})")
+
+    record = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "dataset": dataset,
+        "scale": scale,
+        "seed": args.seed,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "stages": {},
+    }
+
+    warmup_imports()
+    for name in [s.strip() for s in args.stages.split(",") if s.strip()]:
+        if name not in STAGES:
+            print(f"⚠️  Tahap tidak dikenal: {name}")
+            continue
+        try:
+            res = run_stage(name, workspace, args.repeat)
+        except Exception as e:
+            res = {"error": str(e)}
+            print(f"❌ {name}: {e}")
+        record["stages"][name] = res
+
+    previous = [r for r in load_results(args.results) if r.get("dataset") == dataset]
+    regressions = compare(record, previous[-1], args.threshold) if previous else []
+
+    if not args.no_save:
+        save_result(record, args.results)
+        print(f"\n✅ Saved: {args.results}")
+
+    if regressions and args.fail_on_regression:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""
+Metrik footprint bangunan dalam CRS terproyeksi (UTM 49S, EPSG:32749)
+Luas, keliling, compactness, centroid, dan jarak ke titik rawan banjir dihitung
+vektor (Shapely 2 ufunc) per chunk secara paralel, lalu disimpan sebagai kolom
+di building_metrics.csv (key: element, id sama dengan building.geojson)
+"""
+
+import os
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import shapely
+from pyproj import Transformer
+
+from building_schema import load_buildings
+from instrument import span, event
+from region import REGION
+
+UTM_CRS = "EPSG:32749"  # UTM zone 49S, mencakup Jawa Tengah
+METRICS_PATH = REGION.path("building_metrics.csv")
+FLOOD_PATH = REGION.path(f"{REGION.flood_name}.geojson")
+RADII_M = (100, 250, 500)
+CHUNK_SIZE = 100_000
+
+
+def to_utm(geoms, src_crs="EPSG:4326"):
+    # pyproj melepas GIL saat transform, aman dipanggil dari thread
+    tr = Transformer.from_crs(src_crs, UTM_CRS, always_xy=True)
+    return shapely.transform(geoms, lambda xy: np.column_stack(tr.transform(xy[:, 0], xy[:, 1])))
+
+
+def footprint_metrics(geoms_utm, flood_tree=None, radii=RADII_M):
+    area = shapely.area(geoms_utm)
+    perimeter = shapely.length(geoms_utm)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Polsby-Popper: 1 = lingkaran, mendekati 0 = memanjang/tidak beraturan
+        compactness = np.where(perimeter > 0, 4 * np.pi * area / perimeter ** 2, np.nan)
+    centroid_xy = shapely.get_coordinates(shapely.centroid(geoms_utm))
+    out = {
+        "area_m2": area,
+        "perimeter_m": perimeter,
+        "compactness": compactness,
+        "centroid_x": centroid_xy[:, 0],
+        "centroid_y": centroid_xy[:, 1],
+    }
+    if flood_tree is not None:
+        dist = np.full(len(geoms_utm), np.nan)
+        idx, d = flood_tree.query_nearest(geoms_utm, return_distance=True, all_matches=False)
+        dist[idx[0]] = d
+        out["dist_flood_m"] = dist
+        for r in radii:
+            out[f"flood_{r}m"] = dist <= r
+    return out
+
+
+def _chunk(args):
+    geoms, src_crs, flood_tree, radii = args
+    return footprint_metrics(to_utm(geoms, src_crs), flood_tree, radii)
+
+
+def compute_metrics(building, flood=None, radii=RADII_M, workers=None, chunk_size=CHUNK_SIZE):
+    # building: GeoDataFrame EPSG:4326; return DataFrame metrik dengan index sama
+    src_crs = building.crs or "EPSG:4326"
+    geoms = np.asarray(building.geometry.values)
+    flood_tree = None
+    if flood is not None and len(flood):
+        flood_tree = shapely.STRtree(to_utm(np.asarray(flood.geometry.values), flood.crs or "EPSG:4326"))
+
+    chunks = [(geoms[i:i + chunk_size], src_crs, flood_tree, radii)
+              for i in range(0, len(geoms), chunk_size)]
+    workers = workers or os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        parts = list(pool.map(_chunk, chunks))
+
+    if not parts:
+        return pd.DataFrame(index=building.index)
+    cols = {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+    metrics = pd.DataFrame(cols, index=building.index)
+    float_cols = ["area_m2", "perimeter_m", "compactness", "dist_flood_m"]
+    for col in float_cols:
+        if col in metrics:
+            metrics[col] = metrics[col].astype("float32")
+    return metrics
+
+
+def load_metrics(path=METRICS_PATH):
+    df = pd.read_csv(path)
+    id_cols = [c for c in ("element", "id") if c in df.columns]
+    return df.set_index(id_cols) if id_cols else df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Metrik footprint bangunan (UTM 49S)")
+    parser.add_argument("--radius", default=",".join(str(r) for r in RADII_M),
+                        help="radius (meter) dari titik rawan banjir, pisahkan dengan koma")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--output", default=METRICS_PATH)
+    args = parser.parse_args()
+    radii = tuple(int(r) for r in args.radius.split(",") if r.strip())
+
+    with span("load") as s:
+        building = load_buildings(REGION.path("building.geojson"), columns=["element", "id"])
+        if {"element", "id"} <= set(building.columns):
+            building = building.set_index(["element", "id"])
+        flood = gpd.read_file(FLOOD_PATH) if os.path.exists(FLOOD_PATH) else None
+        s.set(rows=len(building))
+    if flood is None:
+        event(f"⚠️  {FLOOD_PATH} tidak ditemukan, jarak ke titik banjir dilewati")
+
+    with span("metrics", rows=len(building), workers=args.workers):
+        metrics = compute_metrics(building, flood, radii, args.workers, args.chunk_size)
+
+    with span("write", rows=len(metrics)):
+        metrics.to_csv(args.output, float_format="%.3f")
+    event(f"✅ Saved: {args.output} ({len(metrics)} bangunan)", path=args.output, rows=len(metrics))
+    if "dist_flood_m" in metrics:
+        for r in radii:
+            event(f"   Bangunan <= {r} m dari titik rawan banjir: {int(metrics[f'flood_{r}m'].sum())}")
@@ -0,0 +1,155 @@
+"""
+Proyeksi skema atribut untuk layer fitur OSM (bangunan)
+Hanya tag whitelist yang disimpan di GeoJSON utama dengan dtype kompak,
+tag OSM lain dipindah ke sidecar CSV (format panjang: id, key, value)
+"""
+
+import os
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+from instrument import event
+from region import REGION
+
+BUILDING_PATH = REGION.path("building.geojson")
+SIDECAR_PATH = REGION.path("building_tags_extra.csv")
+
+# Tag OSM yang tetap disimpan di layer utama (sisanya masuk sidecar)
+KEEP_TAGS = ["building", "amenity", "building:levels", "name"]
+
+# Tag dengan kardinalitas rendah -> categorical
+CATEGORICAL_TAGS = ["building", "amenity"]
+
+# Tag numerik -> integer kompak (tag OSM -> nama kolom output)
+INT_TAGS = {"building:levels": "levels"}
+
+# Jumlah baris sampel untuk memperkirakan ukuran file skema penuh
+SIZE_SAMPLE = 5000
+
+
+def memory_mb(df):
+    return df.memory_usage(deep=True).sum() / 1e6
+
+
+def geojson_size(gdf, sample=SIZE_SAMPLE):
+    # ukuran file GeoJSON (byte) bila gdf ditulis apa adanya; > sample baris -> tulis sampel lalu diskalakan
+    idx = np.linspace(0, len(gdf) - 1, min(len(gdf), sample)).astype(int) if len(gdf) else []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sample.geojson")
+        gdf.iloc[idx].to_file(path, driver="GeoJSON")
+        size = os.path.getsize(path)
+    return size * len(gdf) / max(len(idx), 1), len(idx) < len(gdf)
+
+
+def parse_levels(s):
+    # "2", " 3 ", "2,5", "2;3" -> angka pertama dibulatkan; selain itu NA
+    num = (s.astype("string")
+            .str.extract(r"(\d+(?:[.,]\d+)?)", expand=False)
+            .str.replace(",", ".", regex=False))
+    num = pd.to_numeric(num, errors="coerce").round()
+    num = num.where((num >= 0) & (num <= 255))
+    return num.astype("UInt8")
+
+
+def apply_dtypes(gdf, categorical_tags=CATEGORICAL_TAGS, int_tags=INT_TAGS):
+    # dipakai saat proyeksi dan saat load ulang (GeoJSON tidak menyimpan dtype)
+    for col in categorical_tags:
+        if col in gdf.columns:
+            gdf[col] = gdf[col].astype("category")
+    for tag, out in int_tags.items():
+        if tag in gdf.columns:
+            gdf[out] = parse_levels(gdf.pop(tag))
+        elif out in gdf.columns:
+            gdf[out] = parse_levels(gdf[out])
+    return gdf
+
+
+def extra_tags_long(gdf, cols):
+    # tag sparse -> format panjang, hanya nilai non-null yang disimpan
+    parts = []
+    for col in cols:
+        s = gdf[col].dropna()
+        if s.empty:
+            continue
+        parts.append(pd.DataFrame({"key": col, "value": s.astype(str)}, index=s.index))
+    if not parts:
+        return pd.DataFrame(columns=["key", "value"])
+    return pd.concat(parts).reset_index()
+
+
+def project_schema(gdf, keep_tags=KEEP_TAGS, categorical_tags=CATEGORICAL_TAGS, int_tags=INT_TAGS):
+    geom_col = gdf.geometry.name
+    keep = [c for c in keep_tags if c in gdf.columns]
+    extra_cols = [c for c in gdf.columns if c not in keep and c != geom_col]
+
+    lean = gdf[keep + [geom_col]].copy()
+    lean = apply_dtypes(lean, categorical_tags, int_tags)
+    lean = lean[[c for c in lean.columns if c != geom_col] + [geom_col]]
+
+    extra = extra_tags_long(gdf, extra_cols)
+    return lean, extra
+
+
+def save_lean(gdf, out_path=BUILDING_PATH, sidecar_path=SIDECAR_PATH, keep_tags=KEEP_TAGS):
+    # proyeksi skema + simpan, return (lean_gdf, report)
+    # ukuran GeoJSON skema penuh (tanpa proyeksi), bukan file lama di out_path
+    before_size, estimated = geojson_size(gdf)
+    before_mb = memory_mb(gdf)
+    n_cols = len(gdf.columns)
+
+    lean, extra = project_schema(gdf, keep_tags)
+    after_mb = memory_mb(lean)
+
+    lean.to_file(out_path, driver="GeoJSON")
+    after_size = os.path.getsize(out_path)
+    if sidecar_path and not extra.empty:
+        extra.to_csv(sidecar_path, index=False)
+
+    report = {
+        "features": len(lean),
+        "columns_before": n_cols,
+        "columns_after": len(lean.columns),
+        "memory_mb_before": round(float(before_mb), 2),
+        "memory_mb_after": round(float(after_mb), 2),
+        "file_mb_before": round(before_size / 1e6, 2),
+        "file_mb_before_estimated": estimated,
+        "file_mb_after": round(after_size / 1e6, 2),
+        "sidecar_rows": len(extra) if sidecar_path else 0,
+    }
+
+    event(f"📉 Schema projection: {n_cols} -> {len(lean.columns)} kolom")
+    event(f"   Memory: {before_mb:.1f} MB -> {after_mb:.1f} MB")
+    note = f" (skema penuh diperkirakan dari {SIZE_SAMPLE} baris sampel)" if estimated else ""
+    event(f"   File  : {before_size / 1e6:.1f} MB -> {after_size / 1e6:.1f} MB{note}")
+    event(f"✅ Saved: {out_path}", path=out_path, **report)
+    if sidecar_path and not extra.empty:
+        event(f"✅ Saved sidecar: {sidecar_path} ({len(extra)} tag)")
+    return lean, report
+
+
+def load_buildings(path=BUILDING_PATH, columns=None):
+    # load layer bangunan dan kembalikan dtype kompak
+    gdf = gpd.read_file(path, columns=columns)
+    return apply_dtypes(gdf)
+
+
+if __name__ == "__main__":
+    # Proyeksi ulang building.geojson yang sudah ada (tanpa fetch ulang dari OSM)
+    parser = argparse.ArgumentParser(description="Schema projection untuk building.geojson")
+    parser.add_argument("--input", default=BUILDING_PATH)
+    parser.add_argument("--keep", default=",".join(KEEP_TAGS),
+                        help="daftar tag yang disimpan, pisahkan dengan koma")
+    parser.add_argument("--no-sidecar", action="store_true",
+                        help="jangan simpan tag lain ke sidecar CSV")
+    args = parser.parse_args()
+
+    event(f"🔄 Loading {args.input}...")
+    building = gpd.read_file(args.input)
+    save_lean(
+        building,
+        out_path=args.input,
+        sidecar_path=None if args.no_sidecar else SIDECAR_PATH,
+        keep_tags=[t.strip() for t in args.keep.split(",") if t.strip()],
+    )
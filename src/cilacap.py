@@ -0,0 +1,248 @@
+"""
+Satu entry point CLI untuk seluruh pipeline
+Modul ini hanya memakai standard library; library berat (osmnx, geopandas,
+matplotlib, sklearn) baru di-import oleh subcommand yang membutuhkannya, dan di
+dalam script pun library yang hanya dipakai satu cabang (mis. matplotlib untuk
+peta) di-import di cabang itu. Setiap subcommand menjalankan script di src/
+(runpy), argumen setelah target diteruskan apa adanya (termasuk -h/--help).
+Waktu import level modul script (startup) dicatat sebagai span "startup".
+
+Contoh:
+  python src/cilacap.py fetch road
+  python src/cilacap.py fetch update --osc data_raw/changes.osc
+  python src/cilacap.py kecamatan filter
+  python src/cilacap.py analyze exposure --radius 250,500
+  REGION=banyumas python src/cilacap.py fetch building
+  python src/cilacap.py startup --repeat 3       # ukur & lacak waktu startup tiap subcommand
+"""
+
+import os
+import sys
+import ast
+import time
+import runpy
+import argparse
+import importlib
+import subprocess
+
+import instrument
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+STARTUP_PATH = os.path.join(os.path.dirname(SRC_DIR), "benchmarks", "startup.jsonl")
+
+# (grup, target) -> script
+COMMANDS = {
+    "fetch": {
+        "boundary": "get_boundary.py",
+        "road": "get_road.py",
+        "building": "get_building.py",
+        "update": "osm_update.py",
+    },
+    "ingest": {
+        "flood": "get_floodpoint.py",
+        "evac": "get_evac_point.py",
+    },
+    "kecamatan": {
+        "build": "process_kecamatan_bps.py",
+        "dissolve": "get_kecamatan.py",
+        "filter": "filter_kecamatan_24.py",
+    },
+    "render": {
+        "layer": "visualize_layer.py",
+        "flood": "visualize_flood.py",
+        "evac": "visualize_evac.py",
+        "tiles": "render_tiles.py",
+    },
+    "analyze": {
+        "metrics": "building_metrics.py",
+        "exposure": "exposure.py",
+        "cluster": "cluster_flood.py",
+        "graph": "road_graph.py",
+        "routing": "routing.py",
+        "scenarios": "simulate_scenarios.py",
+        "shelters": "assign_shelters.py",
+        "grid": "raster_grid.py",
+        "train": "train_rf.py",
+        "hex": "hex_grid.py",
+    },
+    "export": {
+        "fgb": "export_fgb.py",
+        "topojson": "export_topojson.py",
+        "schema": "building_schema.py",
+    },
+}
+DEFAULT_TARGET = {"render": "layer"}
+
+
+def is_main_guard(node):
+    # if __name__ == "__main__":
+    test = node.test
+    return (isinstance(test, ast.Compare) and isinstance(test.left, ast.Name) and test.left.id == "__name__"
+            and len(test.comparators) == 1 and isinstance(test.comparators[0], ast.Constant)
+            and test.comparators[0].value == "__main__")
+
+
+def script_imports(path):
+    # modul yang di-import script di level modul (termasuk blok if __main__ dan try/except);
+    # import di dalam fungsi, blok with, atau cabang if lain sengaja lazy -> tidak di-preload
+    with open(path) as f:
+        tree = ast.parse(f.read(), filename=path)
+    names = []
+    stack = list(tree.body)
+    while stack:
+        node = stack.pop(0)
+        if isinstance(node, ast.Import):
+            names += [a.name for a in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+            names.append(node.module)
+        elif isinstance(node, ast.If) and is_main_guard(node):
+            stack = list(node.body) + stack
+        elif isinstance(node, ast.Try):
+            stack = list(node.body) + [n for h in node.handlers for n in h.body] + stack
+    return list(dict.fromkeys(names))
+
+
+def script_doc(path):
+    with open(path) as f:
+        return (ast.get_docstring(ast.parse(f.read(), filename=path)) or "").strip()
+
+
+def preload(script):
+    # import dependency script lebih dulu agar waktu startup terpisah dari waktu kerja
+    modules = script_imports(os.path.join(SRC_DIR, script))
+    with instrument.span("startup", modules=len(modules)) as s:
+        for name in modules:
+            try:
+                importlib.import_module(name)
+            except ImportError:
+                # dependency opsional (mis. rasterio di try/except); script yang menentukan fallback-nya
+                pass
+    return s.record["wall_s"]
+
+
+def run(group, target, extra, startup_only=False):
+    script = COMMANDS[group][target]
+    path = os.path.join(SRC_DIR, script)
+    # laporan instrument tetap atas nama script agar history run (run_regions, summarize) menyatu
+    instrument._run["script"] = script
+    instrument._run["argv"] = list(extra)
+    instrument._run["command"] = f"{group} {target}"
+    if {"-h", "--help"} & set(extra) and "argparse" not in script_imports(path):
+        # script tanpa argparse akan langsung jalan jika -h diteruskan: tampilkan docstring saja
+        print(f"usage: cilacap {group} {target}  (tanpa argumen tambahan)\n\n{script_doc(path) or script}")
+        return 0
+    if SRC_DIR not in sys.path:
+        sys.path.insert(0, SRC_DIR)
+    preload(script)
+    if startup_only:
+        return 0
+    old_argv, sys.argv = sys.argv, [path] + list(extra)
+    try:
+        runpy.run_path(path, run_name="__main__")
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    finally:
+        sys.argv = old_argv
+    return 0
+
+
+def measure_startup(commands, repeat=1):
+    # startup tiap subcommand di proses baru (termasuk start interpreter), ambil yang tercepat
+    env = dict(os.environ, INSTRUMENT_DIR="", MPLBACKEND="Agg")
+    results = {}
+    for group, target in commands:
+        walls, error = [], None
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--startup-only", group, target],
+                                  env=env, capture_output=True, text=True)
+            if proc.returncode != 0:
+                lines = proc.stderr.strip().splitlines()
+                error = lines[-1] if lines else f"exit {proc.returncode}"
+                break
+            walls.append(time.perf_counter() - t0)
+        results[f"{group} {target}"] = {"error": error} if error else {"wall_s": round(min(walls), 4)}
+    return results
+
+
+def startup_command(args):
+    from benchmark import git_commit, load_results, save_result
+
+    commands = [(g, t) for g, targets in COMMANDS.items() for t in targets]
+    if args.only:
+        wanted = {c.strip() for c in args.only.split(",")}
+        commands = [(g, t) for g, t in commands if f"{g} {t}" in wanted or g in wanted]
+    results = measure_startup(commands, args.repeat)
+    record = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": git_commit(),
+        "python": sys.version.split()[0],
+        "commands": results,
+    }
+    previous = load_results(args.results)
+    prev = previous[-1]["commands"] if previous else {}
+    regressions = []
+    print(f"{'subcommand':<22} {'startup':>9} {'sebelumnya':>11}")
+    for name, res in results.items():
+        if "error" in res:
+            print(f"{name:<22} {'error':>9}   {res['error']}")
+            continue
+        old = prev.get(name, {}).get("wall_s")
+        flag = ""
+        if old and res["wall_s"] / old > args.threshold:
+            flag = "  ⚠️ REGRESSION"
+            regressions.append(name)
+        print(f"{name:<22} {res['wall_s']:>8.3f}s {(f'{old:.3f}s' if old else '-'):>11}{flag}")
+    if not args.no_save:
+        save_result(record, args.results)
+        print(f"\n✅ Saved: {args.results}")
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cilacap", description="Pipeline data banjir & evakuasi")
+    parser.add_argument("--startup-only", action="store_true", help=argparse.SUPPRESS)
+    sub = parser.add_subparsers(dest="group", required=True)
+    for group, targets in COMMANDS.items():
+        p = sub.add_parser(group, help=f"{group}: {', '.join(targets)}",
+                           epilog="argumen setelah target (termasuk -h) diteruskan ke script")
+        p.add_argument("target", choices=list(targets), nargs="?" if group in DEFAULT_TARGET else None,
+                       default=DEFAULT_TARGET.get(group))
+    p = sub.add_parser("startup", help="ukur waktu startup (import) tiap subcommand")
+    p.add_argument("--only", help="subcommand/grup dipisah koma, mis. 'fetch road,kecamatan'")
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--results", default=STARTUP_PATH)
+    p.add_argument("--threshold", type=float, default=1.2)
+    p.add_argument("--no-save", action="store_true")
+    p.add_argument("--fail-on-regression", action="store_true")
+    return parser
+
+
+def split_argv(argv):
+    # [grup, target, argumen script...]: bagian setelah target tidak di-parse di sini, agar
+    # -h/--help dan opsi script tidak tertelan parser grup; None jika target tidak ditulis
+    for i, arg in enumerate(argv):
+        if arg in COMMANDS:
+            if i + 1 < len(argv) and argv[i + 1] in COMMANDS[arg]:
+                return argv[:i + 2], argv[i + 2:]
+            break
+    return argv, None
+
+
+def main(argv=None):
+    parser = build_parser()
+    head, extra = split_argv(list(sys.argv[1:] if argv is None else argv))
+    if extra is None:
+        # grup tanpa target (mis. "render" -> layer): -h di sini = bantuan grup
+        args, extra = parser.parse_known_args(head)
+    else:
+        args = parser.parse_args(head)
+    if args.group == "startup":
+        if extra:
+            parser.error(f"argumen tidak dikenal: {extra}")
+        return startup_command(args)
+    return run(args.group, args.target, extra, args.startup_only)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
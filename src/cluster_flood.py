@@ -0,0 +1,248 @@
+"""
+Clustering titik rawan banjir / kejadian banjir per kecamatan
+DBSCAN (atau HDBSCAN) dengan metrik haversine di atas BallTree, dijalankan per
+kecamatan. Titik dengan koordinat sama (log kejadian berulang) digabung dulu dan
+dipakai sebagai sample_weight sehingga jutaan kejadian tetap cepat diproses.
+Mode --incremental (hanya model DBSCAN) menempelkan titik baru ke cluster yang sudah ada
+lewat core point terdekat di kecamatan yang sama (tanpa clustering ulang). File input yang
+sudah diterapkan (SHA-1 dicatat di flood_clusters_model.json) dilewati, sedangkan kejadian
+berulang di koordinat yang sama dari file baru tetap ditambahkan.
+
+Contoh:
+  python src/cluster_flood.py --eps 500 --min-samples 3
+  python src/cluster_flood.py --input data_raw/kejadian_banjir_2024.csv --incremental
+"""
+
+import os
+import json
+import hashlib
+import argparse
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+
+from instrument import span, event
+from region import REGION
+
+EARTH_RADIUS_M = 6_371_008.8
+EPS_M = 500
+MIN_SAMPLES = 3
+ROUND_DECIMALS = 5  # ~1 m, titik dalam 1 m dianggap lokasi yang sama
+NO_KECAMATAN = "(tanpa kecamatan)"
+
+FLOOD_PATH = REGION.path(f"{REGION.flood_name}.geojson")
+CLUSTERS_PATH = REGION.path("flood_clusters.csv")
+SUMMARY_PATH = REGION.path("flood_clusters_summary.csv")
+KECAMATAN_SUMMARY_PATH = REGION.path("flood_clusters_kecamatan.csv")
+CORE_PATH = REGION.path("flood_clusters_core.csv")
+MODEL_PATH = REGION.path("flood_clusters_model.json")
+
+
+def load_points(path):
+    # GeoJSON hasil get_floodpoint.py atau CSV log kejadian dengan kolom lat/lon
+    if path.lower().endswith(".csv"):
+        df = pd.read_csv(path)
+        cols = {str(c).strip().lower(): c for c in df.columns}
+        lat = next((cols[c] for c in ("latitude", "lat", "y") if c in cols), None)
+        lon = next((cols[c] for c in ("longitude", "lon", "lng", "long", "x") if c in cols), None)
+        if lat is None or lon is None:
+            raise ValueError(f"Kolom lat/lon tidak ditemukan di {path}: {list(df.columns)}")
+        df = df.rename(columns={lat: "Latitude", lon: "Longitude"})
+    else:
+        gdf = gpd.read_file(path).to_crs("EPSG:4326")
+        df = pd.DataFrame(gdf.drop(columns=gdf.geometry.name))
+        df["Latitude"] = gdf.geometry.y.values
+        df["Longitude"] = gdf.geometry.x.values
+    df["Latitude"] = pd.to_numeric(df["Latitude"], errors="coerce")
+    df["Longitude"] = pd.to_numeric(df["Longitude"], errors="coerce")
+    df = df.dropna(subset=["Latitude", "Longitude"]).reset_index(drop=True)
+    if "Kecamatan" not in df.columns:
+        df["Kecamatan"] = NO_KECAMATAN
+    df["Kecamatan"] = df["Kecamatan"].fillna(NO_KECAMATAN).astype(str)
+    return df
+
+
+def to_radians(lat, lon):
+    # urutan [lat, lon] sesuai konvensi haversine sklearn
+    return np.radians(np.column_stack([lat, lon]))
+
+
+def dedupe(df, decimals=ROUND_DECIMALS):
+    # lokasi unik per kecamatan + bobot jumlah kejadian; inverse memetakan balik ke baris asli
+    key = pd.DataFrame({
+        "Kecamatan": df["Kecamatan"].values,
+        "lat": df["Latitude"].round(decimals).values,
+        "lon": df["Longitude"].round(decimals).values,
+    })
+    g = key.groupby(["Kecamatan", "lat", "lon"], sort=False)
+    unique = g.size().rename("weight").reset_index()
+    return unique, g.ngroup().values
+
+
+def cluster_group(X, weight, method, eps_m, min_samples, workers=None):
+    # return (label per lokasi, mask core)
+    if method == "hdbscan":
+        from sklearn.cluster import HDBSCAN
+        if len(X) < max(min_samples, 2):
+            return np.full(len(X), -1), np.zeros(len(X), dtype=bool)
+        # HDBSCAN tidak menerima sample_weight: lokasi unik dipakai langsung
+        model = HDBSCAN(min_cluster_size=max(min_samples, 2), metric="haversine",
+                        algorithm="ball_tree", n_jobs=workers).fit(X)
+        labels = model.labels_
+        return labels, labels >= 0
+    from sklearn.cluster import DBSCAN
+    model = DBSCAN(eps=eps_m / EARTH_RADIUS_M, min_samples=min_samples, metric="haversine",
+                   algorithm="ball_tree", n_jobs=workers).fit(X, sample_weight=weight)
+    core = np.zeros(len(X), dtype=bool)
+    core[model.core_sample_indices_] = True
+    return model.labels_, core
+
+
+def cluster_points(df, method="dbscan", eps_m=EPS_M, min_samples=MIN_SAMPLES, workers=None):
+    # cluster per kecamatan; id cluster unik lintas kecamatan, -1 = noise
+    unique, codes = dedupe(df)
+    labels = np.full(len(unique), -1, dtype=np.int64)
+    core = np.zeros(len(unique), dtype=bool)
+    offset = 0
+    for kec, idx in unique.groupby("Kecamatan", sort=True).indices.items():
+        X = to_radians(unique["lat"].values[idx], unique["lon"].values[idx])
+        with span("cluster", rows=len(idx), kecamatan=kec):
+            lab, is_core = cluster_group(X, unique["weight"].values[idx], method, eps_m,
+                                          min_samples, workers)
+        labels[idx] = np.where(lab >= 0, lab + offset, -1)
+        core[idx] = is_core
+        offset += int(lab.max()) + 1 if (lab >= 0).any() else 0
+
+    out = df.copy()
+    out["cluster"] = labels[codes]
+    cores = unique.loc[core, ["Kecamatan", "lat", "lon"]].assign(cluster=labels[core])
+    return out, cores
+
+
+def assign_incremental(df, cores, eps_m):
+    # titik baru ikut cluster core point terdekat dalam radius eps (aturan border point DBSCAN);
+    # tree dibangun per kecamatan agar titik tidak masuk cluster kecamatan tetangga
+    from sklearn.neighbors import BallTree
+
+    out = df.copy()
+    out["cluster"] = -1
+    if len(cores) == 0 or len(df) == 0:
+        return out
+    core_groups = cores.groupby(cores["Kecamatan"].astype(str)).indices
+    for kec, idx in df.groupby("Kecamatan", sort=False).indices.items():
+        cidx = core_groups.get(kec)
+        if cidx is None:
+            continue
+        tree = BallTree(to_radians(cores["lat"].values[cidx], cores["lon"].values[cidx]), metric="haversine")
+        dist, nearest = tree.query(to_radians(df["Latitude"].values[idx], df["Longitude"].values[idx]), k=1)
+        hit = dist[:, 0] * EARTH_RADIUS_M <= eps_m
+        out.iloc[idx[hit], out.columns.get_loc("cluster")] = cores["cluster"].values[cidx[nearest[hit, 0]]]
+    return out
+
+
+def input_sha1(path, chunk=1 << 20):
+    # sidik file input: file yang sama tidak diterapkan dua kali lewat --incremental
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def haversine_m(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+
+
+def summarize(points):
+    # ringkasan per cluster dan per kecamatan
+    clustered = points[points["cluster"] >= 0]
+    g = clustered.groupby("cluster")
+    summary = pd.DataFrame({
+        "Kecamatan": g["Kecamatan"].first(),
+        "points": g.size(),
+        "lat": g["Latitude"].mean(),
+        "lon": g["Longitude"].mean(),
+    })
+    # radius = jarak terjauh anggota ke centroid cluster
+    c = summary.loc[clustered["cluster"].values]
+    dist = haversine_m(clustered["Latitude"].values, clustered["Longitude"].values,
+                       c["lat"].values, c["lon"].values)
+    summary["radius_m"] = pd.Series(dist, index=clustered["cluster"].values).groupby(level=0).max().round(1)
+    summary = summary.reset_index()
+
+    kec = points.groupby("Kecamatan").agg(
+        points=("cluster", "size"),
+        noise=("cluster", lambda s: int((s < 0).sum())),
+    )
+    kec["clusters"] = summary.groupby("Kecamatan").size().reindex(kec.index, fill_value=0)
+    kec["largest_cluster"] = summary.groupby("Kecamatan")["points"].max().reindex(kec.index, fill_value=0)
+    kec["clustered_ratio"] = (1 - kec["noise"] / kec["points"]).round(3)
+    return summary, kec.reset_index()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Clustering titik rawan banjir per kecamatan")
+    parser.add_argument("--input", default=FLOOD_PATH, help="GeoJSON titik atau CSV log kejadian")
+    parser.add_argument("--method", choices=["dbscan", "hdbscan"], default="dbscan")
+    parser.add_argument("--eps", type=float, default=EPS_M, help="radius tetangga (meter)")
+    parser.add_argument("--min-samples", type=int, default=MIN_SAMPLES)
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="thread untuk query tetangga BallTree")
+    parser.add_argument("--incremental", action="store_true",
+                        help="tempelkan titik baru ke cluster yang ada (butuh run sebelumnya)")
+    args = parser.parse_args()
+
+    with span("load") as s:
+        points = load_points(args.input)
+        digest = input_sha1(args.input)
+        s.set(rows=len(points))
+    event(f"📍 {len(points)} titik dari {args.input}")
+
+    if args.incremental:
+        if not (os.path.exists(CORE_PATH) and os.path.exists(MODEL_PATH)):
+            event(f"❌ {CORE_PATH} belum ada, jalankan clustering penuh dulu")
+            raise SystemExit(1)
+        with open(MODEL_PATH) as f:
+            model = json.load(f)
+        if model["method"] != "dbscan":
+            # HDBSCAN tidak punya radius eps tunggal; titik baru perlu clustering ulang
+            event(f"❌ --incremental hanya untuk model DBSCAN (model tersimpan: {model['method']})")
+            raise SystemExit(1)
+        if digest in {a["sha1"] for a in model.get("applied", [])}:
+            event(f"↩️  {args.input} sudah pernah diterapkan (sha1 {digest[:12]}), tidak ada yang ditulis")
+            raise SystemExit(0)
+        cores = pd.read_csv(CORE_PATH)
+        with span("assign", rows=len(points), cores=len(cores)):
+            new = assign_incremental(points, cores, model["eps_m"])
+        event(f"➕ {int((new['cluster'] >= 0).sum())}/{len(new)} titik baru masuk cluster yang ada "
+              f"(eps {model['eps_m']} m)")
+        previous = pd.read_csv(CLUSTERS_PATH) if os.path.exists(CLUSTERS_PATH) else None
+        assigned = pd.concat([previous, new], ignore_index=True) if previous is not None else new
+    else:
+        with span("cluster_all", rows=len(points), method=args.method):
+            assigned, cores = cluster_points(points, args.method, args.eps,
+                                             args.min_samples, args.workers)
+        model = dict(method=args.method, eps_m=args.eps, min_samples=args.min_samples,
+                     input=args.input, points=len(points), applied=[])
+        with span("write_model", rows=len(cores)):
+            cores.to_csv(CORE_PATH, index=False)
+
+    with span("summarize", rows=len(assigned)):
+        summary, kecamatan = summarize(assigned)
+
+    with span("write", rows=len(assigned)):
+        assigned.to_csv(CLUSTERS_PATH, index=False)
+        # input dicatat setelah hasil tertulis: run yang gagal di tengah bisa diulang
+        model["applied"] = model.get("applied", []) + [{"sha1": digest, "input": args.input, "points": len(points)}]
+        with open(MODEL_PATH, "w") as f:
+            json.dump(model, f, indent=2)
+        summary.to_csv(SUMMARY_PATH, index=False)
+        kecamatan.to_csv(KECAMATAN_SUMMARY_PATH, index=False)
+    event(f"✅ Saved: {CLUSTERS_PATH} ({len(assigned)} titik, {len(summary)} cluster)",
+          path=CLUSTERS_PATH, rows=len(assigned), clusters=len(summary))
+    event(f"✅ Saved: {SUMMARY_PATH}", path=SUMMARY_PATH)
+    event(f"✅ Saved: {KECAMATAN_SUMMARY_PATH}", path=KECAMATAN_SUMMARY_PATH)
+    print(kecamatan.to_string(index=False))
@@ -0,0 +1,95 @@
+"""
+Export layer hasil proses ke FlatGeobuf (.fgb) dengan spatial index (packed Hilbert R-tree)
+File .fgb ditulis di samping GeoJSON-nya dan bisa dibaca per bbox tanpa memuat
+seluruh file, termasuk dari static file server lewat HTTP range request
+(mis. flatgeobuf.js di Leaflet, atau read_bbox("https://.../building.fgb", bbox)).
+
+Contoh:
+  python src/export_fgb.py                     # semua layer yang tersedia
+  python src/export_fgb.py --layers building,kecamatan
+  python src/export_fgb.py --layers road            # edge road.graphml -> road.fgb
+"""
+
+import os
+import argparse
+
+import geopandas as gpd
+
+from instrument import span, event
+from region import REGION
+
+# nama layer -> GeoJSON sumber di output region (road: edge dari graph OSMnx)
+LAYERS = {
+    "boundary": "boundary.geojson",
+    "building": "building.geojson",
+    "road": "road.graphml",
+    "kecamatan": f"{REGION.kecamatan_name}.geojson",
+    "flood": f"{REGION.flood_name}.geojson",
+    "evac": "tempatevakuasinew.geojson",
+}
+
+
+def fgb_path(geojson_path):
+    return os.path.splitext(geojson_path)[0] + ".fgb"
+
+
+def write_fgb(gdf, path):
+    # FlatGeobuf butuh satu tipe geometri per layer: Polygon+MultiPolygon dipromosikan ke Multi,
+    # campuran lain (mis. bangunan node + way) ditulis sebagai Unknown
+    base_types = {t.replace("Multi", "") for t in gdf.geom_type.dropna().unique()}
+    kwargs = {"geometry_type": "Unknown"} if len(base_types) > 1 else {}
+    gdf.to_file(path, driver="FlatGeobuf", engine="pyogrio", SPATIAL_INDEX="YES", **kwargs)
+    return path
+
+
+def road_edges(path):
+    # edge graph jalan sebagai GeoDataFrame datar (atribut list OSM dijadikan string)
+    import osmnx as ox
+
+    edges = ox.graph_to_gdfs(ox.load_graphml(path), nodes=False).reset_index()
+    keep = [c for c in ("u", "v", "key", "osmid", "highway", "name", "length") if c in edges.columns]
+    edges = edges[keep + ["geometry"]]
+    for col in ("osmid", "highway", "name"):
+        if col in edges.columns:
+            edges[col] = edges[col].map(lambda v: ";".join(map(str, v)) if isinstance(v, list)
+                                        else None if v is None or v != v else str(v))
+    return edges
+
+
+def export_layer(src, dst=None):
+    dst = dst or fgb_path(src)
+    if src.endswith(".graphml"):
+        gdf = road_edges(src)
+    else:
+        gdf = gpd.read_file(src, engine="pyogrio")
+    write_fgb(gdf, dst)
+    return dst, len(gdf)
+
+
+def read_bbox(path, bbox, columns=None):
+    # hanya fitur yang berpotongan dengan bbox (minx, miny, maxx, maxy), lewat index R-tree
+    return gpd.read_file(path, bbox=tuple(bbox), columns=columns, engine="pyogrio")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export layer ke FlatGeobuf dengan spatial index")
+    parser.add_argument("--layers", default=",".join(LAYERS),
+                        help=f"layer dipisah koma, pilihan: {', '.join(LAYERS)}")
+    args = parser.parse_args()
+
+    names = [n.strip() for n in args.layers.split(",") if n.strip()]
+    unknown = [n for n in names if n not in LAYERS]
+    if unknown:
+        parser.error(f"layer tidak dikenal: {unknown}")
+
+    for name in names:
+        src = REGION.path(LAYERS[name])
+        if not os.path.exists(src):
+            event(f"⚠️  {src} tidak ditemukan, dilewati")
+            continue
+        with span("export", layer=name) as s:
+            dst, rows = export_layer(src)
+            s.set(rows=rows)
+        src_mb, dst_mb = os.path.getsize(src) / 1e6, os.path.getsize(dst) / 1e6
+        event(f"✅ Saved: {dst} ({rows} fitur, {dst_mb:.1f} MB vs {os.path.basename(src)} {src_mb:.1f} MB)",
+              path=dst, rows=rows, size_mb=round(dst_mb, 2), geojson_mb=round(src_mb, 2))
@@ -0,0 +1,223 @@
+"""
+Encoder/decoder TopoJSON untuk layer administrasi (kecamatan/desa)
+Batas antar kecamatan disimpan sekali sebagai arc bersama; koordinat dikuantisasi
+ke grid integer (default 1e5 langkah per sumbu, ~1 m di Cilacap) dan di-delta-encode
+sesuai spesifikasi TopoJSON, sehingga payload jauh lebih kecil daripada GeoJSON
+dan bisa langsung dibaca topojson-client di browser.
+
+Contoh:
+  python src/export_topojson.py                       # kecamatan BPS + kecamatan hasil filter
+  python src/export_topojson.py --input data_processed/kecamatan_cilacap.geojson --quantization 1e6
+"""
+
+import os
+import json
+import argparse
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+from shapely.geometry import Polygon, MultiPolygon
+
+from instrument import span, event
+from region import REGION
+
+QUANTIZATION = 100_000
+LAYERS = [f"kecamatan_{REGION.slug}_bps.geojson", f"{REGION.kecamatan_name}.geojson"]
+
+
+def topojson_path(geojson_path):
+    return os.path.splitext(geojson_path)[0] + ".topojson"
+
+
+def _polygons(geom):
+    if geom is None or geom.is_empty:
+        return []
+    if isinstance(geom, Polygon):
+        return [geom]
+    if isinstance(geom, MultiPolygon):
+        return list(geom.geoms)
+    raise ValueError(f"Hanya Polygon/MultiPolygon yang didukung, dapat {geom.geom_type}")
+
+
+def _quantize_ring(coords, translate, scale):
+    # ring terbuka integer tanpa titik berurutan kembar; None jika degenerate
+    q = np.round((np.asarray(coords)[:-1, :2] - translate) / scale).astype(np.int64)
+    keep = np.r_[True, (np.diff(q, axis=0) != 0).any(axis=1)]
+    q = q[keep]
+    if len(q) > 1 and (q[-1] == q[0]).all():
+        q = q[:-1]
+    return q if len(q) >= 3 else None
+
+
+def _junctions(rings, width):
+    # titik yang tetangganya (prev, next) berbeda antar kemunculan = ujung arc
+    keys, lo, hi = [], [], []
+    for r in rings:
+        k = r[:, 0] * width + r[:, 1]
+        prev, nxt = np.roll(k, 1), np.roll(k, -1)
+        keys.append(k)
+        lo.append(np.minimum(prev, nxt))
+        hi.append(np.maximum(prev, nxt))
+    if not keys:
+        return np.array([], dtype=np.int64)
+    occ = pd.DataFrame({"k": np.concatenate(keys), "lo": np.concatenate(lo), "hi": np.concatenate(hi)})
+    counts = occ.drop_duplicates().groupby("k").size()
+    return np.sort(counts.index[counts > 1].to_numpy())
+
+
+class _ArcIndex:
+    # arc unik; arc yang sama dengan arah terbalik dirujuk sebagai ~index
+    def __init__(self):
+        self.arcs, self._index = [], {}
+
+    def add(self, arc):
+        key = arc.tobytes()
+        if key in self._index:
+            return self._index[key]
+        rkey = np.ascontiguousarray(arc[::-1]).tobytes()
+        if rkey in self._index:
+            return ~self._index[rkey]
+        self._index[key] = len(self.arcs)
+        self.arcs.append(arc)
+        return self._index[key]
+
+
+def _cut_ring(ring, junction_keys, width, arcs):
+    k = ring[:, 0] * width + ring[:, 1]
+    pos = np.flatnonzero(np.isin(k, junction_keys))
+    if len(pos) == 0:
+        # ring tanpa junction (mis. enclave): satu arc, dimulai dari titik terkecil agar kanonik
+        start = np.lexsort((ring[:, 1], ring[:, 0]))[0]
+        r = np.roll(ring, -start, axis=0)
+        return [arcs.add(np.vstack([r, r[:1]]))]
+    r = np.roll(ring, -pos[0], axis=0)
+    r = np.vstack([r, r[:1]])
+    bounds = np.r_[pos - pos[0], len(ring)]
+    return [arcs.add(np.ascontiguousarray(r[a:b + 1])) for a, b in zip(bounds[:-1], bounds[1:])]
+
+
+def _json_value(v):
+    if isinstance(v, np.generic):
+        v = v.item()
+    if isinstance(v, float) and not np.isfinite(v):
+        return None
+    if v is pd.NA or v is pd.NaT:
+        return None
+    if isinstance(v, (pd.Timestamp,)):
+        return v.isoformat()
+    return v
+
+
+def encode(gdf, name="layer", quantization=QUANTIZATION):
+    # GeoDataFrame polygon (EPSG:4326) -> dict TopoJSON (arc bersama, kuantisasi + delta)
+    if gdf.crs is not None and not gdf.crs.equals("EPSG:4326"):
+        gdf = gdf.to_crs("EPSG:4326")
+    x0, y0, x1, y1 = gdf.total_bounds
+    translate = np.array([x0, y0])
+    scale = np.array([max(x1 - x0, 1e-12), max(y1 - y0, 1e-12)]) / (quantization - 1)
+    width = int(quantization) + 1
+
+    # 1) kuantisasi semua ring: geometri -> polygon -> [exterior, interior...]
+    shapes = []
+    for geom in gdf.geometry:
+        polys = []
+        for poly in _polygons(geom):
+            ext = _quantize_ring(poly.exterior.coords, translate, scale)
+            if ext is None:
+                continue
+            holes = [h for h in (_quantize_ring(i.coords, translate, scale) for i in poly.interiors)
+                     if h is not None]
+            polys.append([ext] + holes)
+        shapes.append(polys)
+
+    # 2) junction dari seluruh layer, 3) potong ring jadi arc unik
+    junction_keys = _junctions([r for polys in shapes for rings in polys for r in rings], width)
+    arcs = _ArcIndex()
+    props = gdf.drop(columns=gdf.geometry.name)
+    geometries = []
+    for polys, (_, row) in zip(shapes, props.iterrows()):
+        encoded = [[_cut_ring(r, junction_keys, width, arcs) for r in rings] for rings in polys]
+        obj = {"properties": {k: _json_value(v) for k, v in row.items()}}
+        if not encoded:
+            obj["type"] = None
+        elif len(encoded) == 1:
+            obj.update(type="Polygon", arcs=encoded[0])
+        else:
+            obj.update(type="MultiPolygon", arcs=encoded)
+        geometries.append(obj)
+
+    # 4) delta-encode: titik pertama absolut, sisanya selisih
+    delta = [np.vstack([a[:1], np.diff(a, axis=0)]).tolist() for a in arcs.arcs]
+    return {
+        "type": "Topology",
+        "transform": {"scale": scale.tolist(), "translate": translate.tolist()},
+        "objects": {name: {"type": "GeometryCollection", "geometries": geometries}},
+        "arcs": delta,
+    }
+
+
+def decode(topology, name=None):
+    # dict TopoJSON -> GeoDataFrame EPSG:4326
+    name = name or next(iter(topology["objects"]))
+    transform = topology.get("transform")
+    arcs = []
+    for a in topology["arcs"]:
+        a = np.asarray(a, dtype=float)
+        if transform:
+            a = np.cumsum(a, axis=0) * transform["scale"] + transform["translate"]
+        arcs.append(a)
+
+    def ring(ids):
+        parts = [arcs[i] if i >= 0 else arcs[~i][::-1] for i in ids]
+        return np.vstack([parts[0]] + [p[1:] for p in parts[1:]])
+
+    def polygon(rings):
+        return Polygon(ring(rings[0]), [ring(r) for r in rings[1:]])
+
+    records, geoms = [], []
+    for obj in topology["objects"][name]["geometries"]:
+        records.append(obj.get("properties", {}))
+        if obj.get("type") == "Polygon":
+            geoms.append(polygon(obj["arcs"]))
+        elif obj.get("type") == "MultiPolygon":
+            geoms.append(MultiPolygon([polygon(p) for p in obj["arcs"]]))
+        else:
+            geoms.append(None)
+    return gpd.GeoDataFrame(pd.DataFrame.from_records(records), geometry=geoms, crs="EPSG:4326")
+
+
+def write_topojson(gdf, path, name=None, quantization=QUANTIZATION):
+    name = name or os.path.splitext(os.path.basename(path))[0]
+    topology = encode(gdf, name, quantization)
+    with open(path, "w") as f:
+        json.dump(topology, f, separators=(",", ":"))
+    return topology
+
+
+def read_topojson(path, name=None):
+    with open(path) as f:
+        return decode(json.load(f), name)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export layer administrasi ke TopoJSON")
+    parser.add_argument("--input", action="append",
+                        help="GeoJSON polygon (bisa diulang), default layer kecamatan region")
+    parser.add_argument("--quantization", type=float, default=QUANTIZATION)
+    args = parser.parse_args()
+
+    inputs = args.input or [REGION.path(name) for name in LAYERS]
+    for src in inputs:
+        if not os.path.exists(src):
+            event(f"⚠️  {src} tidak ditemukan, dilewati")
+            continue
+        dst = topojson_path(src)
+        with span("encode") as s:
+            gdf = gpd.read_file(src)
+            topology = write_topojson(gdf, dst, quantization=int(args.quantization))
+            s.set(rows=len(gdf), arcs=len(topology["arcs"]))
+        src_kb, dst_kb = os.path.getsize(src) / 1e3, os.path.getsize(dst) / 1e3
+        event(f"✅ Saved: {dst} ({len(gdf)} fitur, {len(topology['arcs'])} arc, "
+              f"{dst_kb:,.0f} KB vs GeoJSON {src_kb:,.0f} KB, x{src_kb / max(dst_kb, 1e-9):.1f})",
+              path=dst, rows=len(gdf), size_kb=round(dst_kb, 1), geojson_kb=round(src_kb, 1))
@@ -0,0 +1,127 @@
+"""
+Tabel exposure titik rawan banjir: jumlah bangunan, panjang jalan, dan jumlah
+tempat evakuasi dalam beberapa radius (default 250 m, 500 m, 1 km)
+Semua buffer (titik x radius) di-query sekaligus ke STRtree tiap layer,
+hasil pasangan (buffer, fitur) diagregasi dengan bincount tanpa loop per titik
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import shapely
+
+from building_metrics import to_utm
+from building_schema import load_buildings
+from instrument import span, event
+from region import REGION
+
+RADII_M = (250, 500, 1000)
+CHUNK_BUFFERS = 2000
+ID_COLUMNS = ("No", "Kecamatan", "Desa")  # kolom identitas titik dari get_floodpoint.py
+EXPOSURE_PATH = REGION.path("exposure_flood_points.csv")
+
+
+def utm_array(gdf):
+    return to_utm(np.asarray(gdf.geometry.values), gdf.crs or "EPSG:4326")
+
+
+def make_buffers(points_utm, radii=RADII_M):
+    # buffer urut: titik 0 semua radius, titik 1 semua radius, ...
+    n, k = len(points_utm), len(radii)
+    point_idx = np.repeat(np.arange(n), k)
+    radius = np.tile(np.asarray(radii, dtype=float), n)
+    return shapely.buffer(points_utm[point_idx], radius, quad_segs=16), point_idx, radius
+
+
+def count_within(tree, buffers, chunk=CHUNK_BUFFERS):
+    counts = np.zeros(len(buffers), dtype=np.int64)
+    for i in range(0, len(buffers), chunk):
+        buf_idx, _ = tree.query(buffers[i:i + chunk], predicate="intersects")
+        counts[i:i + chunk] += np.bincount(buf_idx, minlength=len(buffers[i:i + chunk]))
+    return counts
+
+
+def length_within(lines_utm, tree, buffers, chunk=CHUNK_BUFFERS):
+    # panjang jalan yang terpotong di dalam buffer
+    total = np.zeros(len(buffers))
+    for i in range(0, len(buffers), chunk):
+        part = buffers[i:i + chunk]
+        buf_idx, line_idx = tree.query(part, predicate="intersects")
+        if len(buf_idx) == 0:
+            continue
+        clipped = shapely.length(shapely.intersection(lines_utm[line_idx], part[buf_idx]))
+        total[i:i + chunk] += np.bincount(buf_idx, weights=clipped, minlength=len(part))
+    return total
+
+
+def undirected_edges(edges):
+    # graph drive menyimpan jalan dua arah sebagai u->v dan v->u, hitung sekali saja
+    idx = edges.index.to_frame(index=False)
+    u = np.minimum(idx["u"].values, idx["v"].values)
+    v = np.maximum(idx["u"].values, idx["v"].values)
+    keep = ~pd.DataFrame({"u": u, "v": v, "k": idx["key"].values}).duplicated().values
+    return edges[keep]
+
+
+def is_flood_shelter(evac):
+    # kolom turunan katalog layer jika sudah ada, selain itu klasifikasi col_12 (lihat layers.py)
+    if "is_flood_tsunami" in evac.columns:
+        return evac["is_flood_tsunami"].to_numpy(dtype=bool)
+    from layers import flood_tsunami
+    return flood_tsunami(evac)
+
+
+def exposure_table(flood, building=None, edges=None, evac=None, radii=RADII_M):
+    points_utm = utm_array(flood)
+    buffers, point_idx, radius = make_buffers(points_utm, radii)
+    table = pd.DataFrame({"point_id": point_idx, "radius_m": radius.astype(int)})
+
+    if building is not None:
+        with span("buildings", rows=len(building)):
+            tree = shapely.STRtree(utm_array(building))
+            table["buildings"] = count_within(tree, buffers)
+
+    if edges is not None:
+        with span("roads", rows=len(edges)):
+            lines = utm_array(edges)
+            table["road_length_m"] = length_within(lines, shapely.STRtree(lines), buffers).round(1)
+
+    if evac is not None:
+        with span("shelters", rows=len(evac)):
+            evac_utm = utm_array(evac)
+            table["shelters"] = count_within(shapely.STRtree(evac_utm), buffers)
+            flood_mask = is_flood_shelter(evac)
+            table["shelters_flood"] = count_within(shapely.STRtree(evac_utm[flood_mask]), buffers)
+
+    # atribut identitas titik (desa/kecamatan) ikut ke tabel
+    attrs = flood[[c for c in ID_COLUMNS if c in flood.columns]].reset_index(drop=True)
+    return attrs.iloc[point_idx].reset_index(drop=True).join(table)[
+        ["point_id"] + list(attrs.columns) + [c for c in table.columns if c != "point_id"]]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exposure bangunan/jalan/evakuasi per titik rawan banjir")
+    parser.add_argument("--radius", default=",".join(str(r) for r in RADII_M),
+                        help="radius (meter), pisahkan dengan koma")
+    parser.add_argument("--output", default=EXPOSURE_PATH)
+    args = parser.parse_args()
+    radii = tuple(int(r) for r in args.radius.split(",") if r.strip())
+
+    import osmnx as ox
+
+    with span("load"):
+        flood = gpd.read_file(REGION.path(f"{REGION.flood_name}.geojson"))
+        building = load_buildings(REGION.path("building.geojson"), columns=[])
+        edges = undirected_edges(ox.graph_to_gdfs(ox.load_graphml(REGION.path("road.graphml")), nodes=False))
+        evac = gpd.read_file(REGION.path("tempatevakuasinew.geojson"))
+    event(f"📍 {len(flood)} titik x {len(radii)} radius, {len(building)} bangunan, "
+          f"{len(edges)} ruas jalan, {len(evac)} tempat evakuasi")
+
+    with span("exposure", rows=len(flood) * len(radii)):
+        table = exposure_table(flood, building, edges, evac, radii)
+
+    table.to_csv(args.output, index=False)
+    event(f"✅ Saved: {args.output} ({len(table)} baris)", path=args.output, rows=len(table))
+    print(table.groupby("radius_m")[["buildings", "road_length_m", "shelters"]].sum())
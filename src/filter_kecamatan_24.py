@@ -1,115 +1,127 @@
 """
 Filter hanya 24 kecamatan yang termasuk Kabupaten Cilacap
+(region lain: daftar kecamatan dari region.py, jika kosong semua kecamatan dipakai)
 """
 
 import geopandas as gpd
-import matplotlib.pyplot as plt
+from instrument import span, event
+from region import REGION
+from export_topojson import write_topojson, topojson_path
 import os
 
-# Daftar 24 kecamatan resmi Kabupaten Cilacap
-KECAMATAN_CILACAP = [
-    'Adipala', 'Bantarsari', 'Binangun', 'Cilacap Selatan', 'Cilacap Tengah',
-    'Cilacap Utara', 'Cimanggu', 'Cipari', 'Dayeuhluhur', 'Gandrungmangu',
-    'Jeruklegi', 'Kampung Laut', 'Karangpucung', 'Kawunganten', 'Kedungreja',
-    'Kesugihan', 'Kroya', 'Majenang', 'Maos', 'Nusawungu', 'Patimuan',
-    'Sampang', 'Sidareja', 'Wanareja'
-]
-
-print("🔄 Loading data BPS...")
-gdf = gpd.read_file('data_processed/kecamatan_cilacap_bps.geojson')
-print(f"   Total kecamatan di file: {len(gdf)}")
-
-# Filter hanya 24 kecamatan Cilacap
-print(f"\n✂️  Filtering hanya 24 kecamatan Kabupaten Cilacap...")
-gdf_filtered = gdf[gdf['kecamatan'].isin(KECAMATAN_CILACAP)].copy()
-print(f"   Hasil filter: {len(gdf_filtered)} kecamatan")
+# Daftar kecamatan resmi region (24 kecamatan untuk Kabupaten Cilacap)
+KECAMATAN = list(REGION.kecamatan)
+MAP_NAME = f"kecamatan_map_{len(KECAMATAN) or 'all'}.png"  # kecamatan_map_24.png untuk Cilacap
+
+event("🔄 Loading data BPS...")
+with span("load") as s:
+    gdf = gpd.read_file(REGION.path(f'kecamatan_{REGION.slug}_bps.geojson'))
+    s.set(rows=len(gdf))
+event(f"   Total kecamatan di file: {len(gdf)}")
+
+# Filter hanya kecamatan resmi region
+event(f"\n✂️  Filtering hanya {len(KECAMATAN) or 'semua'} kecamatan {REGION.title}...")
+with span("filter", rows=len(gdf)):
+    if KECAMATAN:
+        gdf_filtered = gdf[gdf['kecamatan'].isin(KECAMATAN)].copy()
+    else:
+        gdf_filtered = gdf.copy()
+event(f"   Hasil filter: {len(gdf_filtered)} kecamatan")
 
 # Check kecamatan yang hilang
-missing = set(KECAMATAN_CILACAP) - set(gdf_filtered['kecamatan'])
+missing = set(KECAMATAN) - set(gdf_filtered['kecamatan'])
 if missing:
-    print(f"\n⚠️  Kecamatan yang tidak ditemukan di data BPS:")
+    event(f"\n⚠️  Kecamatan yang tidak ditemukan di data BPS:")
     for kec in sorted(missing):
-        print(f"      - {kec}")
+        event(f"      - {kec}")
 
 # Check kecamatan yang ditemukan
-print(f"\n✓ Kecamatan yang ditemukan ({len(gdf_filtered)}):")
+event(f"\n✓ Kecamatan yang ditemukan ({len(gdf_filtered)}):")
 for idx, kec in enumerate(sorted(gdf_filtered['kecamatan']), 1):
-    print(f"   {idx:2d}. {kec}")
+    event(f"   {idx:2d}. {kec}")
 
 # Sort alphabetically
 gdf_filtered = gdf_filtered.sort_values('kecamatan').reset_index(drop=True)
 
 # Save filtered data
-output_dir = 'data_processed'
-geojson_path = os.path.join(output_dir, 'kecamatan_cilacap_24.geojson')
-gdf_filtered.to_file(geojson_path, driver='GeoJSON')
-print(f"\n✅ Saved: {geojson_path}")
+output_dir = REGION.output_dir
+with span("write", rows=len(gdf_filtered)):
+    geojson_path = os.path.join(output_dir, f'{REGION.kecamatan_name}.geojson')
+    gdf_filtered.to_file(geojson_path, driver='GeoJSON')
+    event(f"\n✅ Saved: {geojson_path}")
+
+    shp_path = os.path.join(output_dir, f'{REGION.kecamatan_name}.shp')
+    gdf_filtered.to_file(shp_path)
+    event(f"✅ Saved: {shp_path}")
 
-shp_path = os.path.join(output_dir, 'kecamatan_cilacap_24.shp')
-gdf_filtered.to_file(shp_path)
-print(f"✅ Saved: {shp_path}")
+    topo_path = topojson_path(geojson_path)
+    write_topojson(gdf_filtered, topo_path)
+    event(f"✅ Saved: {topo_path}")
 
 # Visualisasi
-print("\n🎨 Generating visualization...")
-fig, ax = plt.subplots(figsize=(16, 18))
-
-gdf_filtered.plot(
-    ax=ax,
-    column='kecamatan',
-    cmap='tab20',
-    edgecolor='black',
-    linewidth=1.5,
-    legend=False
-)
-
-# Add labels
-for idx, row in gdf_filtered.iterrows():
-    try:
-        point = row.geometry.representative_point()
-        ax.text(
-            point.x, point.y,
-            row['kecamatan'],
-            fontsize=9,
-            ha='center',
-            va='center',
-            bbox=dict(boxstyle='round,pad=0.3', facecolor='white', alpha=0.8, edgecolor='gray')
-        )
-    except Exception as e:
-        print(f"  Warning: Cannot label {row['kecamatan']}: {e}")
-
-# Styling
-ax.set_title('Peta 24 Kecamatan - Kabupaten Cilacap\n(Data BPS)', 
-             fontsize=16, fontweight='bold', pad=20)
-ax.set_xlabel('Longitude', fontsize=12)
-ax.set_ylabel('Latitude', fontsize=12)
-ax.grid(True, alpha=0.3, linestyle='--', linewidth=0.5)
-
-# North arrow
-x, y = 0.95, 0.95
-ax.annotate('N', xy=(x, y), xytext=(x, y-0.08),
-            xycoords='axes fraction',
-            fontsize=20, fontweight='bold',
-            ha='center', va='center',
-            arrowprops=dict(arrowstyle='->', lw=2, color='black'))
-
-# Legend
-ax.text(0.02, 0.98, f'Jumlah Kecamatan: {len(gdf_filtered)}',
-        transform=ax.transAxes,
-        fontsize=12, fontweight='bold',
-        verticalalignment='top',
-        bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
-
-plt.tight_layout()
-
-vis_path = os.path.join(output_dir, 'kecamatan_map_24.png')
-plt.savefig(vis_path, dpi=300, bbox_inches='tight')
-print(f"✅ Saved: {vis_path}")
-
-plt.close()
-
-print("\n" + "="*60)
-print("✅ SELESAI!")
-print(f"   {len(gdf_filtered)} dari 24 kecamatan berhasil diproses")
+event("\n🎨 Generating visualization...")
+with span("render", rows=len(gdf_filtered)):
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(16, 18))
+
+    gdf_filtered.plot(
+        ax=ax,
+        column='kecamatan',
+        cmap='tab20',
+        edgecolor='black',
+        linewidth=1.5,
+        legend=False
+    )
+
+    # Add labels
+    for idx, row in gdf_filtered.iterrows():
+        try:
+            point = row.geometry.representative_point()
+            ax.text(
+                point.x, point.y,
+                row['kecamatan'],
+                fontsize=9,
+                ha='center',
+                va='center',
+                bbox=dict(boxstyle='round,pad=0.3', facecolor='white', alpha=0.8, edgecolor='gray')
+            )
+        except Exception as e:
+            event(f"  Warning: Cannot label {row['kecamatan']}: {e}")
+
+    # Styling
+    ax.set_title(f'Peta {len(gdf_filtered)} Kecamatan - {REGION.title}\n(Data BPS)', 
+                 fontsize=16, fontweight='bold', pad=20)
+    ax.set_xlabel('Longitude', fontsize=12)
+    ax.set_ylabel('Latitude', fontsize=12)
+    ax.grid(True, alpha=0.3, linestyle='--', linewidth=0.5)
+
+    # North arrow
+    x, y = 0.95, 0.95
+    ax.annotate('N', xy=(x, y), xytext=(x, y-0.08),
+                xycoords='axes fraction',
+                fontsize=20, fontweight='bold',
+                ha='center', va='center',
+                arrowprops=dict(arrowstyle='->', lw=2, color='black'))
+
+    # Legend
+    ax.text(0.02, 0.98, f'Jumlah Kecamatan: {len(gdf_filtered)}',
+            transform=ax.transAxes,
+            fontsize=12, fontweight='bold',
+            verticalalignment='top',
+            bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
+
+    plt.tight_layout()
+
+    vis_path = os.path.join(output_dir, MAP_NAME)
+    plt.savefig(vis_path, dpi=300, bbox_inches='tight')
+    event(f"✅ Saved: {vis_path}")
+
+    plt.close()
+
+event("\n" + "="*60)
+event("✅ SELESAI!")
+event(f"   {len(gdf_filtered)} dari {len(KECAMATAN) or len(gdf)} kecamatan berhasil diproses")
 if missing:
-    print(f"   {len(missing)} kecamatan tidak ditemukan di data BPS")
-print("="*60)
+    event(f"   {len(missing)} kecamatan tidak ditemukan di data BPS")
+event("="*60)
@@ -0,0 +1,151 @@
+"""
+Validasi geofence titik (banjir/evakuasi) terhadap batas kabupaten dan polygon kecamatan
+Semua titik diuji sekaligus (shapely.intersects_xy pada polygon yang sudah di-prepare,
+STRtree untuk kecamatan), jadi tetap cepat untuk jutaan baris. Dalam satu pass:
+  - koordinat di luar -90..90 / -180..180                 -> out_of_range
+  - di luar batas kabupaten, tapi (lon, lat) ditukar masuk -> swapped (dibetulkan, tetap dipakai)
+  - di luar batas kabupaten (lebih dari TOLERANCE_M)      -> outside_boundary
+  - titik yang lolos ditandai nama kecamatannya (kolom kecamatan_spasial)
+
+Dipakai get_floodpoint.py dan get_evac_point.py; bisa juga memvalidasi ulang GeoJSON titik.
+
+Contoh:
+  python src/geofence.py --input data_processed/tempatevakuasinew.geojson
+  python src/geofence.py --input data_processed/Data_Desa_Rawan_Banjir_di_Cilacap.geojson --tolerance 500
+"""
+
+import os
+import argparse
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import shapely
+
+from instrument import span, event
+from region import REGION
+
+TOLERANCE_M = 200  # titik pantai / tepat di garis batas masih diterima
+DEG_M = 111_320.0
+KECAMATAN_COLUMN = "kecamatan_spasial"
+PASS = ("ok", "swapped")
+
+
+def fence_paths():
+    kecamatan = REGION.path(f"{REGION.kecamatan_name}.geojson")
+    if not os.path.exists(kecamatan):
+        kecamatan = REGION.path(f"kecamatan_{REGION.slug}_bps.geojson")
+    return REGION.path("boundary.geojson"), kecamatan
+
+
+def load_fence(boundary_path=None, kecamatan_path=None):
+    # (geometri batas kabupaten ter-prepare atau None, GeoDataFrame kecamatan atau None)
+    default_boundary, default_kecamatan = fence_paths()
+    boundary_path = boundary_path or default_boundary
+    kecamatan_path = kecamatan_path or default_kecamatan
+    kecamatan = None
+    if os.path.exists(kecamatan_path):
+        kecamatan = gpd.read_file(kecamatan_path).to_crs("EPSG:4326")
+    if os.path.exists(boundary_path):
+        boundary = shapely.union_all(gpd.read_file(boundary_path).to_crs("EPSG:4326").geometry.values)
+    elif kecamatan is not None:
+        boundary = shapely.union_all(kecamatan.geometry.values)
+    else:
+        return None, None
+    shapely.prepare(boundary)
+    return boundary, kecamatan
+
+
+def _inside(boundary, lon, lat, tol_deg):
+    # di dalam batas (termasuk garis batas); sisanya dicek ulang dengan toleransi jarak
+    inside = shapely.intersects_xy(boundary, lon, lat)
+    rest = np.flatnonzero(~inside)
+    if len(rest) and tol_deg > 0:
+        inside[rest] = shapely.dwithin(boundary, shapely.points(lon[rest], lat[rest]), tol_deg)
+    return inside
+
+
+def tag_kecamatan(lon, lat, kecamatan, tol_deg=0.0):
+    # nama kecamatan per titik; titik di celah/di luar polygon -> kecamatan terdekat dalam toleransi
+    names = kecamatan["kecamatan"].astype(str).to_numpy() if "kecamatan" in kecamatan.columns \
+        else kecamatan.index.astype(str).to_numpy()
+    out = np.full(len(lon), None, dtype=object)
+    if not len(lon):
+        return out
+    points = shapely.points(lon, lat)
+    tree = shapely.STRtree(kecamatan.geometry.values)
+    pt, poly = tree.query(points, predicate="intersects")
+    first = np.unique(pt, return_index=True)[1]
+    out[pt[first]] = names[poly[first]]
+    missing = np.flatnonzero(pd.isna(out))
+    if len(missing) and tol_deg > 0:
+        pt, poly = tree.query_nearest(points[missing], max_distance=tol_deg)
+        first = np.unique(pt, return_index=True)[1]
+        out[missing[pt[first]]] = names[poly[first]]
+    return out
+
+
+def validate_points(lon, lat, boundary, kecamatan=None, tolerance_m=TOLERANCE_M):
+    # DataFrame sejajar input: lon, lat (sudah dibetulkan jika tertukar), geofence, kecamatan_spasial
+    lon = np.asarray(lon, dtype=float).copy()
+    lat = np.asarray(lat, dtype=float).copy()
+    tol_deg = tolerance_m / DEG_M
+    status = np.full(len(lon), "out_of_range", dtype=object)
+    finite = np.isfinite(lon) & np.isfinite(lat)
+    in_range = finite & (np.abs(lat) <= 90) & (np.abs(lon) <= 180)
+    idx = np.flatnonzero(in_range)
+    if boundary is None:
+        status[idx] = "ok"
+    else:
+        inside = _inside(boundary, lon[idx], lat[idx], tol_deg)
+        status[idx[~inside]] = "outside_boundary"
+        status[idx[inside]] = "ok"
+        # lat/lon tertukar: (lat, lon) sebagai (x, y) jatuh di dalam batas (bisa juga lat > 90)
+        cand = np.flatnonzero(finite & (status != "ok") & (np.abs(lon) <= 90) & (np.abs(lat) <= 180))
+        if len(cand):
+            fix = cand[_inside(boundary, lat[cand], lon[cand], tol_deg)]
+            status[fix] = "swapped"
+            lon[fix], lat[fix] = lat[fix], lon[fix]
+
+    tags = np.full(len(lon), None, dtype=object)
+    if kecamatan is not None:
+        ok = np.flatnonzero(np.isin(status, PASS))
+        tags[ok] = tag_kecamatan(lon[ok], lat[ok], kecamatan, tol_deg)
+    return pd.DataFrame({"lon": lon, "lat": lat, "geofence": status, KECAMATAN_COLUMN: tags})
+
+
+def split_geofence(df, lon_col="__lon", lat_col="__lat", fence=None, tolerance_m=TOLERANCE_M):
+    # (baris lolos dengan koordinat terkoreksi, baris gagal + kolom geofence, hasil validasi baris lolos)
+    boundary, kecamatan = fence if fence is not None else load_fence()
+    if boundary is None:
+        event("  ⚠️  boundary/kecamatan tidak ditemukan, geofence hanya cek range koordinat")
+    checked = validate_points(df[lon_col].to_numpy(), df[lat_col].to_numpy(), boundary, kecamatan, tolerance_m)
+    checked.index = df.index
+    mask = checked["geofence"].isin(PASS).to_numpy()
+    kept = df[mask].copy()
+    kept[lon_col] = checked["lon"][mask]
+    kept[lat_col] = checked["lat"][mask]
+    failed = df[~mask].assign(geofence=checked["geofence"][~mask])
+    counts = checked["geofence"].value_counts().to_dict()
+    event(f"  geofence: {counts}", **{str(k): int(v) for k, v in counts.items()})
+    return kept, failed, checked[mask]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validasi geofence titik terhadap batas kabupaten/kecamatan")
+    parser.add_argument("--input", required=True, help="GeoJSON titik")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE_M, help="toleransi di luar batas (meter)")
+    parser.add_argument("--output", help="CSV hasil per titik (default <input>_geofence.csv)")
+    args = parser.parse_args()
+
+    with span("load") as s:
+        points = gpd.read_file(args.input).to_crs("EPSG:4326")
+        fence = load_fence()
+        s.set(rows=len(points))
+    with span("validate", rows=len(points)):
+        xy = shapely.get_coordinates(points.geometry.values)
+        checked = validate_points(xy[:, 0], xy[:, 1], *fence, tolerance_m=args.tolerance)
+    output = args.output or os.path.splitext(args.input)[0] + "_geofence.csv"
+    checked.to_csv(output, index_label="row")
+    counts = checked["geofence"].value_counts().to_dict()
+    event(f"✅ Saved: {output} {counts}", path=output, rows=len(checked), **{str(k): int(v) for k, v in counts.items()})
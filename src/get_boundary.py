@@ -1,38 +1,47 @@
 import os
 import osmnx as ox
-import matplotlib.pyplot as plt
-from matplotlib.lines import Line2D
+from instrument import span, event
+from region import REGION
 
 ox.settings.log_console = True
 ox.settings.use_cache = True
 
-area = "Kabupaten Cilacap, Jawa Tengah, Indonesia"
-boundary = ox.geocode_to_gdf(area)
+area = REGION.area
+boundary_path = REGION.path("boundary.geojson")
+with span("fetch") as s:
+    boundary = ox.geocode_to_gdf(area)
+    s.set(rows=len(boundary))
 
-os.makedirs("data_processed", exist_ok=True)
-boundary.to_file("data_processed/boundary.geojson", driver="GeoJSON")
+os.makedirs(REGION.output_dir, exist_ok=True)
+with span("write_geojson", rows=len(boundary)):
+    boundary.to_file(boundary_path, driver="GeoJSON")
+event(f"✅ Saved: {boundary_path}", path=boundary_path, features=len(boundary))
 
 print(boundary)
 
 # Plot 
-fig, ax = plt.subplots(figsize=(10, 8))
-boundary.plot(ax=ax, facecolor="none", edgecolor="#000000", linewidth=2)
-
-# Legend
-legend_handles = [
-    Line2D([0], [0], color="#000000", lw=2, label="Boundary")
-]
-ax.legend(handles=legend_handles, loc="lower left", frameon=True, fontsize=10)
-
-# North arrow
-nx, ny = 0.95, 0.15
-ax.annotate('', xy=(nx, ny + 0.12), xytext=(nx, ny),
-            xycoords='axes fraction',
-            arrowprops=dict(facecolor='k', width=2, headwidth=8))
-ax.text(nx, ny + 0.135, 'N', transform=ax.transAxes,
-        ha='center', va='bottom', fontsize=12, fontweight='bold')
-
-ax.set_title("Boundary - Kabupaten Cilacap", fontsize=14)
-ax.set_axis_off()
-plt.tight_layout()
+with span("render"):
+    import matplotlib.pyplot as plt
+    from matplotlib.lines import Line2D
+
+    fig, ax = plt.subplots(figsize=(10, 8))
+    boundary.plot(ax=ax, facecolor="none", edgecolor="#000000", linewidth=2)
+
+    # Legend
+    legend_handles = [
+        Line2D([0], [0], color="#000000", lw=2, label="Boundary")
+    ]
+    ax.legend(handles=legend_handles, loc="lower left", frameon=True, fontsize=10)
+
+    # North arrow
+    nx, ny = 0.95, 0.15
+    ax.annotate('', xy=(nx, ny + 0.12), xytext=(nx, ny),
+                xycoords='axes fraction',
+                arrowprops=dict(facecolor='k', width=2, headwidth=8))
+    ax.text(nx, ny + 0.135, 'N', transform=ax.transAxes,
+            ha='center', va='bottom', fontsize=12, fontweight='bold')
+
+    ax.set_title(f"Boundary - {REGION.title}", fontsize=14)
+    ax.set_axis_off()
+    plt.tight_layout()
 plt.show()
\ No newline at end of file
@@ -1,10 +1,12 @@
 import os
 import pandas as pd
 import geopandas as gpd
-from shapely.geometry import Point
+from geofence import split_geofence, KECAMATAN_COLUMN
+from instrument import span, event
+from region import REGION
 
-DATA_RAW = "data_raw"
-OUTPUT_DIR = "data_processed"
+DATA_RAW = REGION.raw_dir
+OUTPUT_DIR = REGION.output_dir
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 LAT_CAND = {"lat", "latitude", "y", "LAT", "Latitude", "Lat"}
@@ -75,78 +77,87 @@ def detect_latlon_by_values(df, sample_n=50):
 # Hanya proses file tempatevakuasinew.csv
 evac_file = os.path.join(DATA_RAW, "tempatevakuasinew.csv")
 if not os.path.exists(evac_file):
-    print(f"File tidak ditemukan: {evac_file}")
+    event(f"File tidak ditemukan: {evac_file}")
     exit(1)
 
 path = evac_file
 name = os.path.splitext(os.path.basename(path))[0]
-print("PROCESS:", path)
+event("PROCESS:", path, path=path)
 
 # Baca CSV dengan header di baris pertama (row 0)
 # File tempatevakuasinew.csv tidak memiliki header, baca tanpa header
 try:
-    df = pd.read_csv(path, header=None, encoding="utf-8", low_memory=False)
-    print("  read without header, shape:", df.shape)
+    with span("read_csv") as s:
+        df = pd.read_csv(path, header=None, encoding="utf-8", low_memory=False)
+        s.set(rows=len(df))
+    event("  read without header, shape:", df.shape)
     # Manual mapping: kolom 3 = Latitude, kolom 4 = Longitude (index 0-based)
     lat_col = 3
     lon_col = 4
-    print(f"  using manual mapping: lat=column {lat_col}, lon=column {lon_col}")
+    event(f"  using manual mapping: lat=column {lat_col}, lon=column {lon_col}", lat=lat_col, lon=lon_col)
 except Exception as e:
-    print("  failed to read:", e)
+    event("  failed to read:", e, error=str(e))
     exit(1)
 
-# ensure columns exist in df
-try:
-    df[lat_col] = df[lat_col].apply(try_float)
-    df[lon_col] = df[lon_col].apply(try_float)
-except Exception:
-    print("  failed applying clean on detected columns; exiting")
-    exit(1)
-
-# report invalid
-invalid = df[df[[lat_col, lon_col]].isnull().any(axis=1)]
-if not invalid.empty:
-    inv_path = os.path.join(OUTPUT_DIR, f"{name}_invalid_coords.csv")
-    invalid.to_csv(inv_path, index=False)
-    print(f"  saved invalid rows to {inv_path} ({len(invalid)})")
-
-# keep only valid rows
-df_valid = df.dropna(subset=[lat_col, lon_col]).copy()
-df_valid["__lat"] = df_valid[lat_col].astype(float)
-df_valid["__lon"] = df_valid[lon_col].astype(float)
-
-# validate ranges
-mask = df_valid["__lat"].between(-90, 90) & df_valid["__lon"].between(-180, 180)
-bad_range = df_valid[~mask]
-if not bad_range.empty:
-    br_path = os.path.join(OUTPUT_DIR, f"{name}_out_of_range.csv")
-    bad_range.to_csv(br_path, index=False)
-    print(f"  saved out-of-range rows to {br_path} ({len(bad_range)})")
-df_valid = df_valid[mask]
-
-# drop duplicates (exact coords)
-df_valid = df_valid.drop_duplicates(subset=["__lat","__lon"])
+with span("clean", rows=len(df)) as clean:
+    # ensure columns exist in df
+    try:
+        df[lat_col] = df[lat_col].apply(try_float)
+        df[lon_col] = df[lon_col].apply(try_float)
+    except Exception:
+        event("  failed applying clean on detected columns; exiting")
+        exit(1)
+
+    # report invalid
+    invalid = df[df[[lat_col, lon_col]].isnull().any(axis=1)]
+    if not invalid.empty:
+        inv_path = os.path.join(OUTPUT_DIR, f"{name}_invalid_coords.csv")
+        invalid.to_csv(inv_path, index=False)
+        event(f"  saved invalid rows to {inv_path} ({len(invalid)})", path=inv_path, rows=len(invalid))
+
+    # keep only valid rows
+    df_valid = df.dropna(subset=[lat_col, lon_col]).copy()
+    df_valid["__lat"] = df_valid[lat_col].astype(float)
+    df_valid["__lon"] = df_valid[lon_col].astype(float)
+
+    # validate ranges + geofence (di dalam batas kabupaten, lat/lon tertukar), tag kecamatan
+    df_valid, bad_range, fence = split_geofence(df_valid)
+    df_valid[lat_col], df_valid[lon_col] = df_valid["__lat"], df_valid["__lon"]
+    if not bad_range.empty:
+        br_path = os.path.join(OUTPUT_DIR, f"{name}_out_of_range.csv")
+        bad_range.to_csv(br_path, index=False)
+        event(f"  saved out-of-range rows to {br_path} ({len(bad_range)})", path=br_path, rows=len(bad_range))
+
+    # drop duplicates (exact coords)
+    keep = ~df_valid.duplicated(subset=["__lat","__lon"]).to_numpy()
+    df_valid, fence = df_valid[keep], fence[keep]
+    clean.set(valid=len(df_valid))
 
 # build GeoDataFrame and save
-geometry = [Point(xy) for xy in zip(df_valid["__lon"], df_valid["__lat"])]
-try:
-    # Konversi semua kolom non-geometry ke string untuk kompatibilitas GeoJSON
-    df_export = df_valid.drop(columns=["__lat","__lon"]).copy()
+with span("build_geodataframe", rows=len(df_valid)):
+    geometry = gpd.points_from_xy(df_valid["__lon"], df_valid["__lat"])
+    try:
+        # Konversi semua kolom non-geometry ke string untuk kompatibilitas GeoJSON
+        df_export = df_valid.drop(columns=["__lat","__lon"]).copy()
     
-    # Rename kolom integer menjadi string (penting untuk GeoJSON)
-    df_export.columns = [f"col_{i}" for i in range(len(df_export.columns))]
+        # Rename kolom integer menjadi string (penting untuk GeoJSON)
+        df_export.columns = [f"col_{i}" for i in range(len(df_export.columns))]
     
-    # Konversi nilai kolom ke string
-    for col in df_export.columns:
-        df_export[col] = df_export[col].astype(str)
+        # Konversi nilai kolom ke string
+        for col in df_export.columns:
+            df_export[col] = df_export[col].astype(str)
     
-    gdf = gpd.GeoDataFrame(df_export, geometry=geometry, crs="EPSG:4326")
-except Exception as e:
-    print(f"  warning: {e}, creating minimal GeoDataFrame")
-    # fallback: keep only minimal columns if geopandas fails on dtype issues
-    gdf = gpd.GeoDataFrame({"id": range(len(geometry))}, geometry=geometry, crs="EPSG:4326")
+        gdf = gpd.GeoDataFrame(df_export, geometry=geometry, crs="EPSG:4326")
+    except Exception as e:
+        event(f"  warning: {e}, creating minimal GeoDataFrame", error=str(e))
+        # fallback: keep only minimal columns if geopandas fails on dtype issues
+        gdf = gpd.GeoDataFrame({"id": range(len(geometry))}, geometry=geometry, crs="EPSG:4326")
+    # hasil geofence (setelah rename col_*): kecamatan dari polygon + status (ok / swapped)
+    gdf[KECAMATAN_COLUMN] = fence[KECAMATAN_COLUMN].to_numpy()
+    gdf["geofence"] = fence["geofence"].to_numpy()
 
 out_path = os.path.join(OUTPUT_DIR, f"{name}.geojson")
-gdf.to_file(out_path, driver="GeoJSON")
-print("  saved:", out_path, "features:", len(gdf))
+with span("write_geojson", rows=len(gdf)):
+    gdf.to_file(out_path, driver="GeoJSON")
+event("  saved:", out_path, "features:", len(gdf), path=out_path, features=len(gdf))
 
@@ -2,10 +2,12 @@ import os
 import glob
 import pandas as pd
 import geopandas as gpd
-from shapely.geometry import Point
+from geofence import split_geofence, KECAMATAN_COLUMN
+from instrument import span, event
+from region import REGION
 
-DATA_RAW = "data_raw"
-OUTPUT_DIR = "data_processed"
+DATA_RAW = REGION.raw_dir
+OUTPUT_DIR = REGION.output_dir
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 LAT_CAND = {"lat", "latitude", "y", "LAT", "Latitude", "Lat"}
@@ -84,22 +86,24 @@ def header_looks_like_data(cols, threshold=2):
             continue
     return count >= threshold
 
-# Hanya proses file Data_Desa_Rawan_Banjir_di_Cilacap.xlsx
-flood_file = os.path.join(DATA_RAW, "Data_Desa_Rawan_Banjir_di_Cilacap.xlsx")
+# Hanya proses file Data_Desa_Rawan_Banjir_di_<Region>.xlsx (Cilacap: Data_Desa_Rawan_Banjir_di_Cilacap.xlsx)
+flood_file = os.path.join(DATA_RAW, f"{REGION.flood_name}.xlsx")
 if not os.path.exists(flood_file):
-    print(f"File tidak ditemukan: {flood_file}")
+    event(f"File tidak ditemukan: {flood_file}")
     exit(1)
 
 path = flood_file
 name = os.path.splitext(os.path.basename(path))[0]
-print("PROCESS:", path)
+event("PROCESS:", path, path=path)
 
 # Baca Excel dengan header di baris pertama (row 0)
 try:
-    df = pd.read_excel(path, header=0)
-    print("  columns:", list(df.columns)[:15])
+    with span("read_excel") as s:
+        df = pd.read_excel(path, header=0)
+        s.set(rows=len(df))
+    event("  columns:", list(df.columns)[:15])
 except Exception as e:
-    print("  failed to read:", e)
+    event("  failed to read:", e, error=str(e))
     exit(1)
 
 # 1) try by column names (common headers)
@@ -109,50 +113,63 @@ lat_col, lon_col = find_latlon_by_names(df.columns)
 if not lat_col or not lon_col:
     lat_col, lon_col = detect_latlon_by_values(df)
     if lat_col and lon_col:
-        print(f"  detected lat/lon by values: lat='{lat_col}' lon='{lon_col}'")
+        event(f"  detected lat/lon by values: lat='{lat_col}' lon='{lon_col}'", lat=lat_col, lon=lon_col)
     else:
-        print(f"  NO lat/lon detected for {name}. Available columns: {list(df.columns)[:20]}")
+        event(f"  NO lat/lon detected for {name}. Available columns: {list(df.columns)[:20]}")
         exit(1)
 
-# ensure columns exist in df (if header=None columns are integers)
-try:
-    df[lat_col] = df[lat_col].apply(try_float)
-    df[lon_col] = df[lon_col].apply(try_float)
-except Exception:
-    print("  failed applying clean on detected columns; exiting")
-    exit(1)
+with span("clean", rows=len(df)) as clean:
+    # ensure columns exist in df (if header=None columns are integers)
+    try:
+        df[lat_col] = df[lat_col].apply(try_float)
+        df[lon_col] = df[lon_col].apply(try_float)
+    except Exception:
+        event("  failed applying clean on detected columns; exiting")
+        exit(1)
 
-# report invalid
-invalid = df[df[[lat_col, lon_col]].isnull().any(axis=1)]
-if not invalid.empty:
-    inv_path = os.path.join(OUTPUT_DIR, f"{name}_invalid_coords.csv")
-    invalid.to_csv(inv_path, index=False)
-    print(f"  saved invalid rows to {inv_path} ({len(invalid)})")
-
-# keep only valid rows
-df_valid = df.dropna(subset=[lat_col, lon_col]).copy()
-df_valid["__lat"] = df_valid[lat_col].astype(float)
-df_valid["__lon"] = df_valid[lon_col].astype(float)
-
-# validate ranges
-mask = df_valid["__lat"].between(-90, 90) & df_valid["__lon"].between(-180, 180)
-bad_range = df_valid[~mask]
-if not bad_range.empty:
-    br_path = os.path.join(OUTPUT_DIR, f"{name}_out_of_range.csv")
-    bad_range.to_csv(br_path, index=False)
-    print(f"  saved out-of-range rows to {br_path} ({len(bad_range)})")
-df_valid = df_valid[mask]
-
-# drop duplicates (exact coords)
-df_valid = df_valid.drop_duplicates(subset=["__lat","__lon"])
+    # report invalid
+    invalid = df[df[[lat_col, lon_col]].isnull().any(axis=1)]
+    if not invalid.empty:
+        inv_path = os.path.join(OUTPUT_DIR, f"{name}_invalid_coords.csv")
+        invalid.to_csv(inv_path, index=False)
+        event(f"  saved invalid rows to {inv_path} ({len(invalid)})", path=inv_path, rows=len(invalid))
+
+    # keep only valid rows
+    df_valid = df.dropna(subset=[lat_col, lon_col]).copy()
+    df_valid["__lat"] = df_valid[lat_col].astype(float)
+    df_valid["__lon"] = df_valid[lon_col].astype(float)
+
+    # validate ranges + geofence (di dalam batas kabupaten, lat/lon tertukar), tag kecamatan
+    df_valid, bad_range, fence = split_geofence(df_valid)
+    df_valid[lat_col], df_valid[lon_col] = df_valid["__lat"], df_valid["__lon"]
+    if not bad_range.empty:
+        br_path = os.path.join(OUTPUT_DIR, f"{name}_out_of_range.csv")
+        bad_range.to_csv(br_path, index=False)
+        event(f"  saved out-of-range rows to {br_path} ({len(bad_range)})", path=br_path, rows=len(bad_range))
+
+    # drop duplicates (exact coords)
+    keep = ~df_valid.duplicated(subset=["__lat","__lon"]).to_numpy()
+    df_valid, fence = df_valid[keep], fence[keep]
+    clean.set(valid=len(df_valid))
 
 # build GeoDataFrame and save
-geometry = [Point(xy) for xy in zip(df_valid["__lon"], df_valid["__lat"])]
-try:
-    gdf = gpd.GeoDataFrame(df_valid.drop(columns=["__lat","__lon"]), geometry=geometry, crs="EPSG:4326")
-except Exception:
-    # fallback: keep only minimal columns if geopandas fails on dtype issues
-    gdf = gpd.GeoDataFrame(df_valid.loc[:, []], geometry=geometry, crs="EPSG:4326")
+with span("build_geodataframe", rows=len(df_valid)):
+    geometry = gpd.points_from_xy(df_valid["__lon"], df_valid["__lat"])
+    try:
+        gdf = gpd.GeoDataFrame(df_valid.drop(columns=["__lat","__lon"]), geometry=geometry, crs="EPSG:4326")
+    except Exception:
+        # fallback: keep only minimal columns if geopandas fails on dtype issues
+        gdf = gpd.GeoDataFrame(df_valid.loc[:, []], geometry=geometry, crs="EPSG:4326")
+    # hasil geofence: kecamatan dari polygon + status (ok / swapped = lat/lon dibetulkan)
+    gdf[KECAMATAN_COLUMN] = fence[KECAMATAN_COLUMN].to_numpy()
+    gdf["geofence"] = fence["geofence"].to_numpy()
+    if "Kecamatan" in gdf.columns:
+        tabel = gdf["Kecamatan"].astype(str).str.strip().str.upper()
+        spasial = gdf[KECAMATAN_COLUMN].astype(str).str.strip().str.upper()
+        mismatch = int((gdf[KECAMATAN_COLUMN].notna() & (tabel != spasial)).sum())
+        if mismatch:
+            event(f"  ⚠️  {mismatch} titik: kolom Kecamatan berbeda dengan polygon kecamatan", mismatch=mismatch)
 out_path = os.path.join(OUTPUT_DIR, f"{name}.geojson")
-gdf.to_file(out_path, driver="GeoJSON")
-print("  saved:", out_path, "features:", len(gdf))
\ No newline at end of file
+with span("write_geojson", rows=len(gdf)):
+    gdf.to_file(out_path, driver="GeoJSON")
+event("  saved:", out_path, "features:", len(gdf), path=out_path, features=len(gdf))
\ No newline at end of file
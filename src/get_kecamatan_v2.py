@@ -6,29 +6,33 @@ Alternative approach yang lebih reliable dari geocoding by name
 import osmnx as ox
 import geopandas as gpd
 import matplotlib.pyplot as plt
+from instrument import span, event
+from region import REGION
 import os
 
 # Setup output directory
-os.makedirs('data_processed', exist_ok=True)
+os.makedirs(REGION.output_dir, exist_ok=True)
 
-print("Mengambil semua kecamatan (admin_level=7) di Kabupaten Cilacap...")
+event(f"Mengambil semua kecamatan (admin_level=7) di {REGION.title}...")
 
 try:
     # Query semua administrative boundaries level 7 (kecamatan) dalam Kabupaten Cilacap
     # admin_level=7 adalah level kecamatan di Indonesia
-    kecamatan_gdf = ox.features_from_place(
-        "Kabupaten Cilacap, Jawa Tengah, Indonesia",
-        tags={
-            "admin_level": "7",  # Level kecamatan
-            "boundary": "administrative"
-        }
-    )
-    
-    print(f"✓ Berhasil mengambil {len(kecamatan_gdf)} kecamatan")
+    with span("fetch") as s:
+        kecamatan_gdf = ox.features_from_place(
+            REGION.area,
+            tags={
+                "admin_level": "7",  # Level kecamatan
+                "boundary": "administrative"
+            }
+        )
+        s.set(rows=len(kecamatan_gdf))
+    
+    event(f"✓ Berhasil mengambil {len(kecamatan_gdf)} kecamatan")
     
     # Filter hanya geometry Polygon/MultiPolygon
     kecamatan_gdf = kecamatan_gdf[kecamatan_gdf.geometry.type.isin(['Polygon', 'MultiPolygon'])]
-    print(f"  Setelah filter geometry: {len(kecamatan_gdf)} kecamatan")
+    event(f"  Setelah filter geometry: {len(kecamatan_gdf)} kecamatan")
     
     # Filter: hanya yang punya 'name' dan exclude dusun/RW/kantor
     if 'name' in kecamatan_gdf.columns:
@@ -46,7 +50,7 @@ try:
         for pattern in exclude_patterns:
             kecamatan_gdf = kecamatan_gdf[~kecamatan_gdf['name'].str.contains(pattern, case=False, na=False)]
         
-        print(f"  Setelah filter subdivisi: {len(kecamatan_gdf)} kecamatan")
+        event(f"  Setelah filter subdivisi: {len(kecamatan_gdf)} kecamatan")
     
     # Ambil kolom penting
     columns_to_keep = ['name', 'admin_level', 'boundary', 'geometry']
@@ -57,31 +61,31 @@ try:
     if 'name' in kecamatan_gdf.columns:
         kecamatan_gdf['kecamatan'] = kecamatan_gdf['name']
     
-    kecamatan_gdf['kabupaten'] = 'Cilacap'
+    kecamatan_gdf['kabupaten'] = REGION.name
     kecamatan_gdf['provinsi'] = 'Jawa Tengah'
     
     # Sort by name
     if 'kecamatan' in kecamatan_gdf.columns:
         kecamatan_gdf = kecamatan_gdf.sort_values('kecamatan').reset_index(drop=True)
     
-    print("\nKecamatan yang ditemukan:")
+    event("\nKecamatan yang ditemukan:")
     if 'kecamatan' in kecamatan_gdf.columns:
         for idx, name in enumerate(kecamatan_gdf['kecamatan'], 1):
-            print(f"  {idx}. {name}")
+            event(f"  {idx}. {name}")
     
     # Save ke GeoJSON
-    geojson_path = 'data_processed/kecamatan_cilacap_v2.geojson'
+    geojson_path = REGION.path(f'kecamatan_{REGION.slug}_v2.geojson')
     kecamatan_gdf.to_file(geojson_path, driver='GeoJSON')
-    print(f"\n✅ Saved: {geojson_path}")
-    print(f"   Total kecamatan: {len(kecamatan_gdf)}")
+    event(f"\n✅ Saved: {geojson_path}")
+    event(f"   Total kecamatan: {len(kecamatan_gdf)}")
     
     # Save ke Shapefile
-    shp_path = 'data_processed/kecamatan_cilacap_v2.shp'
+    shp_path = REGION.path(f'kecamatan_{REGION.slug}_v2.shp')
     kecamatan_gdf.to_file(shp_path)
-    print(f"✅ Saved: {shp_path}")
+    event(f"✅ Saved: {shp_path}")
     
     # Visualisasi
-    print("\n🎨 Generating visualization...")
+    event("\n🎨 Generating visualization...")
     fig, ax = plt.subplots(figsize=(14, 16))
     
     # Plot dengan warna berbeda tiap kecamatan
@@ -109,7 +113,7 @@ try:
             )
     
     # Styling
-    ax.set_title('Peta Kecamatan - Kabupaten Cilacap\n(OSM admin_level=7)', 
+    ax.set_title(f'Peta Kecamatan - {REGION.title}\n(OSM admin_level=7)', 
                  fontsize=16, fontweight='bold', pad=20)
     ax.set_xlabel('Longitude', fontsize=12)
     ax.set_ylabel('Latitude', fontsize=12)
@@ -126,12 +130,12 @@ try:
     plt.tight_layout()
     
     # Save visualization
-    vis_path = 'data_processed/kecamatan_map_v2.png'
+    vis_path = REGION.path('kecamatan_map_v2.png')
     plt.savefig(vis_path, dpi=300, bbox_inches='tight')
-    print(f"✅ Saved visualization: {vis_path}")
+    event(f"✅ Saved visualization: {vis_path}")
     
     plt.close()
 
 except Exception as e:
-    print(f"\n❌ Error: {e}")
-    print("\nAlternative: Gunakan shapefile dari BPS/Geospasial Indonesia")
+    event(f"\n❌ Error: {e}")
+    event("\nAlternative: Gunakan shapefile dari BPS/Geospasial Indonesia")
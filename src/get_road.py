@@ -1,43 +1,54 @@
 import os
 import osmnx as ox
-import matplotlib.pyplot as plt
-from matplotlib.lines import Line2D
+from instrument import span, event
+from region import REGION
 
 ox.settings.log_console = True
 ox.settings.use_cache = True
 
-area = "Kabupaten Cilacap, Jawa Tengah, Indonesia"
+area = REGION.area
+road_path = REGION.path("road.graphml")
 
 # Ambil jaringan jalan
-road = ox.graph_from_place(area, network_type="drive")
+with span("fetch") as s:
+    road = ox.graph_from_place(area, network_type="drive")
+    s.set(rows=road.number_of_edges(), nodes=road.number_of_nodes())
 
-os.makedirs("data_processed", exist_ok=True)
-ox.save_graphml(road, "data_processed/road.graphml")
+os.makedirs(REGION.output_dir, exist_ok=True)
+with span("write_graphml", rows=road.number_of_edges()):
+    ox.save_graphml(road, road_path)
+event(f"✅ Saved: {road_path}", path=road_path,
+      nodes=road.number_of_nodes(), edges=road.number_of_edges())
 
 print(road)
 
 # Konversi graph ke GeoDataFrame untuk plotting manual
-nodes, edges = ox.graph_to_gdfs(road)
+with span("graph_to_gdfs", rows=road.number_of_edges()):
+    nodes, edges = ox.graph_to_gdfs(road)
 
 # Plot dengan warna konsisten (biru untuk roads)
-fig, ax = plt.subplots(figsize=(10, 8))
-edges.plot(ax=ax, linewidth=0.8, color="#0072B2")
-
-# Legend
-legend_handles = [
-    Line2D([0], [0], color="#0072B2", lw=1, label="Roads")
-]
-ax.legend(handles=legend_handles, loc="lower left", frameon=True, fontsize=10)
-
-# North arrow (petunjuk arah mata angin)
-nx, ny = 0.95, 0.15
-ax.annotate('', xy=(nx, ny + 0.12), xytext=(nx, ny),
-            xycoords='axes fraction',
-            arrowprops=dict(facecolor='k', width=2, headwidth=8))
-ax.text(nx, ny + 0.135, 'N', transform=ax.transAxes,
-        ha='center', va='bottom', fontsize=12, fontweight='bold')
-
-ax.set_title("Roads - Kabupaten Cilacap", fontsize=14)
-ax.set_axis_off()
-plt.tight_layout()
+with span("render", rows=len(edges)):
+    import matplotlib.pyplot as plt
+    from matplotlib.lines import Line2D
+
+    fig, ax = plt.subplots(figsize=(10, 8))
+    edges.plot(ax=ax, linewidth=0.8, color="#0072B2")
+
+    # Legend
+    legend_handles = [
+        Line2D([0], [0], color="#0072B2", lw=1, label="Roads")
+    ]
+    ax.legend(handles=legend_handles, loc="lower left", frameon=True, fontsize=10)
+
+    # North arrow (petunjuk arah mata angin)
+    nx, ny = 0.95, 0.15
+    ax.annotate('', xy=(nx, ny + 0.12), xytext=(nx, ny),
+                xycoords='axes fraction',
+                arrowprops=dict(facecolor='k', width=2, headwidth=8))
+    ax.text(nx, ny + 0.135, 'N', transform=ax.transAxes,
+            ha='center', va='bottom', fontsize=12, fontweight='bold')
+
+    ax.set_title(f"Roads - {REGION.title}", fontsize=14)
+    ax.set_axis_off()
+    plt.tight_layout()
 plt.show()
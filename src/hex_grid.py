@@ -0,0 +1,344 @@
+"""
+Agregasi hexagon multi-resolusi untuk dashboard (Web GIS / Streamlit)
+Semua layer titik dan centroid (bangunan, titik rawan banjir, tempat evakuasi, sel prediksi
+risiko RF) digabung ke satu array lalu di-assign ke grid hexagon di beberapa resolusi sekaligus.
+Tiap resolusi = satu pass vektor (koordinat -> id sel, np.unique + bincount per metrik).
+Hasilnya satu tabel kompak (pickle) berisi count/sum per sel dan id sel induk di resolusi
+lebih kasar, jadi dashboard cukup membaca sel yang sudah jadi (query per resolusi/bbox dalam
+hitungan milidetik) dan bisa roll-up dari sel halus ke sel kasar.
+
+Backend:
+  hex  (default) grid hexagon di UTM 49S dengan hirarki aperture 7 seperti H3: tiap resolusi
+       edge / sqrt(7) dan diputar atan(sqrt(3)/5), pusat sel halus selalu di dalam sel induk
+  h3   jika paket h3 terpasang (pip install h3), resolusi H3 standar
+Induk sel = sel resolusi lebih kasar yang memuat pusat sel (seperti H3), jadi hasil roll-up
+bisa sedikit berbeda dari agregasi langsung di resolusi kasar untuk titik dekat tepi sel.
+
+Contoh:
+  python src/hex_grid.py                             # res 1..4 (edge 3,8 km .. 200 m)
+  python src/hex_grid.py --res 2,3,4 --geojson 3     # + GeoJSON polygon sel res 3
+  python src/hex_grid.py --backend h3 --res 6,7,8,9
+  from hex_grid import load_cells, query; query(load_cells(), 3, bbox=(108.9, -7.8, 109.1, -7.6))
+"""
+
+import os
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import shapely
+from pyproj import Transformer
+
+from building_metrics import UTM_CRS, to_utm
+from exposure import is_flood_shelter
+from instrument import span, event
+from layers import load_layer
+from region import REGION
+
+EDGE0_M = 10_000.0
+APERTURE = 7
+ROTATION = np.arctan(np.sqrt(3.0) / 5)  # sudut vektor axial (2, 1): lattice induk = lattice anak x sqrt(7)
+RESOLUTIONS = {"hex": [1, 2, 3, 4], "h3": [6, 7, 8, 9]}
+CELLS_PATH = REGION.path("hex_cells.pkl")
+MODEL_PATH = os.path.join("models", f"flood_risk_rf_{REGION.slug}.pkl")
+SQRT3 = np.sqrt(3.0)
+# metrik -> dtype penyimpanan; *_count/_cells di-roll-up sebagai jumlah, risk_tinggi_sum dibagi risk_cells
+METRICS = {
+    "building_count": np.int32, "building_area_m2": np.float32,
+    "flood_points": np.int32, "shelters": np.int32, "shelters_flood": np.int32,
+    "risk_cells": np.int32, "risk_tinggi_sum": np.float32,
+}
+Q_BITS = 28  # id sel hex: res (8 bit) | q + offset (28 bit) | r + offset (28 bit)
+Q_OFFSET = 1 << (Q_BITS - 1)
+
+
+def edge_m(res):
+    return EDGE0_M / APERTURE ** (res / 2)
+
+
+def hex_cells(x, y, res):
+    # koordinat UTM -> id sel (axial q, r dengan pembulatan cube pada lattice yang diputar)
+    size = edge_m(res)
+    cos, sin = np.cos(res * ROTATION), np.sin(res * ROTATION)
+    x, y = x * cos - y * sin, x * sin + y * cos
+    qf = (SQRT3 / 3 * x - y / 3) / size
+    rf = (2 / 3 * y) / size
+    sf = -qf - rf
+    q, r, s = np.round(qf), np.round(rf), np.round(sf)
+    dq, dr, ds = np.abs(q - qf), np.abs(r - rf), np.abs(s - sf)
+    fix_q = (dq > dr) & (dq > ds)
+    fix_r = ~fix_q & (dr > ds)
+    q = np.where(fix_q, -r - s, q)
+    r = np.where(fix_r, -q - s, r)
+    q = q.astype(np.int64) + Q_OFFSET
+    r = r.astype(np.int64) + Q_OFFSET
+    return (np.int64(res) << (2 * Q_BITS)) | (q << Q_BITS) | r
+
+
+def hex_centers(cells):
+    # id sel -> (res, x, y) pusat sel UTM
+    cells = np.asarray(cells, dtype=np.int64)
+    res = cells >> (2 * Q_BITS)
+    mask = (1 << Q_BITS) - 1
+    q = ((cells >> Q_BITS) & mask) - Q_OFFSET
+    r = (cells & mask) - Q_OFFSET
+    size = edge_m(res)
+    x, y = size * SQRT3 * (q + r / 2), size * 1.5 * r
+    cos, sin = np.cos(res * ROTATION), np.sin(res * ROTATION)
+    return res, x * cos + y * sin, -x * sin + y * cos
+
+
+def hex_polygons(cells):
+    res, cx, cy = hex_centers(cells)
+    size = edge_m(res)
+    angle = np.deg2rad(60 * np.arange(6) + 30)[None, :] - (res * ROTATION)[:, None]
+    xs = cx[:, None] + size[:, None] * np.cos(angle)
+    ys = cy[:, None] + size[:, None] * np.sin(angle)
+    rings = np.stack([xs, ys], axis=-1)
+    return gpd.GeoSeries(shapely.polygons(np.concatenate([rings, rings[:, :1]], axis=1)),
+                         crs=UTM_CRS).to_crs("EPSG:4326")
+
+
+class HexBackend:
+    name = "hex"
+
+    def cells(self, x, y, lon, lat, res):
+        return hex_cells(x, y, res)
+
+    def parents(self, cells, res):
+        _, cx, cy = hex_centers(cells)
+        return hex_cells(cx, cy, res)
+
+    def centers(self, cells):
+        _, cx, cy = hex_centers(cells)
+        lon, lat = Transformer.from_crs(UTM_CRS, "EPSG:4326", always_xy=True).transform(cx, cy)
+        return np.asarray(lon), np.asarray(lat)
+
+    def polygons(self, cells):
+        return hex_polygons(cells)
+
+
+class H3Backend:
+    # h3-py v4; tidak ada API vektor, jadi koordinat unik di-loop sekali per resolusi
+    name = "h3"
+
+    def __init__(self):
+        import h3
+        self.h3 = h3
+
+    def cells(self, x, y, lon, lat, res):
+        h3 = self.h3
+        xy, inverse = np.unique(np.column_stack([lon, lat]).round(7), axis=0, return_inverse=True)
+        ids = np.fromiter((h3.str_to_int(h3.latlng_to_cell(la, lo, res)) for lo, la in xy),
+                          dtype=np.int64, count=len(xy))
+        return ids[inverse.ravel()]
+
+    def parents(self, cells, res):
+        h3 = self.h3
+        return np.array([h3.str_to_int(h3.cell_to_parent(h3.int_to_str(int(c)), res)) for c in cells],
+                        dtype=np.int64)
+
+    def centers(self, cells):
+        h3 = self.h3
+        latlng = np.array([h3.cell_to_latlng(h3.int_to_str(int(c))) for c in cells]).reshape(-1, 2)
+        return latlng[:, 1], latlng[:, 0]
+
+    def polygons(self, cells):
+        h3 = self.h3
+        return gpd.GeoSeries([shapely.Polygon([(lo, la) for la, lo in
+                                               h3.cell_to_boundary(h3.int_to_str(int(c)))])
+                              for c in cells], crs="EPSG:4326")
+
+
+def get_backend(name):
+    if name == "h3":
+        try:
+            return H3Backend()
+        except ImportError:
+            raise SystemExit("backend h3 butuh paket h3 (pip install h3), atau pakai --backend hex")
+    return HexBackend()
+
+
+def risk_points(model_path=MODEL_PATH):
+    # pusat sel grid raster di dalam kecamatan + P(Tinggi) dari model train_rf.py; None jika belum ada
+    from raster_grid import GRID_DIR, LABEL, load_grid
+
+    if not (os.path.exists(model_path) and os.path.exists(os.path.join(GRID_DIR, "meta.json"))):
+        return None
+    import joblib
+
+    bundle = joblib.load(model_path)
+    grid, arrays, meta = load_grid()
+    if bundle.get("grid_res") != meta["res"] or any(f not in arrays for f in bundle["features"]):
+        event(f"  ⚠️  model {model_path} tidak cocok dengan grid {GRID_DIR}, risiko dilewati")
+        return None
+    cells = np.flatnonzero(np.asarray(arrays[LABEL]).ravel() > 0)
+    X = np.column_stack([np.asarray(arrays[f]).ravel()[cells] for f in bundle["features"]]).astype(np.float32)
+    X = np.nan_to_num(X, nan=0.0, posinf=np.finfo(np.float32).max)
+    model = bundle["model"]
+    target = bundle["classes"].index("Tinggi")
+    proba = np.zeros(len(cells))
+    if target in model.classes_:
+        proba = model.predict_proba(X)[:, list(model.classes_).index(target)]
+    xs, ys = grid.centers()
+    return xs.ravel()[cells], ys.ravel()[cells], proba
+
+
+def collect_points():
+    # semua layer -> (x UTM, y UTM, matriks metrik float64 baris x METRICS)
+    names = list(METRICS)
+    parts = []
+
+    def add(xy, **values):
+        block = np.zeros((len(xy), len(names)))
+        for k, v in values.items():
+            block[:, names.index(k)] = v
+        parts.append((xy, block))
+
+    building = load_layer("building")
+    geoms = to_utm(np.asarray(building.geometry.values), building.crs or "EPSG:4326")
+    add(shapely.get_coordinates(shapely.centroid(geoms)), building_count=1, building_area_m2=shapely.area(geoms))
+    for name, metric in (("flood", "flood_points"), ("evac", "shelters")):
+        try:
+            gdf = load_layer(name)
+        except FileNotFoundError:
+            event(f"  ⚠️  layer {name} tidak ada, dilewati")
+            continue
+        xy = shapely.get_coordinates(to_utm(np.asarray(gdf.geometry.values), gdf.crs or "EPSG:4326"))
+        extra = {"shelters_flood": is_flood_shelter(gdf)} if name == "evac" else {}
+        add(xy, **{metric: 1}, **extra)
+    risk = risk_points()
+    if risk is not None:
+        x, y, proba = risk
+        add(np.column_stack([x, y]), risk_cells=1, risk_tinggi_sum=proba)
+    else:
+        event("  ⚠️  model RF / grid raster belum ada, kolom risiko kosong (jalankan raster_grid.py + train_rf.py)")
+
+    xy = np.concatenate([p[0] for p in parts])
+    return xy[:, 0], xy[:, 1], np.concatenate([p[1] for p in parts])
+
+
+def aggregate(x, y, values, resolutions, backend):
+    # satu pass per resolusi: id sel -> unique + bincount tiap metrik
+    lon, lat = Transformer.from_crs(UTM_CRS, "EPSG:4326", always_xy=True).transform(x, y)
+    resolutions = sorted(resolutions)
+    tables = []
+    for i, res in enumerate(resolutions):
+        ids = backend.cells(x, y, np.asarray(lon), np.asarray(lat), res)
+        cells, inverse = np.unique(ids, return_inverse=True)
+        table = pd.DataFrame({"res": np.int8(res), "cell": cells})
+        table["parent"] = backend.parents(cells, resolutions[i - 1]) if i else np.int64(-1)
+        c_lon, c_lat = backend.centers(cells)
+        table["lon"], table["lat"] = c_lon.astype(np.float32), c_lat.astype(np.float32)
+        for j, (name, dtype) in enumerate(METRICS.items()):
+            table[name] = np.bincount(inverse, weights=values[:, j], minlength=len(cells)).astype(dtype)
+        tables.append(table)
+    out = pd.concat(tables, ignore_index=True)
+    out.attrs = {"backend": backend.name, "resolutions": resolutions,
+                 "edge_m": {int(r): edge_m(r) for r in resolutions} if backend.name == "hex" else {},
+                 "created": time.strftime("%Y-%m-%dT%H:%M:%S")}
+    return out
+
+
+def rollup(cells, res, to_res):
+    # agregasi ulang sel res ke resolusi kasar to_res lewat rantai induk antar resolusi
+    # (induk dihitung ulang, bukan lookup tabel: sel induk tanpa titik tidak ada di tabel)
+    resolutions = cells.attrs["resolutions"]
+    backend = get_backend(cells.attrs["backend"])
+    table = cells[cells["res"] == res]
+    key = table["cell"].to_numpy()
+    level = resolutions.index(res)
+    while resolutions[level] > to_res:
+        level -= 1
+        key = backend.parents(key, resolutions[level])
+    return table[list(METRICS)].groupby(key).sum().rename_axis("cell").reset_index()
+
+
+_LOADED = {}
+
+
+def load_cells(path=CELLS_PATH):
+    # dibaca sekali per proses (dashboard), dibaca ulang jika file berubah
+    mtime = os.path.getmtime(path)
+    if _LOADED.get(path, (None,))[0] != mtime:
+        _LOADED[path] = (mtime, pd.read_pickle(path))
+    return _LOADED[path][1]
+
+
+def query(cells, res, bbox=None):
+    # sel satu resolusi (+ filter bbox lon/lat) dengan kolom turunan risk_tinggi_mean
+    part = cells[cells["res"].to_numpy() == res]
+    if bbox is not None:
+        x0, y0, x1, y1 = bbox
+        lon, lat = part["lon"].to_numpy(), part["lat"].to_numpy()
+        part = part[(lon >= x0) & (lon <= x1) & (lat >= y0) & (lat <= y1)]
+    risk = part["risk_tinggi_sum"].to_numpy() / np.maximum(part["risk_cells"].to_numpy(), 1)
+    return part.assign(risk_tinggi_mean=np.where(part["risk_cells"].to_numpy() > 0, risk, np.nan))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Agregasi hexagon multi-resolusi untuk dashboard")
+    parser.add_argument("--backend", choices=["hex", "h3"], default="hex")
+    parser.add_argument("--res", help="daftar resolusi, mis. 2,3,4 (default " + ", ".join(
+        f"{k} {v[0]}..{v[-1]}" for k, v in RESOLUTIONS.items()) + ")")
+    parser.add_argument("--geojson", type=int, metavar="RES", help="simpan juga polygon sel resolusi RES")
+    parser.add_argument("--output", default=CELLS_PATH)
+    args = parser.parse_args()
+
+    backend = get_backend(args.backend)
+    resolutions = [int(r) for r in args.res.split(",")] if args.res else RESOLUTIONS[args.backend]
+
+    with span("load") as s:
+        x, y, values = collect_points()
+        s.set(rows=len(x))
+    with span("aggregate", rows=len(x), resolutions=len(resolutions)) as s:
+        t0 = time.perf_counter()
+        cells = aggregate(x, y, values, resolutions, backend)
+        t_agg = time.perf_counter() - t0
+        s.set(cells=len(cells))
+    cells.to_pickle(args.output)
+    event(f"✅ Saved: {args.output} ({len(cells)} sel, {os.path.getsize(args.output) / 2 ** 20:.1f} MB)",
+          path=args.output, rows=len(cells))
+
+    totals = values.sum(axis=0)
+    for res in resolutions:
+        part = cells[cells["res"] == res]
+        edge = f", edge {edge_m(res):g} m" if backend.name == "hex" else ""
+        event(f"   res {res}: {len(part):>7} sel{edge}, bangunan/sel maks {part['building_count'].max()}",
+              res=res, cells=len(part))
+    # cek konsistensi: tiap resolusi menjumlah ke total input; roll-up halus -> kasar vs agregasi langsung
+    for res in resolutions:
+        got = cells.loc[cells["res"] == res, list(METRICS)].to_numpy(dtype=float).sum(axis=0)
+        if not np.allclose(got, totals, rtol=1e-4):
+            raise RuntimeError(f"total res {res} tidak cocok dengan input: "
+                               f"{dict(zip(METRICS, got.round(1)))} vs {dict(zip(METRICS, totals.round(1)))}")
+    if len(resolutions) > 1:
+        fine, coarse = resolutions[-1], resolutions[0]
+        rolled = rollup(cells, fine, coarse).set_index("cell")["building_count"]
+        direct = cells[cells["res"] == coarse].set_index("cell")["building_count"]
+        moved = rolled.sub(direct, fill_value=0).abs().sum() / 2
+        event(f"   roll-up res {fine} -> {coarse}: {moved / max(direct.sum(), 1):.2%} bangunan pindah sel "
+              f"(pusat sel halus vs titik asli)", moved=int(moved))
+
+    # waktu baca dashboard: load tabel (sekali) + query satu resolusi
+    t0 = time.perf_counter()
+    loaded = load_cells(args.output)
+    t_load = time.perf_counter() - t0
+    times = []
+    for _ in range(20):
+        t0 = time.perf_counter()
+        query(loaded, resolutions[len(resolutions) // 2])
+        times.append(time.perf_counter() - t0)
+    event(f"⚡ Agregasi {len(x)} fitur {t_agg:.2f}s; load tabel {t_load * 1000:.1f} ms, "
+          f"query per resolusi {np.median(times) * 1000:.2f} ms",
+          aggregate_s=round(t_agg, 3), load_ms=round(t_load * 1000, 2), query_ms=round(np.median(times) * 1000, 3))
+
+    if args.geojson is not None:
+        part = query(cells, args.geojson)
+        out = gpd.GeoDataFrame(part.drop(columns=["lon", "lat"]).astype({"cell": str, "parent": str}),
+                               geometry=backend.polygons(part["cell"].to_numpy()).values, crs="EPSG:4326")
+        path = os.path.splitext(args.output)[0] + f"_res{args.geojson}.geojson"
+        out.to_file(path, driver="GeoJSON")
+        event(f"✅ Saved: {path}", path=path, rows=len(out))
@@ -0,0 +1,277 @@
+"""
+Instrumentasi ringan untuk semua script pipeline
+- span(): wall time, CPU time, RSS, peak RSS, dan jumlah baris per tahap (+ profiler opsional)
+- event(): pengganti print progress, tetap tampil di console dan tercatat terstruktur
+- laporan JSON per run di data_processed/runs/ yang bisa diagregasi antar run
+
+Environment:
+  INSTRUMENT_DIR       folder laporan (default data_processed/runs, kosong = tidak disimpan)
+  INSTRUMENT_PROFILE   nama span yang diprofile, pisahkan dengan koma, atau "all"
+  INSTRUMENT_PROFILER  cprofile (default) atau pyinstrument (sampling profiler)
+
+Ringkasan antar run:
+  python src/instrument.py summarize [--script get_building.py]
+"""
+
+import os
+import sys
+import json
+import glob
+import time
+import atexit
+import argparse
+import platform
+import resource
+import statistics
+import contextlib
+from datetime import datetime
+
+_report_dir = os.environ.get("INSTRUMENT_DIR", os.path.join("data_processed", "runs"))
+REPORT_DIR = os.path.abspath(_report_dir) if _report_dir else None
+PROFILE = {s.strip() for s in os.environ.get("INSTRUMENT_PROFILE", "").split(",") if s.strip()}
+PROFILER = os.environ.get("INSTRUMENT_PROFILER", "cprofile")
+
+_T0 = time.perf_counter()
+_stack = []
+_run = {
+    "run_id": datetime.now().strftime("%Y%m%d-%H%M%S") + f"-{os.getpid()}",
+    "script": os.path.basename(sys.argv[0]) if sys.argv and sys.argv[0] else "interactive",
+    "argv": sys.argv[1:],
+    "region": os.environ.get("REGION"),
+    "started": datetime.now().isoformat(timespec="seconds"),
+    "host": platform.node(),
+    "python": platform.python_version(),
+    "cpus": os.cpu_count(),
+    "spans": [],
+    "events": [],
+}
+
+
+def rss_mb():
+    # RSS saat ini (Linux /proc, fallback psutil)
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except (OSError, ValueError, IndexError):
+        try:
+            import psutil
+            return psutil.Process().memory_info().rss / 1e6
+        except ImportError:
+            return None
+
+
+def _read_hwm_mb():
+    # VmHWM = peak RSS sejak reset terakhir
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1e3
+    except OSError:
+        pass
+    return maxrss_mb()
+
+
+def maxrss_mb():
+    # ru_maxrss: kilobyte di Linux, byte di macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1e6 if sys.platform == "darwin" else rss / 1e3
+
+
+def _reset_hwm():
+    # reset peak RSS (Linux >= 4.0) agar peak bisa diukur per span
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+class Span:
+    def __init__(self, name, rows=None, **fields):
+        self.name = name
+        self.rows = rows
+        self.fields = fields
+        self.path = "/".join([s.name for s in _stack] + [name])
+        self.child_peak = 0.0
+        self.record = None
+
+    def set(self, rows=None, **fields):
+        if rows is not None:
+            self.rows = rows
+        self.fields.update(fields)
+
+
+def _start_profiler(name):
+    if not PROFILE or ("all" not in PROFILE and name not in PROFILE):
+        return None
+    if PROFILER == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+            prof = Profiler()
+            prof.start()
+            return prof
+        except ImportError:
+            print("  warning: pyinstrument tidak terinstall, pakai cProfile")
+    import cProfile
+    prof = cProfile.Profile()
+    prof.enable()
+    return prof
+
+
+def _stop_profiler(prof, span):
+    out_dir = REPORT_DIR or os.getcwd()
+    os.makedirs(out_dir, exist_ok=True)
+    base = os.path.join(out_dir, f"{_run['run_id']}-{span.path.replace('/', '.')}")
+    if hasattr(prof, "output_html"):
+        prof.stop()
+        path = base + ".html"
+        with open(path, "w") as f:
+            f.write(prof.output_html())
+    else:
+        prof.disable()
+        path = base + ".prof"
+        prof.dump_stats(path)
+    return path
+
+
+@contextlib.contextmanager
+def span(name, rows=None, **fields):
+    # with span("fetch") as s: ...; s.set(rows=len(gdf))
+    s = Span(name, rows, **fields)
+    if _stack:
+        _stack[-1].child_peak = max(_stack[-1].child_peak, _read_hwm_mb())
+    hwm_reset = _reset_hwm()
+    _stack.append(s)
+    prof = _start_profiler(name)
+    start = time.perf_counter()
+    wall0, cpu0 = start, time.process_time()
+    error = None
+    try:
+        yield s
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        wall = time.perf_counter() - wall0
+        cpu = time.process_time() - cpu0
+        profile_path = _stop_profiler(prof, s) if prof is not None else None
+        _stack.pop()
+        peak = max(s.child_peak, _read_hwm_mb())
+        if _stack:
+            _stack[-1].child_peak = max(_stack[-1].child_peak, peak)
+        record = {
+            "name": s.path,
+            "start_s": round(start - _T0, 4),
+            "wall_s": round(wall, 4),
+            "cpu_s": round(cpu, 4),
+            "rss_mb": round(rss_mb() or 0, 1),
+            "peak_rss_mb": round(peak, 1),
+            "peak_is_process_max": not hwm_reset,
+        }
+        if s.rows is not None:
+            record["rows"] = int(s.rows)
+        if s.fields:
+            record["fields"] = s.fields
+        if error:
+            record["error"] = error
+        if profile_path:
+            record["profile"] = profile_path
+        _run["spans"].append(record)
+        s.record = record
+
+        rows_txt = f", {s.rows} rows" if s.rows is not None else ""
+        print(f"⏱️  [{s.path}] {wall:.2f}s (cpu {cpu:.2f}s, peak {peak:.0f} MB{rows_txt})")
+
+
+def event(*args, **fields):
+    # seperti print(), tapi juga dicatat sebagai event terstruktur
+    msg = " ".join(str(a) for a in args)
+    print(msg)
+    record = {
+        "t_s": round(time.perf_counter() - _T0, 4),
+        "span": _stack[-1].path if _stack else None,
+        "msg": msg.strip(),
+    }
+    if fields:
+        record["fields"] = fields
+    _run["events"].append(record)
+
+
+def report():
+    return dict(_run, wall_s=round(time.perf_counter() - _T0, 4),
+                peak_rss_mb=round(maxrss_mb(), 1))
+
+
+def write_report(path=None):
+    if not _run["spans"] and not _run["events"]:
+        return None
+    if path is None:
+        if REPORT_DIR is None:
+            return None
+        os.makedirs(REPORT_DIR, exist_ok=True)
+        script = os.path.splitext(_run["script"])[0]
+        path = os.path.join(REPORT_DIR, f"{script}-{_run['run_id']}.json")
+    with open(path, "w") as f:
+        json.dump(report(), f, indent=2, default=str)
+    return path
+
+
+atexit.register(write_report)
+
+
+def load_reports(report_dir=REPORT_DIR, script=None):
+    reports = []
+    for path in sorted(glob.glob(os.path.join(report_dir or ".", "*.json"))):
+        try:
+            with open(path) as f:
+                rep = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            continue
+        if script and rep.get("script") != script:
+            continue
+        reports.append(rep)
+    return reports
+
+
+def summarize(reports):
+    # agregasi per (script, span): jumlah run, median/p95 wall, peak RSS maksimum
+    groups = {}
+    for rep in reports:
+        for sp in rep.get("spans", []):
+            groups.setdefault((rep.get("script"), sp["name"]), []).append(sp)
+    rows = []
+    for (script, name), spans in sorted(groups.items()):
+        walls = sorted(s["wall_s"] for s in spans)
+        p95 = walls[min(len(walls) - 1, int(round(0.95 * (len(walls) - 1))))]
+        rows.append({
+            "script": script,
+            "span": name,
+            "runs": len(spans),
+            "wall_median_s": round(statistics.median(walls), 3),
+            "wall_p95_s": round(p95, 3),
+            "cpu_median_s": round(statistics.median(s["cpu_s"] for s in spans), 3),
+            "peak_rss_max_mb": max(s.get("peak_rss_mb", 0) for s in spans),
+            "rows_last": spans[-1].get("rows"),
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ringkasan laporan instrumentasi antar run")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("summarize")
+    p.add_argument("--dir", default=REPORT_DIR or os.path.join("data_processed", "runs"))
+    p.add_argument("--script", help="filter nama script, mis. get_building.py")
+    p.add_argument("--json", action="store_true", help="output JSON")
+    args = parser.parse_args()
+
+    rows = summarize(load_reports(args.dir, args.script))
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print(f"{'script':<24} {'span':<28} {'runs':>4} {'median':>9} {'p95':>9} {'peak MB':>9}")
+        for r in rows:
+            print(f"{r['script']:<24} {r['span']:<28} {r['runs']:>4} "
+                  f"{r['wall_median_s']:>8.2f}s {r['wall_p95_s']:>8.2f}s {r['peak_rss_max_mb']:>9.0f}")
@@ -0,0 +1,231 @@
+"""
+Katalog layer data_processed: path, schema, lazy load + cache memori (LRU dibatasi ukuran) dan disk
+Setiap layer dibaca sekali saat pertama diakses. Hasilnya (termasuk kolom turunan seperti
+is_flood_tsunami pada titik evakuasi) disimpan di cache memori per proses (dibuang dari yang
+paling lama tidak dipakai jika melebihi LAYER_CACHE_MB) dan di cache pickle biner
+data_processed/layer_cache/<layer>.pkl, jadi sesi berikutnya tidak parse GeoJSON/GraphML lagi.
+Cache tidak dipakai lagi jika file sumber berubah: dicek dari mtime + ukuran (default) atau
+hash isi file (LAYER_VALIDATE=hash).
+
+Environment:
+  LAYER_CACHE_MB=1024     batas cache memori
+  LAYER_DISK_CACHE=0      matikan cache pickle
+  LAYER_VALIDATE=hash     validasi dengan SHA-1 isi file (lebih lambat, tahan ke touch/copy)
+
+Contoh:
+  python src/layers.py               # daftar layer, status file & cache
+  python src/layers.py --warm        # baca semua layer sekali -> cache pickle
+  python src/layers.py --clear
+  from layers import load_layer; evac = load_layer("evac")
+"""
+
+import os
+import time
+import pickle
+import hashlib
+import argparse
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+import shapely
+
+from instrument import span, event
+from region import REGION
+
+CACHE_DIR = REGION.path("layer_cache")
+MAX_BYTES = int(float(os.environ.get("LAYER_CACHE_MB", 1024)) * 2 ** 20)
+DISK_CACHE = os.environ.get("LAYER_DISK_CACHE", "1") != "0"
+VALIDATE = os.environ.get("LAYER_VALIDATE", "mtime")  # mtime | hash
+CACHE_VERSION = 1  # naikkan jika loader/kolom turunan berubah
+
+
+@dataclass(frozen=True)
+class Layer:
+    name: str
+    filename: str
+    geom_type: str
+    columns: tuple = ()   # kolom penting (tidak wajib ada)
+    loader: str = "read"  # read | buildings | road_edges
+    derive: str = None    # fungsi kolom turunan di modul ini
+
+    @property
+    def path(self):
+        return REGION.path(self.filename)
+
+
+def _kecamatan_file():
+    name = f"{REGION.kecamatan_name}.geojson"
+    return name if os.path.exists(REGION.path(name)) else f"kecamatan_{REGION.slug}_bps.geojson"
+
+
+CATALOG = {layer.name: layer for layer in (
+    Layer("boundary", "boundary.geojson", "Polygon"),
+    Layer("building", "building.geojson", "Polygon", ("building", "amenity", "levels", "name"), loader="buildings"),
+    Layer("road", "road.graphml", "LineString", ("osmid", "highway", "length", "oneway"), loader="road_edges"),
+    Layer("flood", f"{REGION.flood_name}.geojson", "Point", ("Kecamatan", "kecamatan_spasial")),
+    Layer("evac", "tempatevakuasinew.geojson", "Point", ("col_12", "kecamatan_spasial"), derive="derive_evac"),
+    Layer("kecamatan", _kecamatan_file(), "Polygon", ("kecamatan",)),
+)}
+
+
+def flood_tsunami(evac):
+    # kolom col_12 = jenis bencana (lihat get_evac_point.py); tanpa kolom -> semua dianggap banjir/tsunami
+    if "col_12" not in evac.columns:
+        return np.ones(len(evac), dtype=bool)
+    return evac["col_12"].astype(str).str.lower().str.contains("banjir|tsunami", na=False).to_numpy()
+
+
+def derive_evac(evac):
+    if "col_12" in evac.columns:
+        evac["jenis_bencana"] = evac["col_12"].astype(str).str.lower()
+    evac["is_flood_tsunami"] = flood_tsunami(evac)
+    return evac
+
+
+def read_layer(layer):
+    # parse file sumber + kolom turunan (tanpa cache)
+    if layer.loader == "buildings":
+        from building_schema import load_buildings
+        gdf = load_buildings(layer.path)
+    elif layer.loader == "road_edges":
+        import osmnx as ox
+        gdf = ox.graph_to_gdfs(ox.load_graphml(layer.path), nodes=False)
+    else:
+        import geopandas as gpd
+        gdf = gpd.read_file(layer.path)
+    if layer.derive:
+        gdf = globals()[layer.derive](gdf)
+    return gdf
+
+
+def file_stamp(path, validate=VALIDATE):
+    st = os.stat(path)
+    stamp = {"version": CACHE_VERSION, "size": st.st_size}
+    if validate == "hash":
+        h = hashlib.sha1()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        stamp["sha1"] = h.hexdigest()
+    else:
+        stamp["mtime_ns"] = st.st_mtime_ns
+    return stamp
+
+
+def nbytes(gdf):
+    # perkiraan memori: kolom atribut + koordinat geometri (16 byte/titik) + overhead objek geometri
+    geoms = np.asarray(gdf.geometry.values)
+    attrs = gdf.drop(columns=gdf.geometry.name).memory_usage(deep=True).sum()
+    return int(attrs + shapely.get_num_coordinates(geoms).sum() * 16 + len(geoms) * 100)
+
+
+class LayerCache:
+    def __init__(self, max_bytes=MAX_BYTES, disk_cache=DISK_CACHE, validate=VALIDATE, cache_dir=CACHE_DIR):
+        self.max_bytes = max_bytes
+        self.disk_cache = disk_cache
+        self.validate = validate
+        self.cache_dir = cache_dir
+        self._mem = OrderedDict()  # name -> (stamp, gdf, bytes)
+        self.stats = {"hit": 0, "disk": 0, "parse": 0, "evict": 0}
+
+    def disk_path(self, name):
+        return os.path.join(self.cache_dir, f"{name}.pkl")
+
+    def _read_disk(self, name, stamp, header_only=False):
+        # pickle berisi 2 objek berurutan: stamp lalu data, jadi cache basi ketahuan tanpa load data
+        path = self.disk_path(name)
+        if not (self.disk_cache and os.path.exists(path)):
+            return None
+        try:
+            with open(path, "rb") as f:
+                if pickle.load(f) != stamp:
+                    return None
+                return True if header_only else pickle.load(f)
+        except (EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            return None
+
+    def _write_disk(self, name, stamp, gdf):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp = self.disk_path(name) + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(stamp, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(gdf, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.disk_path(name))
+
+    def _remember(self, name, stamp, gdf):
+        size = nbytes(gdf)
+        self._mem[name] = (stamp, gdf, size)
+        self._mem.move_to_end(name)
+        # layer terbaru selalu disimpan walau sendirian melebihi batas
+        while len(self._mem) > 1 and self.used > self.max_bytes:
+            self._mem.popitem(last=False)
+            self.stats["evict"] += 1
+
+    @property
+    def used(self):
+        return sum(size for _, _, size in self._mem.values())
+
+    def get(self, name):
+        # GeoDataFrame dibagi antar pemanggil: jangan diubah in-place (pakai .copy())
+        layer = CATALOG[name]
+        if not os.path.exists(layer.path):
+            raise FileNotFoundError(f"Layer {name}: {layer.path} tidak ditemukan")
+        stamp = file_stamp(layer.path, self.validate)
+        cached = self._mem.get(name)
+        if cached is not None and cached[0] == stamp:
+            self._mem.move_to_end(name)
+            self.stats["hit"] += 1
+            return cached[1]
+        with span(f"layer:{name}") as s:
+            gdf = self._read_disk(name, stamp)
+            source = "disk"
+            if gdf is None:
+                gdf = read_layer(layer)
+                source = "parse"
+                if self.disk_cache:
+                    self._write_disk(name, stamp, gdf)
+            s.set(rows=len(gdf), source=source)
+        self.stats[source] += 1
+        self._remember(name, stamp, gdf)
+        return gdf
+
+    def invalidate(self, name=None):
+        for n in [name] if name else list(CATALOG):
+            self._mem.pop(n, None)
+            if os.path.exists(self.disk_path(n)):
+                os.remove(self.disk_path(n))
+
+
+_CACHE = LayerCache()
+
+
+def load_layer(name):
+    return _CACHE.get(name)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Katalog layer data_processed + cache")
+    parser.add_argument("--warm", action="store_true", help="baca semua layer (isi cache pickle)")
+    parser.add_argument("--clear", action="store_true", help="hapus cache pickle")
+    args = parser.parse_args()
+
+    if args.clear:
+        _CACHE.invalidate()
+        event(f"🗑️  Cache dihapus: {CACHE_DIR}")
+    for name, layer in CATALOG.items():
+        exists = os.path.exists(layer.path)
+        disk = exists and _CACHE._read_disk(name, file_stamp(layer.path), header_only=True) is not None
+        line = f"   {name:<10} {layer.geom_type:<10} {layer.filename:<45} " \
+               f"{'ok' if exists else 'MISSING':<7} cache={'fresh' if disk else '-'}"
+        if args.warm and exists:
+            t0 = time.perf_counter()
+            gdf = load_layer(name)
+            missing = [c for c in layer.columns if c not in gdf.columns]
+            line += f" {len(gdf):>8} baris {time.perf_counter() - t0:6.2f}s {nbytes(gdf) / 2 ** 20:7.1f} MB"
+            if missing:
+                line += f" (kolom tidak ada: {', '.join(missing)})"
+        event(line, layer=name, exists=exists, cached=disk)
+    if args.warm:
+        event(f"✅ {_CACHE.stats}, memori {_CACHE.used / 2 ** 20:.1f} MB / {MAX_BYTES / 2 ** 20:.0f} MB",
+              **_CACHE.stats)
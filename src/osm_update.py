@@ -0,0 +1,589 @@
+"""
+Update incremental bangunan & jalan dari perubahan OSM (tanpa download ulang satu kabupaten)
+Sumber perubahan:
+  - osmChange (.osc, mis. diff menit/jam/hari dari planet.openstreetmap.org), atau
+  - extract .osm baru yang dibandingkan dengan snapshot tersimpan per id + version.
+Perubahan dihitung hanya untuk baris bangunan dan edge graph yang terdampak, tapi
+building.geojson, road.graphml (dan .fgb jika ada) tetap ditulis ulang utuh. Elemen dengan
+version <= snapshot dilewati dan tidak ada yang ditulis jika tidak ada perubahan (aman
+dijalankan ulang). Tile (z/x/y) dan kecamatan yang berubah dicatat di dirty.json (digabung
+dengan isi sebelumnya) agar proses hilir cukup menghitung ulang area itu; hapus dirty.json
+setelah diproses.
+
+Snapshot (osm_snapshot.pkl) menyimpan node, version way, dan urutan node tiap way bangunan/jalan
+sehingga node yang digeser ikut memperbarui bangunan/jalan yang memakainya.
+
+Contoh:
+  python src/osm_update.py --init data_raw/cilacap.osm           # buat snapshot dari extract awal
+  python src/osm_update.py --osc data_raw/changes.osc             # terapkan osmChange
+  python src/osm_update.py --extract data_raw/cilacap-baru.osm    # diff extract baru vs snapshot
+  python src/osm_update.py --osc data_raw/changes.osc --dry-run   # hanya hitung perubahan + dirty
+"""
+
+import os
+import json
+import math
+import argparse
+from datetime import datetime
+import xml.etree.ElementTree as ET
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import shapely
+
+from building_schema import project_schema, BUILDING_PATH, SIDECAR_PATH
+from instrument import span, event
+from region import REGION
+
+ROAD_PATH = REGION.path("road.graphml")
+SNAPSHOT_PATH = REGION.path("osm_snapshot.pkl")
+DIRTY_PATH = REGION.path("dirty.json")
+DIRTY_ZOOM = 14  # tile XYZ ~2.4 km
+ACTIONS = ("create", "modify", "delete")
+
+# sama dengan filter network_type="drive" osmnx
+DRIVE_EXCLUDE = {
+    "highway": {"abandoned", "bridleway", "bus_guideway", "construction", "corridor", "cycleway",
+                "elevator", "escalator", "footway", "no", "path", "pedestrian", "planned", "platform",
+                "proposed", "raceway", "razed", "rest_area", "service", "services", "steps", "track"},
+    "area": {"yes"},
+    "access": {"private"},
+    "motor_vehicle": {"no"},
+    "motorcar": {"no"},
+    "service": {"alley", "driveway", "emergency_access", "parking", "parking_aisle", "private"},
+}
+ROAD_TAGS = ("highway", "name", "ref", "lanes", "maxspeed", "bridge", "tunnel", "access", "junction")
+ONEWAY_YES = {"yes", "true", "1"}
+ONEWAY_REVERSE = {"-1", "reverse"}
+
+
+# ---------------------------------------------------------------- parsing
+
+def _tags(el):
+    return {t.get("k"): t.get("v") for t in el.iter("tag")}
+
+
+def parse_osm(path):
+    # osmChange (.osc) atau extract (.osm) -> (nodes, ways, jumlah relation); streaming iterparse
+    nodes, ways, relations = [], [], 0
+    action, root = "extract", None
+    for ev, el in ET.iterparse(path, events=("start", "end")):
+        if ev == "start":
+            if root is None:
+                root = el
+            elif el.tag in ACTIONS:
+                action = el.tag
+            continue
+        if el.tag == "node":
+            nodes.append((int(el.get("id")), int(el.get("version", 0)), action,
+                          float(el.get("lon", "nan")), float(el.get("lat", "nan")), _tags(el)))
+        elif el.tag == "way":
+            ways.append((int(el.get("id")), int(el.get("version", 0)), action,
+                         [int(nd.get("ref")) for nd in el.iter("nd")], _tags(el)))
+        elif el.tag == "relation":
+            relations += 1
+        else:
+            continue
+        root.clear()
+    nodes = pd.DataFrame(nodes, columns=["id", "version", "action", "lon", "lat", "tags"])
+    ways = pd.DataFrame(ways, columns=["id", "version", "action", "nodes", "tags"])
+    return nodes, ways, relations
+
+
+def is_building(tags):
+    return bool(tags) and tags.get("building", "no") != "no"
+
+
+def is_drivable(tags):
+    if not tags or "highway" not in tags:
+        return False
+    return not any(tags.get(k) in values for k, values in DRIVE_EXCLUDE.items())
+
+
+# ---------------------------------------------------------------- snapshot
+
+def empty_snapshot():
+    return {
+        "nodes": pd.DataFrame({"lon": pd.Series(dtype=float), "lat": pd.Series(dtype=float),
+                               "version": pd.Series(dtype=np.int32)}, index=pd.Index([], name="id", dtype=np.int64)),
+        "ways": pd.DataFrame({"version": pd.Series(dtype=np.int32), "kind": pd.Series(dtype=str),
+                              "tags": pd.Series(dtype=object)}, index=pd.Index([], name="id", dtype=np.int64)),
+        "way_nodes": pd.DataFrame({"way": pd.Series(dtype=np.int64), "node": pd.Series(dtype=np.int64)}),
+        "updated": None,
+    }
+
+
+def load_snapshot(path=SNAPSHOT_PATH):
+    return pd.read_pickle(path) if os.path.exists(path) else empty_snapshot()
+
+
+def save_snapshot(snapshot, path=SNAPSHOT_PATH):
+    snapshot["updated"] = datetime.now().isoformat(timespec="seconds")
+    pd.to_pickle(snapshot, path)
+
+
+def _kind(tags):
+    return "building" if is_building(tags) else "road" if is_drivable(tags) else None
+
+
+def snapshot_from_extract(nodes, ways):
+    # hanya way bangunan/jalan drive + node yang dipakai (dan node bangunan)
+    kinds = ways["tags"].map(_kind)
+    ways = ways[kinds.notna()].assign(kind=kinds[kinds.notna()])
+    way_nodes = ways[["id", "nodes"]].explode("nodes").rename(columns={"id": "way", "nodes": "node"})
+    way_nodes = way_nodes.dropna().astype(np.int64).reset_index(drop=True)
+    used = nodes["id"].isin(way_nodes["node"]) | nodes["tags"].map(is_building)
+    snapshot = empty_snapshot()
+    snapshot["nodes"] = nodes.loc[used, ["id", "lon", "lat", "version"]].set_index("id")
+    snapshot["ways"] = ways.set_index("id")[["version", "kind", "tags"]]
+    snapshot["way_nodes"] = way_nodes
+    return snapshot
+
+
+def diff_extract(nodes, ways, snapshot):
+    # extract baru vs snapshot -> change set dengan kolom action seperti osmChange
+    fresh = snapshot_from_extract(nodes, ways)
+    old_ways, new_ways = snapshot["ways"], fresh["ways"]
+    ways = ways.set_index("id").loc[new_ways.index].reset_index()
+    known = ways["id"].isin(old_ways.index)
+    ways["action"] = np.where(known, "modify", "create")
+    newer = ~known | (ways["version"].to_numpy() > old_ways["version"].reindex(ways["id"]).fillna(-1).to_numpy())
+    gone = old_ways.index.difference(new_ways.index)
+    deleted = pd.DataFrame({"id": gone, "version": old_ways.loc[gone, "version"].to_numpy() + 1,
+                            "action": "delete", "nodes": [[] for _ in gone], "tags": [{} for _ in gone]})
+    ways = pd.concat([ways[newer], deleted], ignore_index=True)
+
+    nodes = nodes[nodes["id"].isin(fresh["nodes"].index)].copy()
+    old_version = snapshot["nodes"]["version"].reindex(nodes["id"]).to_numpy()
+    nodes["action"] = np.where(np.isnan(old_version), "create", "modify")
+    nodes = nodes[~(nodes["version"].to_numpy() <= np.nan_to_num(old_version, nan=-1))]
+    gone = snapshot["nodes"].index.difference(fresh["nodes"].index)
+    deleted = pd.DataFrame({"id": gone, "version": snapshot["nodes"].loc[gone, "version"].to_numpy() + 1,
+                            "action": "delete", "lon": np.nan, "lat": np.nan, "tags": [{} for _ in gone]})
+    return pd.concat([nodes, deleted], ignore_index=True), ways
+
+
+def filter_applied(nodes, ways, snapshot):
+    # lewati elemen yang version-nya sudah ada di snapshot (osc yang sama dijalankan dua kali)
+    sv = snapshot["ways"]["version"].reindex(ways["id"]).to_numpy()
+    ways = ways[~(ways["version"].to_numpy() <= np.nan_to_num(sv, nan=-1))]
+    nv = snapshot["nodes"]["version"].reindex(nodes["id"]).to_numpy()
+    nodes = nodes[~(nodes["version"].to_numpy() <= np.nan_to_num(nv, nan=-1))]
+    return nodes.reset_index(drop=True), ways.reset_index(drop=True)
+
+
+def update_snapshot(snapshot, nodes, ways):
+    live = nodes[nodes["action"] != "delete"].set_index("id")[["lon", "lat", "version"]]
+    dead = nodes.loc[nodes["action"] == "delete", "id"]
+    node_df = snapshot["nodes"].drop(index=live.index.union(dead), errors="ignore")
+    snapshot["nodes"] = pd.concat([node_df, live])
+
+    kinds = ways["tags"].map(_kind)
+    keep = (ways["action"] != "delete") & kinds.notna()
+    changed = pd.Index(ways["id"])
+    way_df = snapshot["ways"].drop(index=changed, errors="ignore")
+    new = ways[keep].assign(kind=kinds[keep]).set_index("id")[["version", "kind", "tags"]]
+    snapshot["ways"] = pd.concat([way_df, new])
+    wn = snapshot["way_nodes"]
+    wn = wn[~wn["way"].isin(changed)]
+    add = ways.loc[keep, ["id", "nodes"]].explode("nodes").rename(columns={"id": "way", "nodes": "node"})
+    snapshot["way_nodes"] = pd.concat([wn, add.dropna().astype(np.int64)], ignore_index=True)
+    return snapshot
+
+
+# ---------------------------------------------------------------- geometri
+
+class NodeIndex:
+    # koordinat node: snapshot + perubahan (+ node graph jalan sebagai fallback)
+    def __init__(self, snapshot_nodes, changed_nodes, graph=None):
+        live = changed_nodes[changed_nodes["action"] != "delete"].set_index("id")[["lon", "lat"]]
+        parts = [snapshot_nodes[["lon", "lat"]].drop(index=live.index, errors="ignore"), live]
+        if graph is not None and len(graph):
+            gn = pd.DataFrame.from_dict(dict(graph.nodes(data=True)), orient="index")[["x", "y"]]
+            gn.columns = ["lon", "lat"]
+            gn.index = gn.index.astype(np.int64)
+            known = parts[0].index.union(live.index)
+            parts.append(gn.drop(index=known, errors="ignore"))
+        self.coords = pd.concat(parts)
+        self.coords = self.coords[~self.coords.index.duplicated(keep="last")]
+
+    def lookup(self, ids):
+        xy = self.coords.reindex(np.asarray(ids, dtype=np.int64)).to_numpy()
+        return None if np.isnan(xy).any() else xy
+
+
+def way_nodes_of(snapshot, way_ids):
+    wn = snapshot["way_nodes"]
+    wn = wn[wn["way"].isin(way_ids)]
+    return wn.groupby("way", sort=False)["node"].agg(list).to_dict()
+
+
+def ways_using(snapshot, node_ids, kind):
+    wn = snapshot["way_nodes"]
+    ids = pd.Index(wn.loc[wn["node"].isin(node_ids), "way"].unique())
+    ways = snapshot["ways"]
+    return ids[ways["kind"].reindex(ids).to_numpy() == kind]
+
+
+def tiles_for(geoms, zoom=DIRTY_ZOOM):
+    # tile XYZ (web mercator) yang tersentuh bbox tiap geometri
+    if not len(geoms):
+        return set()
+    n = 2 ** zoom
+    b = shapely.bounds(np.asarray(geoms))
+    b = b[~np.isnan(b).any(axis=1)]
+
+    def tx(lon):
+        return np.clip(((lon + 180) / 360 * n).astype(int), 0, n - 1)
+
+    def ty(lat):
+        lat = np.radians(np.clip(lat, -85.0511, 85.0511))
+        return np.clip(((1 - np.log(np.tan(lat) + 1 / np.cos(lat)) / math.pi) / 2 * n).astype(int), 0, n - 1)
+
+    x0, x1, y0, y1 = tx(b[:, 0]), tx(b[:, 2]), ty(b[:, 3]), ty(b[:, 1])
+    tiles = set()
+    for a, b_, c, d in zip(x0, x1, y0, y1):
+        tiles.update(f"{zoom}/{x}/{y}" for x in range(a, b_ + 1) for y in range(c, d + 1))
+    return tiles
+
+
+def kecamatan_for(geoms, kecamatan):
+    if kecamatan is None or not len(geoms):
+        return set()
+    geoms = np.asarray(geoms)
+    geoms = geoms[~shapely.is_missing(geoms)]
+    _, poly = shapely.STRtree(kecamatan.geometry.values).query(geoms, predicate="intersects")
+    return set(kecamatan["kecamatan"].astype(str).to_numpy()[np.unique(poly)])
+
+
+# ---------------------------------------------------------------- bangunan
+
+def building_changes(nodes, ways, snapshot, resolve):
+    # -> (key (element, id) yang dihapus/diganti, GeoDataFrame baris baru dengan tag mentah, unresolved)
+    remove, rows, unresolved = set(), [], 0
+    for w in ways.itertuples(index=False):
+        if w.action == "delete" or not is_building(w.tags):
+            # key yang tidak ada di layer bangunan diabaikan saat patch
+            remove.add(("way", w.id))
+            continue
+        xy = resolve.lookup(w.nodes) if len(w.nodes) >= 4 and w.nodes[0] == w.nodes[-1] else None
+        if xy is None:
+            unresolved += 1
+            continue
+        remove.add(("way", w.id))
+        rows.append((("way", w.id), w.tags, shapely.Polygon(xy)))
+
+    # node yang digeser -> bangunan yang memakainya dibangun ulang dari snapshot
+    moved = nodes.loc[nodes["action"] == "modify", "id"]
+    rebuild = ways_using(snapshot, moved, "building").difference(pd.Index(ways["id"]))
+    for way_id, nds in way_nodes_of(snapshot, rebuild).items():
+        xy = resolve.lookup(nds)
+        if xy is None:
+            unresolved += 1
+            continue
+        remove.add(("way", way_id))
+        rows.append((("way", way_id), snapshot["ways"].at[way_id, "tags"], shapely.Polygon(xy)))
+
+    # bangunan berupa node (tag building di node)
+    for n in nodes.itertuples(index=False):
+        if n.action == "delete" or not is_building(n.tags):
+            remove.add(("node", n.id))
+        elif not np.isnan(n.lon):
+            remove.add(("node", n.id))
+            rows.append((("node", n.id), n.tags, shapely.Point(n.lon, n.lat)))
+
+    index = pd.MultiIndex.from_tuples([r[0] for r in rows], names=["element", "id"])
+    new = gpd.GeoDataFrame(pd.DataFrame.from_records([r[1] for r in rows], index=index),
+                           geometry=[r[2] for r in rows], crs="EPSG:4326")
+    return remove, new, unresolved
+
+
+def patch_buildings(building, remove, new, extra=None):
+    # ganti baris terdampak; return (building baru, sidecar baru, geometri lama yang dihapus/diganti)
+    keys = pd.MultiIndex.from_frame(building[["element", "id"]].astype({"element": str, "id": np.int64}))
+    hit = keys.isin(list(remove)) if remove else np.zeros(len(building), dtype=bool)
+    old_geoms = building.geometry.values[hit]
+    if len(new):
+        lean, new_extra = project_schema(new)
+        lean = lean.reset_index()  # index (element, id) -> kolom
+    else:
+        lean, new_extra = building.iloc[:0], pd.DataFrame(columns=["element", "id", "key", "value"])
+    patched = pd.concat([building[~hit], lean], ignore_index=True)
+    patched = gpd.GeoDataFrame(patched, geometry=building.geometry.name, crs=building.crs)
+    if extra is not None:
+        ekeys = pd.MultiIndex.from_frame(extra[["element", "id"]].astype({"element": str, "id": np.int64}))
+        extra = pd.concat([extra[~ekeys.isin(list(remove))], new_extra], ignore_index=True)
+    return patched, extra, old_geoms
+
+
+# ---------------------------------------------------------------- jalan
+
+def _osmids(value):
+    return value if isinstance(value, list) else [value]
+
+
+def _edge_geometry(G, u, v, data):
+    if "geometry" in data:
+        return data["geometry"]
+    return shapely.LineString([(G.nodes[u]["x"], G.nodes[u]["y"]), (G.nodes[v]["x"], G.nodes[v]["y"])])
+
+
+def road_definitions(ways, snapshot, by_way):
+    # way id -> (nodes, tags) atau None (dihapus / bukan jalan drive lagi)
+    defs = {}
+    for w in ways.itertuples(index=False):
+        if w.action == "delete" or not is_drivable(w.tags):
+            if w.id in by_way or snapshot["ways"]["kind"].get(w.id) == "road":
+                defs[w.id] = None
+        else:
+            defs[w.id] = (list(w.nodes), w.tags)
+    return defs
+
+
+def _from_snapshot(snapshot, way_ids):
+    ways = snapshot["ways"]
+    nds = way_nodes_of(snapshot, way_ids)
+    return {w: (nds[w], ways.at[w, "tags"]) for w in way_ids if w in nds and ways.at[w, "kind"] == "road"}
+
+
+def patch_roads(G, nodes, ways, snapshot, resolve):
+    # ganti edge milik way yang berubah; return (geometri lama, geometri baru, statistik)
+    import osmnx as ox
+
+    by_way = {}
+    for u, v, k, osmid in G.edges(keys=True, data="osmid"):
+        for w in _osmids(osmid):
+            by_way.setdefault(int(w), []).append((u, v, k))
+    defs = road_definitions(ways, snapshot, by_way)
+
+    # node digeser -> way yang memakainya (snapshot, atau edge graph yang bersinggungan)
+    moved = nodes.loc[nodes["action"] == "modify", "id"]
+    moved_ways = set(ways_using(snapshot, moved, "road"))
+    moved_graph = [int(n) for n in moved if n in G]
+    for n in moved_graph:
+        for _, _, osmid in list(G.in_edges(n, data="osmid")) + list(G.out_edges(n, data="osmid")):
+            moved_ways.update(int(w) for w in _osmids(osmid))
+    defs.update(_from_snapshot(snapshot, moved_ways.difference(defs)))
+
+    # way lain yang memakai node way baru di tengah edge -> dibangun ulang agar bisa dipecah di situ
+    new_nodes = {n for d in defs.values() if d for n in d[0]}
+    crossing = ways_using(snapshot, list(new_nodes.difference(G.nodes)), "road")
+    defs.update(_from_snapshot(snapshot, set(crossing).difference(defs)))
+
+    # edge yang dihapus: semua edge milik way terdampak (edge hasil simplify bisa memuat beberapa way)
+    remove, pending, lost = set(), set(defs), 0
+    while pending:
+        w = pending.pop()
+        for e in by_way.get(w, []):
+            if e in remove:
+                continue
+            remove.add(e)
+            for other in _osmids(G.edges[e]["osmid"]):
+                other = int(other)
+                if other not in defs:
+                    extra = _from_snapshot(snapshot, [other])
+                    defs[other] = extra.get(other)
+                    if other not in extra:
+                        lost += 1
+                    pending.add(other)
+    old_geoms = [_edge_geometry(G, u, v, G.edges[u, v, k]) for u, v, k in remove]
+    touched = {n for u, v, _ in remove for n in (u, v)}
+    G.remove_edges_from(list(remove))
+
+    # node graph yang digeser: update koordinat, edge lain (tanpa definisi way) ikut disesuaikan ujungnya
+    for n in moved_graph:
+        xy = resolve.lookup([n])
+        if xy is None:
+            continue
+        G.nodes[n]["x"], G.nodes[n]["y"] = float(xy[0, 0]), float(xy[0, 1])
+        for u, v, k in list(G.in_edges(n, keys=True)) + list(G.out_edges(n, keys=True)):
+            data = G.edges[u, v, k]
+            old_geoms.append(_edge_geometry(G, u, v, data))
+            coords = np.asarray(data["geometry"].coords) if "geometry" in data else \
+                np.array([[G.nodes[u]["x"], G.nodes[u]["y"]], [G.nodes[v]["x"], G.nodes[v]["y"]]])
+            coords[0 if u == n else -1] = xy[0]
+            if u == v:
+                coords[[0, -1]] = xy[0]
+            if "geometry" in data:
+                data["geometry"] = shapely.LineString(coords)
+            data["length"] = float(ox.distance.great_circle(coords[:-1, 1], coords[:-1, 0],
+                                                            coords[1:, 1], coords[1:, 0]).sum())
+
+    # titik pecah: node graph, ujung way, node yang dipakai >1 way (atau 2x di way yang sama)
+    live = {w: d for w, d in defs.items() if d}
+    counts = pd.Series([n for nds, _ in live.values() for n in nds]).value_counts()
+    split = set(G.nodes) | set(counts.index[counts > 1]) | {n for nds, _ in live.values() for n in (nds[0], nds[-1])}
+
+    new_geoms, added, unresolved = [], 0, 0
+    for w, (nds, tags) in live.items():
+        xy = resolve.lookup(nds)
+        if xy is None or len(nds) < 2:
+            unresolved += 1
+            continue
+        cuts = [i for i, n in enumerate(nds) if i == 0 or i == len(nds) - 1 or n in split]
+        oneway = str(tags.get("oneway", "")).lower()
+        forward = oneway in ONEWAY_YES or tags.get("junction") == "roundabout"
+        backward_only = oneway in ONEWAY_REVERSE
+        attrs = {k: tags[k] for k in ROAD_TAGS if k in tags}
+        for a, b in zip(cuts[:-1], cuts[1:]):
+            seg = xy[a:b + 1]
+            length = float(ox.distance.great_circle(seg[:-1, 1], seg[:-1, 0], seg[1:, 1], seg[1:, 0]).sum())
+            line = shapely.LineString(seg)
+            for u, v, rev in [(nds[a], nds[b], False), (nds[b], nds[a], True)]:
+                if (rev and forward) or (not rev and backward_only):
+                    continue
+                for n, (x, y) in ((u, seg[0] if not rev else seg[-1]), (v, seg[-1] if not rev else seg[0])):
+                    if n not in G:
+                        G.add_node(n, x=float(x), y=float(y))
+                data = dict(attrs, osmid=w, oneway=forward or backward_only, reversed=rev, length=length)
+                if len(seg) > 2:
+                    data["geometry"] = shapely.reverse(line) if rev else line
+                G.add_edge(u, v, **data)
+                added += 1
+                touched.update((u, v))
+            new_geoms.append(line)
+
+    # node yang tidak lagi punya edge dibuang, street_count node terdampak dihitung ulang
+    for n in touched:
+        if n in G and G.degree(n) == 0:
+            G.remove_node(n)
+        elif n in G:
+            G.nodes[n]["street_count"] = len(set(G.predecessors(n)) | set(G.successors(n)))
+    stats = {"edges_removed": len(remove), "edges_added": added, "nodes_moved": len(moved_graph), "ways": len(live),
+             "ways_deleted": sum(d is None for d in defs.values()), "unresolved": unresolved, "lost_ways": lost}
+    return old_geoms, new_geoms, stats
+
+
+# ---------------------------------------------------------------- dirty
+
+def load_dirty(path=DIRTY_PATH):
+    if not os.path.exists(path):
+        return {"zoom": DIRTY_ZOOM, "tiles": [], "kecamatan": [], "bbox": None, "updates": []}
+    with open(path) as f:
+        return json.load(f)
+
+
+def mark_dirty(geoms, kecamatan, source, counts, path=DIRTY_PATH, zoom=DIRTY_ZOOM):
+    dirty = load_dirty(path)
+    geoms = np.asarray([g for g in geoms if g is not None and not g.is_empty], dtype=object)
+    tiles = set(dirty["tiles"]) | tiles_for(geoms, zoom)
+    kec = set(dirty["kecamatan"]) | kecamatan_for(geoms, kecamatan)
+    bbox = dirty["bbox"]
+    if len(geoms):
+        b = shapely.total_bounds(geoms).tolist()
+        bbox = b if bbox is None else [min(bbox[0], b[0]), min(bbox[1], b[1]), max(bbox[2], b[2]), max(bbox[3], b[3])]
+    dirty.update(zoom=zoom, tiles=sorted(tiles), kecamatan=sorted(kec), bbox=bbox)
+    dirty["updates"].append({"timestamp": datetime.now().isoformat(timespec="seconds"), "source": source, **counts})
+    return dirty
+
+
+# ---------------------------------------------------------------- main
+
+def applied(counts):
+    # ada baris bangunan / edge / node graph yang benar-benar berubah
+    b, r = counts["buildings"], counts.get("roads", {})
+    return any((b["removed"], b["upserted"], r.get("edges_removed"), r.get("edges_added"), r.get("nodes_moved")))
+
+
+def apply_changes(nodes, ways, source, snapshot, building_path=BUILDING_PATH, road_path=ROAD_PATH,
+                  dry_run=False):
+    # layer yang berubah ditulis ulang utuh (GeoJSON/GraphML tidak bisa di-patch di tempat);
+    # tanpa perubahan tidak ada layer maupun dirty.json yang ditulis
+    from geofence import fence_paths
+    import osmnx as ox
+
+    counts, old_geoms, new_geoms = {}, [], []
+    G = ox.load_graphml(road_path) if os.path.exists(road_path) else None
+    resolve = NodeIndex(snapshot["nodes"], nodes, G)
+
+    with span("buildings") as s:
+        remove, new, unresolved = building_changes(nodes, ways, snapshot, resolve)
+        building = gpd.read_file(building_path, engine="pyogrio")
+        extra = pd.read_csv(SIDECAR_PATH) if os.path.exists(SIDECAR_PATH) else None
+        patched, extra, old_b = patch_buildings(building, remove, new, extra)
+        old_geoms += list(old_b)
+        new_geoms += list(new.geometry.values)
+        counts["buildings"] = {"removed": int(len(old_b)), "upserted": len(new), "unresolved": unresolved,
+                               "total": len(patched)}
+        s.set(rows=len(new) + len(old_b))
+
+    if G is not None:
+        with span("roads") as s:
+            old_r, new_r, stats = patch_roads(G, nodes, ways, snapshot, resolve)
+            old_geoms += old_r
+            new_geoms += new_r
+            counts["roads"] = stats
+            s.set(rows=stats["edges_removed"] + stats["edges_added"])
+
+    if not applied(counts):
+        if not dry_run and (len(nodes) or len(ways)):
+            # version elemen tetap dicatat (mis. node baru yang baru dipakai way di osc berikutnya)
+            save_snapshot(update_snapshot(snapshot, nodes, ways))
+        return counts, load_dirty()
+
+    kecamatan_path = fence_paths()[1]
+    kecamatan = gpd.read_file(kecamatan_path).to_crs("EPSG:4326") if os.path.exists(kecamatan_path) else None
+    dirty = mark_dirty(old_geoms + new_geoms, kecamatan, source, counts)
+    if dry_run:
+        return counts, dirty
+
+    with span("write"):
+        from export_fgb import fgb_path, write_fgb, road_edges
+        patched.to_file(building_path, driver="GeoJSON")
+        if os.path.exists(fgb_path(building_path)):
+            write_fgb(patched, fgb_path(building_path))
+        if extra is not None:
+            extra.to_csv(SIDECAR_PATH, index=False)
+        if G is not None:
+            ox.save_graphml(G, road_path)
+            if os.path.exists(fgb_path(road_path)):
+                write_fgb(road_edges(road_path), fgb_path(road_path))
+        save_snapshot(update_snapshot(snapshot, nodes, ways))
+        with open(DIRTY_PATH, "w") as f:
+            json.dump(dirty, f, indent=2)
+    return counts, dirty
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Update incremental bangunan & jalan dari perubahan OSM")
+    src = parser.add_mutually_exclusive_group(required=True)
+    src.add_argument("--osc", help="file osmChange (.osc)")
+    src.add_argument("--extract", help="extract .osm baru, dibandingkan dengan snapshot")
+    src.add_argument("--init", help="buat snapshot dari extract .osm (tanpa mengubah layer)")
+    parser.add_argument("--dry-run", action="store_true", help="hitung perubahan & dirty tanpa menulis")
+    args = parser.parse_args()
+
+    path = args.osc or args.extract or args.init
+    with span("parse") as s:
+        nodes, ways, relations = parse_osm(path)
+        s.set(rows=len(nodes) + len(ways), nodes=len(nodes), ways=len(ways), relations=relations)
+    if relations:
+        event(f"⚠️  {relations} relation dilewati (multipolygon bangunan belum didukung)", relations=relations)
+
+    if args.init:
+        snapshot = snapshot_from_extract(nodes, ways)
+        save_snapshot(snapshot)
+        event(f"✅ Saved: {SNAPSHOT_PATH} ({len(snapshot['ways'])} way, {len(snapshot['nodes'])} node)",
+              path=SNAPSHOT_PATH, ways=len(snapshot["ways"]), nodes=len(snapshot["nodes"]))
+        raise SystemExit(0)
+
+    snapshot = load_snapshot()
+    if snapshot["updated"] is None:
+        event("⚠️  Snapshot belum ada: node hanya diambil dari file perubahan & graph jalan "
+              "(jalankan --init dengan extract awal untuk hasil lengkap)")
+    with span("diff"):
+        if args.extract:
+            nodes, ways = diff_extract(nodes, ways, snapshot)
+        else:
+            nodes, ways = filter_applied(nodes, ways, snapshot)
+    event(f"🔄 {len(ways)} way, {len(nodes)} node berubah", ways=len(ways), nodes=len(nodes))
+
+    counts, dirty = apply_changes(nodes, ways, os.path.basename(path), snapshot, dry_run=args.dry_run)
+    event(f"   bangunan: {counts['buildings']}", **counts["buildings"])
+    if "roads" in counts:
+        event(f"   jalan   : {counts['roads']}", **counts["roads"])
+    event(f"   dirty   : {len(dirty['tiles'])} tile z{dirty['zoom']}, kecamatan {dirty['kecamatan']}",
+          tiles=len(dirty["tiles"]), kecamatan=len(dirty["kecamatan"]))
+    if not args.dry_run:
+        event(f"✅ Saved: {DIRTY_PATH}", path=DIRTY_PATH)
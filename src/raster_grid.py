@@ -0,0 +1,265 @@
+"""
+Grid raster exposure (UTM 49S) + statistik zonal per kecamatan
+Layer bangunan, jalan, dan titik di-burn ke raster NumPy yang sejajar di atas extent
+boundary.geojson, disimpan sebagai .npy memory-mapped di data_processed/grid/ (+ meta.json)
+sehingga bisa dipakai ulang tanpa dihitung lagi:
+  building_coverage   fraksi luas sel yang tertutup bangunan (luas footprint di sel centroid)
+  road_density        panjang jalan (km) per km² (ruas dipecah per <= res/4, dijumlah per sel)
+  shelter_distance_m  jarak euclid pusat sel ke tempat evakuasi banjir/tsunami terdekat
+  flood_kde           kernel density Gaussian titik rawan banjir (titik per km²)
+Label raster kecamatan dihitung sekali; satu sweep bincount/reduceat per layer menghasilkan
+statistik semua kecamatan sekaligus.
+
+Contoh:
+  python src/raster_grid.py                     # resolusi 100 m
+  python src/raster_grid.py --res 50 --bandwidth 1000 --force
+"""
+
+import os
+import json
+import argparse
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import shapely
+from scipy.ndimage import gaussian_filter
+from scipy.spatial import cKDTree
+
+from building_metrics import to_utm, UTM_CRS
+from building_schema import load_buildings
+from exposure import is_flood_shelter, undirected_edges
+from geofence import fence_paths
+from instrument import span, event
+from region import REGION
+
+RES_M = 100
+BANDWIDTH_M = 500
+GRID_DIR = REGION.path("grid")
+ZONAL_PATH = REGION.path("grid_zonal_kecamatan.csv")
+LABEL = "kecamatan_label"
+
+
+class Grid:
+    # grid sel persegi UTM; baris 0 = utara (seperti raster GeoTIFF)
+    def __init__(self, x0, y1, res, shape):
+        self.x0, self.y1, self.res = float(x0), float(y1), float(res)
+        self.shape = tuple(int(v) for v in shape)
+
+    @classmethod
+    def from_bounds(cls, bounds, res):
+        x0, y0, x1, y1 = bounds
+        shape = (int(np.ceil((y1 - y0) / res)), int(np.ceil((x1 - x0) / res)))
+        return cls(x0, y1, res, shape)
+
+    @property
+    def transform(self):
+        # affine (a, b, c, d, e, f) ala GDAL/rasterio
+        return [self.res, 0.0, self.x0, 0.0, -self.res, self.y1]
+
+    @property
+    def cell_area_km2(self):
+        return self.res ** 2 / 1e6
+
+    def index(self, x, y):
+        # indeks sel datar untuk koordinat; -1 di luar grid
+        col = np.floor((np.asarray(x) - self.x0) / self.res).astype(np.int64)
+        row = np.floor((self.y1 - np.asarray(y)) / self.res).astype(np.int64)
+        inside = (row >= 0) & (row < self.shape[0]) & (col >= 0) & (col < self.shape[1])
+        return np.where(inside, row * self.shape[1] + col, -1)
+
+    def centers(self):
+        xs = self.x0 + (np.arange(self.shape[1]) + 0.5) * self.res
+        ys = self.y1 - (np.arange(self.shape[0]) + 0.5) * self.res
+        return np.meshgrid(xs, ys)
+
+    def burn_sum(self, x, y, weights=None):
+        idx = self.index(x, y)
+        keep = idx >= 0
+        w = None if weights is None else np.asarray(weights)[keep]
+        return np.bincount(idx[keep], weights=w, minlength=self.shape[0] * self.shape[1]).reshape(self.shape)
+
+    def meta(self):
+        return {"crs": UTM_CRS, "res": self.res, "shape": list(self.shape), "transform": self.transform}
+
+
+def building_coverage(grid, building_utm):
+    # footprint jauh lebih kecil dari sel -> luas dijumlah di sel centroid
+    xy = shapely.get_coordinates(shapely.centroid(building_utm))
+    area = grid.burn_sum(xy[:, 0], xy[:, 1], shapely.area(building_utm))
+    return np.minimum(area / grid.res ** 2, 1.0)
+
+
+def road_density(grid, lines_utm):
+    # ruas dipecah per <= res/4 lalu panjang tiap potongan dijumlah di sel titik tengahnya
+    parts = shapely.segmentize(lines_utm, grid.res / 4)
+    coords, line_idx = shapely.get_coordinates(parts, return_index=True)
+    same = line_idx[1:] == line_idx[:-1]
+    a, b = coords[:-1][same], coords[1:][same]
+    mid = (a + b) / 2
+    length = np.hypot(*(b - a).T)
+    return grid.burn_sum(mid[:, 0], mid[:, 1], length) / 1e3 / grid.cell_area_km2
+
+
+def shelter_distance(grid, shelters_xy):
+    cx, cy = grid.centers()
+    if not len(shelters_xy):
+        return np.full(grid.shape, np.inf)
+    dist, _ = cKDTree(shelters_xy).query(np.column_stack([cx.ravel(), cy.ravel()]))
+    return dist.reshape(grid.shape)
+
+
+def point_kde(grid, points_xy, bandwidth_m=BANDWIDTH_M):
+    # histogram titik di-smooth Gaussian (sigma = bandwidth), satuan titik per km²
+    counts = grid.burn_sum(points_xy[:, 0], points_xy[:, 1]).astype(float)
+    return gaussian_filter(counts, sigma=bandwidth_m / grid.res, mode="constant") / grid.cell_area_km2
+
+
+def label_raster(grid, kecamatan_utm):
+    # 0 = di luar semua kecamatan, i + 1 = kecamatan ke-i (pusat sel di dalam polygon)
+    cx, cy = grid.centers()
+    labels = np.zeros(cx.size, dtype=np.int16)
+    pt, poly = shapely.STRtree(kecamatan_utm).query(shapely.points(cx.ravel(), cy.ravel()), predicate="within")
+    labels[pt] = poly + 1
+    return labels.reshape(grid.shape)
+
+
+def zonal_stats(labels, rasters, names):
+    # satu argsort label dipakai ulang: count/sum/mean/std (bincount), min/max (reduceat)
+    flat = labels.ravel()
+    n = len(names) + 1
+    order = np.argsort(flat, kind="stable")
+    sorted_labels = flat[order]
+    starts = np.searchsorted(sorted_labels, np.arange(n))
+    counts = np.bincount(flat, minlength=n)
+    present = counts > 0
+    table = pd.DataFrame({"kecamatan": names, "cells": counts[1:]})
+    for layer, values in rasters.items():
+        v = np.asarray(values, dtype=float).ravel()
+        finite = np.isfinite(v)
+        v0 = np.where(finite, v, 0.0)
+        cnt = np.bincount(flat, weights=finite, minlength=n)
+        total = np.bincount(flat, weights=v0, minlength=n)
+        sq = np.bincount(flat, weights=v0 ** 2, minlength=n)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = total / cnt
+            std = np.sqrt(np.maximum(sq / cnt - mean ** 2, 0))
+        sv = v[order]
+        lo = np.full(n, np.nan)
+        hi = np.full(n, np.nan)
+        lo[present] = np.fmin.reduceat(sv, starts[present])
+        hi[present] = np.fmax.reduceat(sv, starts[present])
+        table[f"{layer}_mean"] = mean[1:]
+        table[f"{layer}_std"] = std[1:]
+        table[f"{layer}_min"] = lo[1:]
+        table[f"{layer}_max"] = hi[1:]
+        table[f"{layer}_sum"] = total[1:]
+    return table
+
+
+def write_raster(name, array, grid_dir=GRID_DIR):
+    path = os.path.join(grid_dir, f"{name}.npy")
+    out = np.lib.format.open_memmap(path, mode="w+", dtype=array.dtype, shape=array.shape)
+    out[:] = array
+    out.flush()
+    return path
+
+
+def load_grid(grid_dir=GRID_DIR, layers=None):
+    # (Grid, dict nama -> array memmap read-only, meta)
+    with open(os.path.join(grid_dir, "meta.json")) as f:
+        meta = json.load(f)
+    grid = Grid(meta["transform"][2], meta["transform"][5], meta["res"], meta["shape"])
+    names = layers or list(meta["layers"]) + [LABEL]
+    arrays = {n: np.load(os.path.join(grid_dir, f"{n}.npy"), mmap_mode="r") for n in names}
+    return grid, arrays, meta
+
+
+def source_stamp(paths):
+    return {os.path.basename(p): os.path.getmtime(p) for p in paths if os.path.exists(p)}
+
+
+def build_grid(res=RES_M, bandwidth_m=BANDWIDTH_M, grid_dir=GRID_DIR):
+    import osmnx as ox
+
+    boundary_path, kecamatan_path = fence_paths()
+    sources = [boundary_path, kecamatan_path, REGION.path("building.geojson"), REGION.path("road.graphml"),
+               REGION.path(f"{REGION.flood_name}.geojson"), REGION.path("tempatevakuasinew.geojson")]
+    with span("load"):
+        boundary = gpd.read_file(boundary_path)
+        kecamatan = gpd.read_file(kecamatan_path)
+        building = load_buildings(sources[2], columns=[])
+        edges = undirected_edges(ox.graph_to_gdfs(ox.load_graphml(sources[3]), nodes=False))
+        flood = gpd.read_file(sources[4])
+        evac = gpd.read_file(sources[5])
+
+    with span("project"):
+        bounds = shapely.total_bounds(to_utm(np.asarray(boundary.geometry.values), boundary.crs or "EPSG:4326"))
+        grid = Grid.from_bounds(bounds, res)
+        building_utm = to_utm(np.asarray(building.geometry.values), building.crs or "EPSG:4326")
+        lines_utm = to_utm(np.asarray(edges.geometry.values), edges.crs or "EPSG:4326")
+        flood_xy = shapely.get_coordinates(to_utm(np.asarray(flood.geometry.values), flood.crs or "EPSG:4326"))
+        shelters = evac[is_flood_shelter(evac)]
+        shelter_xy = shapely.get_coordinates(to_utm(np.asarray(shelters.geometry.values), evac.crs or "EPSG:4326"))
+        kecamatan_utm = to_utm(np.asarray(kecamatan.geometry.values), kecamatan.crs or "EPSG:4326")
+    event(f"🧮 Grid {grid.shape[0]}x{grid.shape[1]} sel @ {res:g} m", rows=grid.shape[0], cols=grid.shape[1])
+
+    rasters = {}
+    with span("burn", rows=grid.shape[0] * grid.shape[1]):
+        with span("building_coverage", rows=len(building_utm)):
+            rasters["building_coverage"] = building_coverage(grid, building_utm).astype(np.float32)
+        with span("road_density", rows=len(lines_utm)):
+            rasters["road_density"] = road_density(grid, lines_utm).astype(np.float32)
+        with span("shelter_distance_m", rows=len(shelter_xy)):
+            rasters["shelter_distance_m"] = shelter_distance(grid, shelter_xy).astype(np.float32)
+        with span("flood_kde", rows=len(flood_xy)):
+            rasters["flood_kde"] = point_kde(grid, flood_xy, bandwidth_m).astype(np.float32)
+        with span("label", rows=len(kecamatan_utm)):
+            labels = label_raster(grid, kecamatan_utm)
+
+    os.makedirs(grid_dir, exist_ok=True)
+    with span("write"):
+        for name, array in rasters.items():
+            write_raster(name, array, grid_dir)
+        write_raster(LABEL, labels, grid_dir)
+        meta = dict(grid.meta(), layers=list(rasters), bandwidth_m=bandwidth_m,
+                    labels=list(kecamatan["kecamatan"].astype(str)), sources=source_stamp(sources))
+        with open(os.path.join(grid_dir, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+    return grid, dict(rasters, **{LABEL: labels}), meta
+
+
+def is_fresh(res, bandwidth_m, grid_dir=GRID_DIR):
+    # grid di disk masih sesuai resolusi/bandwidth dan tidak lebih tua dari layer sumber
+    path = os.path.join(grid_dir, "meta.json")
+    if not os.path.exists(path):
+        return False
+    with open(path) as f:
+        meta = json.load(f)
+    sources = [os.path.join(REGION.output_dir, name) for name in meta.get("sources", {})]
+    return (meta["res"] == res and meta.get("bandwidth_m") == bandwidth_m
+            and source_stamp(sources) == meta.get("sources")
+            and all(os.path.exists(os.path.join(grid_dir, f"{n}.npy")) for n in list(meta["layers"]) + [LABEL]))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Grid raster exposure + statistik zonal per kecamatan")
+    parser.add_argument("--res", type=float, default=RES_M, help="ukuran sel (meter)")
+    parser.add_argument("--bandwidth", type=float, default=BANDWIDTH_M, help="bandwidth KDE titik banjir (meter)")
+    parser.add_argument("--force", action="store_true", help="burn ulang walau grid di disk masih baru")
+    parser.add_argument("--output", default=ZONAL_PATH)
+    args = parser.parse_args()
+
+    if not args.force and is_fresh(args.res, args.bandwidth):
+        event(f"♻️  Grid di {GRID_DIR} masih sesuai, dipakai ulang (memmap)")
+        grid, arrays, meta = load_grid()
+    else:
+        grid, arrays, meta = build_grid(args.res, args.bandwidth)
+        event(f"✅ Saved: {GRID_DIR} ({', '.join(meta['layers'])} + {LABEL})", path=GRID_DIR)
+
+    with span("zonal", rows=arrays[LABEL].size) as s:
+        table = zonal_stats(arrays[LABEL], {n: arrays[n] for n in meta["layers"]}, meta["labels"])
+        s.set(kecamatan=len(table))
+    table.to_csv(args.output, index=False)
+    event(f"✅ Saved: {args.output} ({len(table)} kecamatan)", path=args.output, rows=len(table))
+    print(table[["kecamatan", "cells"] + [f"{n}_mean" for n in meta["layers"]]].to_string(index=False))
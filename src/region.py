@@ -0,0 +1,119 @@
+"""
+Konfigurasi region (kabupaten/kota di Jawa Tengah) untuk pipeline
+Region dipilih lewat environment REGION=<slug>, default Kabupaten Cilacap.
+Tanpa REGION output tetap di data_processed/ (seperti sebelumnya); dengan
+REGION output masuk namespace data_processed/<slug>/
+"""
+
+import os
+from dataclasses import dataclass
+
+PROVINSI = "Jawa Tengah"
+DATA_RAW = "data_raw"
+DATA_PROCESSED = "data_processed"
+DEFAULT_REGION = "cilacap"
+
+# Daftar 24 kecamatan resmi Kabupaten Cilacap
+KECAMATAN_CILACAP = (
+    'Adipala', 'Bantarsari', 'Binangun', 'Cilacap Selatan', 'Cilacap Tengah',
+    'Cilacap Utara', 'Cimanggu', 'Cipari', 'Dayeuhluhur', 'Gandrungmangu',
+    'Jeruklegi', 'Kampung Laut', 'Karangpucung', 'Kawunganten', 'Kedungreja',
+    'Kesugihan', 'Kroya', 'Majenang', 'Maos', 'Nusawungu', 'Patimuan',
+    'Sampang', 'Sidareja', 'Wanareja'
+)
+
+
+@dataclass(frozen=True)
+class Region:
+    slug: str
+    name: str
+    kind: str = "Kabupaten"
+    kecamatan: tuple = ()
+
+    @property
+    def title(self):
+        return f"{self.kind} {self.name}"
+
+    @property
+    def area(self):
+        # query geocode OSM/Nominatim
+        return f"{self.title}, {PROVINSI}, Indonesia"
+
+    @property
+    def namespaced(self):
+        return "REGION" in os.environ
+
+    @property
+    def output_dir(self):
+        if self.namespaced:
+            return os.path.join(DATA_PROCESSED, self.slug)
+        return DATA_PROCESSED
+
+    @property
+    def raw_dir(self):
+        # file mentah Cilacap ada langsung di data_raw/, region lain di data_raw/<slug>/
+        if self.slug == DEFAULT_REGION:
+            return DATA_RAW
+        return os.path.join(DATA_RAW, self.slug)
+
+    @property
+    def bps_dir(self):
+        # folder shapefile BPS hasil download, mis. ~/Downloads/KAB. CILACAP
+        # override per region: BPS_DIR_<SLUG> (mis. BPS_DIR_KOTA_TEGAL), atau BPS_DIR dengan
+        # placeholder {slug}/{name} (mis. /data/bps/{slug}); BPS_DIR polos berlaku untuk semua region
+        specific = os.environ.get(f"BPS_DIR_{self.slug.upper()}")
+        if specific:
+            return specific
+        if os.environ.get("BPS_DIR"):
+            return os.environ["BPS_DIR"].format(slug=self.slug, name=self.name)
+        prefix = "KAB." if self.kind == "Kabupaten" else "KOTA"
+        return os.path.expanduser(f"~/Downloads/{prefix} {self.name.upper()}")
+
+    @property
+    def flood_name(self):
+        return f"Data_Desa_Rawan_Banjir_di_{self.name.replace(' ', '_')}"
+
+    @property
+    def kecamatan_name(self):
+        # nama file layer kecamatan hasil filter (kecamatan_cilacap_24 untuk Cilacap)
+        if self.kecamatan:
+            return f"kecamatan_{self.slug}_{len(self.kecamatan)}"
+        return f"kecamatan_{self.slug}_all"
+
+    def path(self, filename):
+        return os.path.join(self.output_dir, filename)
+
+
+KABUPATEN = [
+    "Banjarnegara", "Banyumas", "Batang", "Blora", "Boyolali", "Brebes", "Cilacap",
+    "Demak", "Grobogan", "Jepara", "Karanganyar", "Kebumen", "Kendal", "Klaten",
+    "Kudus", "Magelang", "Pati", "Pekalongan", "Pemalang", "Purbalingga", "Purworejo",
+    "Rembang", "Semarang", "Sragen", "Sukoharjo", "Tegal", "Temanggung", "Wonogiri",
+    "Wonosobo",
+]
+KOTA = ["Magelang", "Pekalongan", "Salatiga", "Semarang", "Surakarta", "Tegal"]
+
+
+def _slug(name):
+    return name.lower().replace(" ", "_")
+
+
+# 35 kabupaten/kota di Jawa Tengah
+REGIONS = {}
+for _name in KABUPATEN:
+    REGIONS[_slug(_name)] = Region(
+        _slug(_name), _name, "Kabupaten",
+        KECAMATAN_CILACAP if _name == "Cilacap" else (),
+    )
+for _name in KOTA:
+    REGIONS["kota_" + _slug(_name)] = Region("kota_" + _slug(_name), _name, "Kota")
+
+
+def get_region(slug=None):
+    slug = slug or os.environ.get("REGION") or DEFAULT_REGION
+    if slug not in REGIONS:
+        raise KeyError(f"Region tidak dikenal: {slug} (pilihan: {', '.join(sorted(REGIONS))})")
+    return REGIONS[slug]
+
+
+REGION = get_region()
@@ -0,0 +1,279 @@
+"""
+Render peta layer (boundary + jalan + bangunan + titik banjir + evakuasi) resolusi tinggi per tile
+Extent peta dipecah menjadi tile piksel; tiap tile dirender di worker terpisah dan hanya
+membaca fitur yang berpotongan dengan bbox tile-nya dari FlatGeobuf (export_fgb.py),
+sehingga memori per worker tetap kecil walau seluruh bangunan ikut digambar.
+Tile lalu dijahit (PIL) menjadi PNG; opsional Cloud-Optimized GeoTIFF jika rasterio terpasang.
+
+Butuh layer .fgb: python src/export_fgb.py --layers boundary,building,road,flood,evac
+
+Contoh:
+  python src/render_tiles.py                          # 12x12 inch, 300 dpi, semua core
+  python src/render_tiles.py --dpi 600 --tile 1024 --workers 4
+  python src/render_tiles.py --cog                    # + data_processed/layer_map.tif (EPSG:4326)
+"""
+
+import os
+import math
+import shutil
+import argparse
+import tempfile
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from export_fgb import LAYERS, fgb_path, read_bbox
+from instrument import span, event, maxrss_mb
+from region import REGION
+
+FIGSIZE_IN = 12
+DPI = 300
+TILE_PX = 2048
+OUTPUT_PATH = REGION.path("layer_map.png")
+COG_PATH = REGION.path("layer_map.tif")
+
+# gaya sama dengan visualize_layer.py; urutan = zorder
+STYLE = {
+    "road": dict(linewidth=0.8, color="#0072B2"),
+    "building": dict(color="#D55E00", alpha=0.9, edgecolor="#8B3E00", linewidth=0.3),
+    "boundary": dict(facecolor="none", edgecolor="#000000", linewidth=2),
+    "flood": dict(markersize=30, color="#009E73", marker="o", edgecolor="k", linewidth=1),
+    "evac_other": dict(markersize=30, color="#999999", marker="^", edgecolor="#666666",
+                       linewidth=0.8, alpha=0.6),
+    "evac_flood": dict(markersize=40, color="#F0E442", marker="^", edgecolor="k", linewidth=1),
+}
+
+
+def layer_paths():
+    paths = {name: fgb_path(REGION.path(LAYERS[name])) for name in ("boundary", "road", "building", "flood", "evac")}
+    missing = [p for p in paths.values() if not os.path.exists(p)]
+    if missing:
+        raise FileNotFoundError(f"Layer FlatGeobuf belum ada: {missing} (jalankan src/export_fgb.py)")
+    return paths
+
+
+def pad_px(dpi, style=STYLE):
+    # margin baca (piksel) agar marker/garis yang terpotong tepi tile tetap tergambar di kedua tile:
+    # setengah simbol terbesar (markersize = luas dalam pt², + garis tepi), ikut skala dpi
+    extent_pt = max(math.sqrt(s.get("markersize", 0)) / 2 + s.get("linewidth", 0) / 2 for s in style.values())
+    return int(math.ceil(extent_pt * dpi / 72)) + 1
+
+
+def map_grid(bounds, figsize_in=FIGSIZE_IN, dpi=DPI, margin=0.02):
+    # extent peta (derajat) + ukuran kanvas piksel; aspek mengikuti koreksi lintang seperti geopandas.plot
+    x0, y0, x1, y1 = bounds
+    dx, dy = (x1 - x0) * margin, (y1 - y0) * margin
+    x0, y0, x1, y1 = x0 - dx, y0 - dy, x1 + dx, y1 + dy
+    aspect = 1 / math.cos(math.radians((y0 + y1) / 2))
+    ratio = (y1 - y0) * aspect / (x1 - x0)
+    side = int(round(figsize_in * dpi))
+    width, height = (side, max(1, int(round(side * ratio)))) if ratio <= 1 else \
+                    (max(1, int(round(side / ratio))), side)
+    return (x0, y0, x1, y1), width, height
+
+
+def tile_jobs(extent, width, height, tile_px=TILE_PX):
+    # (col, row, px_x, px_y, w, h, bbox tile derajat)
+    x0, y0, x1, y1 = extent
+    sx, sy = (x1 - x0) / width, (y1 - y0) / height
+    jobs = []
+    for py in range(0, height, tile_px):
+        for px in range(0, width, tile_px):
+            w, h = min(tile_px, width - px), min(tile_px, height - py)
+            bbox = (x0 + px * sx, y1 - (py + h) * sy, x0 + (px + w) * sx, y1 - py * sy)
+            jobs.append((px // tile_px, py // tile_px, px, py, w, h, bbox))
+    return jobs, (sx, sy)
+
+
+def _read_tile_layers(paths, bbox):
+    from exposure import is_flood_shelter
+
+    frames = {
+        "road": read_bbox(paths["road"], bbox, columns=[]),
+        "building": read_bbox(paths["building"], bbox, columns=[]),
+        "boundary": read_bbox(paths["boundary"], bbox, columns=[]),
+        "flood": read_bbox(paths["flood"], bbox, columns=[]),
+    }
+    evac = read_bbox(paths["evac"], bbox)
+    mask = is_flood_shelter(evac)
+    frames["evac_other"], frames["evac_flood"] = evac[~mask], evac[mask]
+    return frames
+
+
+def render_tile(job):
+    # dijalankan di worker: baca fitur bbox tile (+margin), render ke PNG sementara
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    paths, tmp_dir, dpi, pixel, (col, row, px, py, w, h, bbox) = job
+    pad = pad_px(dpi)
+    pad_x, pad_y = pad * pixel[0], pad * pixel[1]
+    read_box = (bbox[0] - pad_x, bbox[1] - pad_y, bbox[2] + pad_x, bbox[3] + pad_y)
+    frames = _read_tile_layers(paths, read_box)
+    features = sum(len(f) for f in frames.values())
+
+    fig = plt.figure(figsize=(w / dpi, h / dpi), dpi=dpi)
+    ax = fig.add_axes([0, 0, 1, 1])
+    for z, (name, style) in enumerate(STYLE.items(), start=2):
+        if len(frames[name]):
+            frames[name].plot(ax=ax, aspect=None, zorder=z, **style)
+    ax.set_xlim(bbox[0], bbox[2])
+    ax.set_ylim(bbox[1], bbox[3])
+    ax.set_axis_off()
+    path = os.path.join(tmp_dir, f"tile_{row}_{col}.png")
+    fig.savefig(path, dpi=dpi, facecolor="white")
+    plt.close(fig)
+    peak_mb = maxrss_mb()
+    return px, py, path, features, peak_mb
+
+
+def render_tiles(jobs, paths, tmp_dir, dpi, pixel, workers=None):
+    args = [(paths, tmp_dir, dpi, pixel, job) for job in jobs]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(args) == 1:
+        return [render_tile(a) for a in args]
+    # worker baru per beberapa tile agar memori matplotlib tidak menumpuk
+    ctx = mp.get_context("spawn")
+    with ProcessPoolExecutor(min(workers, len(args)), mp_context=ctx, max_tasks_per_child=8) as pool:
+        return list(pool.map(render_tile, args))
+
+
+def stitch(tiles, width, height):
+    from PIL import Image
+
+    Image.MAX_IMAGE_PIXELS = None
+    canvas = Image.new("RGB", (width, height), "white")
+    for px, py, path, _, _ in tiles:
+        with Image.open(path) as tile:
+            canvas.paste(tile.convert("RGB"), (px, py))
+    return canvas
+
+
+def _figure_image(draw, dpi):
+    # elemen peta kecil (legend, panah utara, judul) dirender sekali lalu ditempel ke kanvas
+    import io
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from PIL import Image
+
+    fig = plt.figure(figsize=(1, 1), dpi=dpi)
+    draw(fig)
+    buf = io.BytesIO()
+    fig.savefig(buf, dpi=dpi, bbox_inches="tight", pad_inches=0.05, transparent=True)
+    plt.close(fig)
+    buf.seek(0)
+    return Image.open(buf).convert("RGBA")
+
+
+def decorate(canvas, dpi, counts, title):
+    from matplotlib.lines import Line2D
+    from matplotlib.patches import Patch
+    from PIL import Image
+
+    handles = [
+        Line2D([0], [0], color="#000000", lw=2, label="Boundary"),
+        Line2D([0], [0], color="#0072B2", lw=1, label="Roads"),
+        Patch(facecolor="#D55E00", edgecolor="#8B3E00", label="Buildings"),
+        Line2D([0], [0], marker='o', color='w', markerfacecolor="#009E73",
+               markeredgecolor='k', markersize=8, label=f"Flood-risk Points ({counts['flood']})"),
+        Line2D([0], [0], marker='^', color='w', markerfacecolor="#F0E442",
+               markeredgecolor='k', markersize=9, label=f"Evac Flood/Tsunami ({counts['evac_flood']})"),
+        Line2D([0], [0], marker='^', color='w', markerfacecolor="#999999",
+               markeredgecolor='#666666', markersize=7, label=f"Evac Other ({counts['evac_other']})"),
+    ]
+    legend = _figure_image(lambda fig: fig.legend(handles=handles, loc="center", frameon=True, fontsize=10), dpi)
+
+    def north(fig):
+        ax = fig.add_axes([0, 0, 0.4, 1])
+        ax.annotate('', xy=(0.5, 0.85), xytext=(0.5, 0.1), xycoords='axes fraction',
+                    arrowprops=dict(facecolor='k', width=2, headwidth=8))
+        ax.text(0.5, 0.9, 'N', transform=ax.transAxes, ha='center', va='bottom',
+                fontsize=12, fontweight='bold')
+        ax.set_axis_off()
+
+    arrow = _figure_image(north, dpi)
+    header = _figure_image(lambda fig: fig.text(0.5, 0.5, title, ha="center", va="center", fontsize=16), dpi)
+
+    margin = int(0.15 * dpi)
+    canvas = canvas.convert("RGBA")
+    canvas.alpha_composite(legend, (margin, max(0, canvas.height - legend.height - margin)))
+    canvas.alpha_composite(arrow, (max(0, canvas.width - arrow.width - margin),
+                                   max(0, int(canvas.height * 0.85) - arrow.height)))
+    out = Image.new("RGBA", (canvas.width, canvas.height + header.height + margin), "white")
+    out.alpha_composite(header, ((canvas.width - header.width) // 2, margin // 2))
+    out.alpha_composite(canvas, (0, header.height + margin))
+    return out.convert("RGB")
+
+
+def write_cog(canvas, extent, path):
+    # GeoTIFF RGB ber-georeferensi EPSG:4326, driver COG (GDAL >= 3.1) lewat rasterio
+    import rasterio
+    from rasterio.transform import from_bounds
+
+    data = np.asarray(canvas).transpose(2, 0, 1)
+    transform = from_bounds(*extent, canvas.width, canvas.height)
+    with rasterio.open(path, "w", driver="COG", width=canvas.width, height=canvas.height, count=3,
+                       dtype="uint8", crs="EPSG:4326", transform=transform,
+                       compress="deflate", photometric="RGB") as dst:
+        dst.write(data)
+    return path
+
+
+def layer_counts(paths):
+    from exposure import is_flood_shelter
+    import geopandas as gpd
+
+    flood = gpd.read_file(paths["flood"], columns=[], engine="pyogrio")
+    evac = gpd.read_file(paths["evac"], engine="pyogrio")
+    n_flood = int(is_flood_shelter(evac).sum())
+    return {"flood": len(flood), "evac_flood": n_flood, "evac_other": len(evac) - n_flood}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render peta layer resolusi tinggi per tile secara paralel")
+    parser.add_argument("--dpi", type=int, default=DPI)
+    parser.add_argument("--size", type=float, default=FIGSIZE_IN, help="sisi terpanjang peta (inch)")
+    parser.add_argument("--tile", type=int, default=TILE_PX, help="ukuran tile (piksel)")
+    parser.add_argument("--workers", type=int, default=None, help="default: jumlah core")
+    parser.add_argument("--output", default=OUTPUT_PATH)
+    parser.add_argument("--cog", nargs="?", const=COG_PATH, default=None,
+                        help=f"tulis juga Cloud-Optimized GeoTIFF (butuh rasterio), default {COG_PATH}")
+    args = parser.parse_args()
+
+    if args.cog:
+        try:
+            import rasterio  # noqa: F401
+        except ImportError:
+            parser.error("--cog butuh rasterio (pip install rasterio)")
+
+    paths = layer_paths()
+    import geopandas as gpd
+    bounds = gpd.read_file(paths["boundary"], engine="pyogrio").total_bounds
+    extent, width, height = map_grid(bounds, args.size, args.dpi)
+    jobs, pixel = tile_jobs(extent, width, height, args.tile)
+    workers = args.workers or os.cpu_count() or 1
+    event(f"🧩 Kanvas {width}x{height} px @ {args.dpi} dpi, {len(jobs)} tile, {min(workers, len(jobs))} worker",
+          width=width, height=height, tiles=len(jobs), workers=workers)
+
+    tmp_dir = tempfile.mkdtemp(prefix="tiles_")
+    try:
+        with span("render_tiles", tiles=len(jobs), workers=workers) as s:
+            tiles = render_tiles(jobs, paths, tmp_dir, args.dpi, pixel, workers)
+            s.set(rows=sum(t[3] for t in tiles), worker_peak_mb=round(max(t[4] for t in tiles), 1))
+        with span("stitch", rows=len(tiles)):
+            canvas = stitch(tiles, width, height)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    with span("write"):
+        if args.cog:
+            write_cog(canvas, extent, args.cog)
+            event(f"✅ Saved: {args.cog}", path=args.cog, width=width, height=height)
+        title = "Layered Map: Boundary + Roads + Buildings + Flood + Evacuation"
+        image = decorate(canvas, args.dpi, layer_counts(paths), title)
+        image.save(args.output, dpi=(args.dpi, args.dpi))
+    event(f"✅ Saved: {args.output} ({image.width}x{image.height} px)", path=args.output,
+          width=image.width, height=image.height)
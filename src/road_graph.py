@@ -0,0 +1,211 @@
+"""
+Graph jalan turunan untuk routing: simpang digabung, kecepatan & waktu tempuh, SCC terbesar
+road.graphml mentah (network_type="drive") menyimpan simpang kompleks sebagai kumpulan node
+dan edge sangat pendek. Tahap ini memproyeksikan graph ke UTM 49S, menggabungkan simpang dalam
+toleransi (ox.consolidate_intersections), menambah speed_kph / travel_time per edge, lalu
+menyimpan komponen terhubung kuat terbesar saja. Hasilnya disimpan sebagai array CSR (.npz)
+di data_processed/road_cache/ dengan key hash isi road.graphml + toleransi, jadi routing.py,
+simulate_scenarios.py dan assign_shelters.py tidak perlu parse GraphML / konsolidasi ulang
+selama graph sumbernya tidak berubah (mis. setelah osm_update.py hash berubah -> dibangun ulang).
+
+Contoh:
+  python src/road_graph.py                      # bangun cache (jika belum ada) + laporan
+  python src/road_graph.py --tolerance 15 --force
+  python src/road_graph.py --bench 5            # bandingkan routing graph mentah vs turunan
+"""
+
+import os
+import json
+import time
+import glob
+import hashlib
+import argparse
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import shapely
+
+from building_metrics import UTM_CRS, to_utm
+from instrument import span, event
+from region import REGION
+from routing import GRAPH_PATH, EVAC_PATH, RoadCSR, graph_to_csr, nearest_shelter
+
+TOLERANCE_M = 10
+CACHE_DIR = REGION.path("road_cache")
+# kecepatan default (km/jam) per kelas jalan jika maxspeed OSM kosong
+HWY_SPEEDS = {
+    "motorway": 80, "trunk": 60, "primary": 50, "secondary": 40, "tertiary": 35,
+    "unclassified": 30, "residential": 25, "living_street": 15, "service": 15,
+    "motorway_link": 50, "trunk_link": 40, "primary_link": 35, "secondary_link": 30, "tertiary_link": 25,
+}
+FALLBACK_KPH = 25
+ARRAYS = ("nodes", "x", "y", "edge_u", "edge_v", "length", "speed_kph", "travel_time",
+          "geom_coords", "geom_offsets", "alias_osmid", "alias_pos")
+
+
+def graph_hash(path, chunk=1 << 20):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def cache_key(path, tolerance_m=TOLERANCE_M):
+    return f"{graph_hash(path)[:16]}-t{tolerance_m:g}"
+
+
+def derive_graph(G, tolerance_m=TOLERANCE_M):
+    # -> (graph turunan UTM, jumlah node/edge tiap tahap)
+    import osmnx as ox
+
+    counts = {"raw": (len(G), G.number_of_edges())}
+    P = ox.project_graph(G, to_crs=UTM_CRS)
+    C = ox.consolidate_intersections(P, tolerance=tolerance_m, rebuild_graph=True, dead_ends=False)
+    counts["consolidated"] = (len(C), C.number_of_edges())
+    C = ox.add_edge_speeds(C, hwy_speeds=HWY_SPEEDS, fallback=FALLBACK_KPH)
+    C = ox.add_edge_travel_times(C)
+    C = ox.truncate.largest_component(C, strongly=True)
+    counts["scc"] = (len(C), C.number_of_edges())
+    return C, counts
+
+
+def derived_arrays(C):
+    # graph turunan -> array flat; node diberi osmid asli terkecil di cluster-nya
+    csr = graph_to_csr(C, "length")
+    original = [d.get("osmid_original", n) for n, d in C.nodes(data=True)]
+    members = [m if isinstance(m, list) else [m] for m in original]
+    alias_osmid = np.array([int(o) for m in members for o in m], dtype=np.int64)
+    alias_pos = np.repeat(np.arange(len(members)), [len(m) for m in members])
+    _, coords, (offsets,) = shapely.to_ragged_array(csr.geometry)
+    return {
+        "nodes": np.array([min(int(o) for o in m) for m in members], dtype=np.int64),
+        "x": csr.x, "y": csr.y, "edge_u": csr.edge_u, "edge_v": csr.edge_v,
+        "length": csr.weight, "speed_kph": csr.speed_kph, "travel_time": csr.travel_time,
+        "geom_coords": coords, "geom_offsets": offsets,
+        "alias_osmid": alias_osmid, "alias_pos": alias_pos,
+    }
+
+
+def csr_from_arrays(arrays, weight="length"):
+    geometry = shapely.from_ragged_array(shapely.GeometryType.LINESTRING,
+                                         arrays["geom_coords"], (arrays["geom_offsets"],))
+    return RoadCSR(
+        nodes=arrays["nodes"], x=arrays["x"], y=arrays["y"],
+        edge_u=arrays["edge_u"], edge_v=arrays["edge_v"],
+        weight=np.asarray(arrays[weight], dtype=float), geometry=geometry,
+        speed_kph=arrays["speed_kph"], travel_time=arrays["travel_time"],
+        aliases=pd.Series(arrays["alias_pos"], index=arrays["alias_osmid"]),
+    )
+
+
+def build_derived(path=GRAPH_PATH, tolerance_m=TOLERANCE_M, cache_dir=CACHE_DIR, key=None):
+    import osmnx as ox
+
+    key = key or cache_key(path, tolerance_m)
+    with span("load_graphml") as s:
+        G = ox.load_graphml(path)
+        s.set(rows=G.number_of_edges())
+    with span("derive", rows=G.number_of_edges()) as s:
+        C, counts = derive_graph(G, tolerance_m)
+        arrays = derived_arrays(C)
+        s.set(nodes=len(arrays["nodes"]), edges=len(arrays["edge_u"]))
+
+    os.makedirs(cache_dir, exist_ok=True)
+    # cache lama untuk toleransi yang sama tidak terpakai lagi setelah graph sumber berubah
+    for old in glob.glob(os.path.join(cache_dir, f"road_*-t{tolerance_m:g}.*")):
+        os.remove(old)
+    np.savez(os.path.join(cache_dir, f"road_{key}.npz"), **arrays)
+    meta = {
+        "key": key, "source": os.path.abspath(path), "tolerance_m": tolerance_m, "crs": UTM_CRS,
+        "counts": {k: {"nodes": n, "edges": e} for k, (n, e) in counts.items()},
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    with open(os.path.join(cache_dir, f"road_{key}.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+    return arrays, meta
+
+
+def load_derived(path=GRAPH_PATH, tolerance_m=TOLERANCE_M, cache_dir=CACHE_DIR, force=False):
+    # -> (dict array, meta, dari cache?)
+    key = cache_key(path, tolerance_m)
+    npz = os.path.join(cache_dir, f"road_{key}.npz")
+    if os.path.exists(npz) and not force:
+        with np.load(npz) as data:
+            arrays = {k: data[k] for k in ARRAYS}
+        with open(os.path.join(cache_dir, f"road_{key}.json")) as f:
+            meta = json.load(f)
+        return arrays, meta, True
+    arrays, meta = build_derived(path, tolerance_m, cache_dir, key)
+    return arrays, meta, False
+
+
+def load_derived_csr(path=GRAPH_PATH, weight="length", tolerance_m=TOLERANCE_M):
+    arrays, meta, cached = load_derived(path, tolerance_m)
+    if not cached:
+        c = meta["counts"]
+        event(f"🛣️  graph turunan dibangun: {c['raw']['nodes']} -> {c['scc']['nodes']} node, "
+              f"{c['raw']['edges']} -> {c['scc']['edges']} edge", key=meta["key"])
+    return csr_from_arrays(arrays, weight)
+
+
+def bench_routing(raw, derived, shelter_utm, repeat=3):
+    # median waktu snap + multi-source Dijkstra ke tempat evakuasi di kedua graph
+    out = {}
+    for name, csr in (("raw", raw), ("derived", derived)):
+        times = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            nodes, _ = csr.snap(shelter_utm)
+            dist, _, _ = nearest_shelter(csr, np.unique(nodes))
+            times.append(time.perf_counter() - t0)
+        out[name] = {"median_s": float(np.median(times)), "reachable": int(np.isfinite(dist).sum())}
+    return out
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Graph jalan turunan (konsolidasi simpang + SCC) ter-cache")
+    parser.add_argument("--input", default=GRAPH_PATH)
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE_M, help="radius gabung simpang (meter)")
+    parser.add_argument("--force", action="store_true", help="bangun ulang walau cache masih cocok")
+    parser.add_argument("--bench", type=int, default=0, metavar="N",
+                        help="bandingkan routing graph mentah vs turunan (N ulangan)")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    arrays, meta, cached = load_derived(args.input, args.tolerance, force=args.force)
+    t_load = time.perf_counter() - t0
+    c = meta["counts"]
+    for stage in ("raw", "consolidated", "scc"):
+        event(f"   {stage:<12} {c[stage]['nodes']:>9} node {c[stage]['edges']:>9} edge",
+              stage=stage, **c[stage])
+    event(f"✅ {'Cache' if cached else 'Saved'}: {os.path.join(CACHE_DIR, 'road_' + meta['key'] + '.npz')} "
+          f"({t_load:.2f}s)", key=meta["key"], cached=cached, load_s=round(t_load, 3))
+
+    if args.bench:
+        import osmnx as ox
+        with span("load_raw"):
+            t0 = time.perf_counter()
+            raw = graph_to_csr(ox.load_graphml(args.input))
+            t_raw = time.perf_counter() - t0
+        # t_load di atas bisa termasuk konsolidasi (cache dingin): ukur ulang load dari cache
+        with span("load_cache"):
+            t0 = time.perf_counter()
+            arrays, meta, _ = load_derived(args.input, args.tolerance)
+            t_cache = time.perf_counter() - t0
+        derived = csr_from_arrays(arrays)
+        evac = gpd.read_file(EVAC_PATH)
+        shelter_utm = to_utm(np.asarray(evac.geometry.values), evac.crs or "EPSG:4326")
+        with span("bench", rows=len(evac)):
+            result = bench_routing(raw, derived, shelter_utm, args.bench)
+        r, d = result["raw"], result["derived"]
+        event(f"⚡ Load graph: GraphML {t_raw:.2f}s vs cache {t_cache:.2f}s (x{t_raw / max(t_cache, 1e-9):.1f})",
+              raw_load_s=round(t_raw, 3), cache_load_s=round(t_cache, 3))
+        event(f"⚡ Routing ke {len(evac)} tempat evakuasi: {r['median_s'] * 1000:.1f} ms vs "
+              f"{d['median_s'] * 1000:.1f} ms (x{r['median_s'] / max(d['median_s'], 1e-9):.1f}), "
+              f"node terjangkau {r['reachable']} vs {d['reachable']}",
+              raw_s=round(r["median_s"], 4), derived_s=round(d["median_s"], 4))
+        meta["bench"] = {"raw_load_s": t_raw, "cache_load_s": t_cache, **result}
+        with open(os.path.join(CACHE_DIR, f"road_{meta['key']}.json"), "w") as f:
+            json.dump(meta, f, indent=2)
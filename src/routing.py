@@ -0,0 +1,415 @@
+"""
+Routing evakuasi dinamis (flood-aware) di atas graph jalan road.graphml
+Jarak setiap node ke tempat evakuasi terdekat dihitung sekali dengan multi-source
+Dijkstra (graph dibalik, sumber = node tempat evakuasi). Laporan penutupan atau
+perlambatan ruas jalan diterapkan per batch: hanya subtree shortest-path tree
+yang melewati ruas terdampak yang dihitung ulang, sisanya tidak disentuh.
+
+Contoh:
+  python src/routing.py --close-radius 250 --batches 5
+  python src/routing.py --closures data_raw/laporan_jalan.csv   # kolom u, v, [factor]
+"""
+
+import time
+import heapq
+import argparse
+from dataclasses import dataclass
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import shapely
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+from scipy.spatial import cKDTree
+
+from building_metrics import to_utm
+from instrument import span, event
+from region import REGION
+
+GRAPH_PATH = REGION.path("road.graphml")
+EVAC_PATH = REGION.path("tempatevakuasinew.geojson")
+FLOOD_PATH = REGION.path(f"{REGION.flood_name}.geojson")
+ROUTING_PATH = REGION.path("routing_flood_points.csv")
+CLOSE_RADIUS_M = 250
+MIN_WEIGHT = 1e-6  # edge panjang 0 tetap dianggap edge oleh csgraph
+
+
+def _ptr(keys, n):
+    # CSR dari daftar key: edge order[ptr[k]:ptr[k+1]] milik node k
+    order = np.argsort(keys, kind="stable")
+    ptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys, minlength=n), out=ptr[1:])
+    return ptr, order
+
+
+def _gather(ptr, order, nodes):
+    # semua edge milik sekumpulan node sekaligus -> (owner, edge)
+    start, stop = ptr[nodes], ptr[nodes + 1]
+    counts = stop - start
+    owner = np.repeat(nodes, counts)
+    offset = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return owner, order[np.repeat(start, counts) + offset]
+
+
+@dataclass
+class RoadCSR:
+    nodes: np.ndarray      # osmid per posisi node
+    x: np.ndarray          # koordinat UTM 49S
+    y: np.ndarray
+    edge_u: np.ndarray     # posisi node asal / tujuan per edge
+    edge_v: np.ndarray
+    weight: np.ndarray     # bobot dasar (default panjang meter)
+    geometry: np.ndarray   # LineString UTM per edge
+    speed_kph: np.ndarray = None    # graph turunan (road_graph.py): kecepatan & waktu tempuh per edge
+    travel_time: np.ndarray = None
+    aliases: pd.Series = None       # osmid asli -> posisi node (simpang yang digabung)
+
+    @property
+    def n_nodes(self):
+        return len(self.nodes)
+
+    @property
+    def n_edges(self):
+        return len(self.edge_u)
+
+    @cached_property
+    def out_csr(self):
+        return _ptr(self.edge_u, self.n_nodes)
+
+    @cached_property
+    def in_csr(self):
+        return _ptr(self.edge_v, self.n_nodes)
+
+    @cached_property
+    def node_tree(self):
+        return cKDTree(np.column_stack([self.x, self.y]))
+
+    @cached_property
+    def edge_tree(self):
+        return shapely.STRtree(self.geometry)
+
+    def snap(self, geoms_utm):
+        # node terdekat untuk tiap titik -> (posisi node, jarak meter)
+        xy = shapely.get_coordinates(shapely.centroid(geoms_utm))
+        dist, idx = self.node_tree.query(xy)
+        return idx, dist
+
+    def edges_near(self, geoms_utm, radius_m=CLOSE_RADIUS_M):
+        # edge yang berpotongan dengan buffer titik (dua arah ikut karena geometrinya sama)
+        if len(geoms_utm) == 0:
+            return np.array([], dtype=np.int64)
+        _, edge_idx = self.edge_tree.query(shapely.buffer(geoms_utm, radius_m), predicate="intersects")
+        return np.unique(edge_idx)
+
+    def node_index(self, osmid):
+        # posisi node dari osmid; -1 jika tidak ada
+        if self.aliases is not None:
+            return self.aliases.reindex(osmid).fillna(-1).to_numpy(dtype=np.int64)
+        return pd.Index(self.nodes).get_indexer(osmid)
+
+    def edge_index(self, u_osmid, v_osmid):
+        # posisi edge dari pasangan osmid (semua key multi-edge ikut)
+        pairs = pd.MultiIndex.from_arrays([self.edge_u, self.edge_v])
+        want = pd.MultiIndex.from_arrays([self.node_index(u_osmid), self.node_index(v_osmid)])
+        return np.flatnonzero(pairs.isin(want))
+
+
+def graph_to_csr(G, weight="length"):
+    import osmnx as ox
+
+    nodes, edges = ox.graph_to_gdfs(G)
+    crs = nodes.crs or "EPSG:4326"
+    node_xy = to_utm(np.asarray(nodes.geometry.values), crs)
+    geometry = to_utm(np.asarray(edges.geometry.values), crs)
+    pos = pd.Index(nodes.index)
+    u = pos.get_indexer(edges.index.get_level_values("u"))
+    v = pos.get_indexer(edges.index.get_level_values("v"))
+    w = pd.to_numeric(edges[weight], errors="coerce").to_numpy(dtype=float) \
+        if weight in edges.columns else np.full(len(edges), np.nan)
+    w = np.where(np.isfinite(w), w, shapely.length(geometry))
+    extra = {c: pd.to_numeric(edges[c], errors="coerce").to_numpy(dtype=float)
+             for c in ("speed_kph", "travel_time") if c in edges.columns}
+    return RoadCSR(
+        nodes=np.asarray(nodes.index),
+        x=shapely.get_x(node_xy), y=shapely.get_y(node_xy),
+        edge_u=u.astype(np.int64), edge_v=v.astype(np.int64),
+        weight=w, geometry=geometry, **extra,
+    )
+
+
+def load_road_csr(path=GRAPH_PATH, weight="length", derived=False):
+    # derived=True: graph turunan ter-cache (simpang digabung + SCC terbesar), lihat road_graph.py;
+    # CLI memakainya secara default, pemanggil library tetap mendapat graph mentah
+    if derived:
+        from road_graph import load_derived_csr
+        return load_derived_csr(path, weight)
+    import osmnx as ox
+    return graph_to_csr(ox.load_graphml(path), weight)
+
+
+def to_csgraph(csr, weight=None, reverse=False):
+    # scipy csr_matrix; multi-edge diambil bobot minimum, edge tertutup (inf) dibuang
+    w = csr.weight if weight is None else weight
+    ok = np.isfinite(w)
+    rows, cols = (csr.edge_v, csr.edge_u) if reverse else (csr.edge_u, csr.edge_v)
+    rows, cols, w = rows[ok], cols[ok], np.maximum(w[ok], MIN_WEIGHT)
+    order = np.lexsort((w, cols, rows))
+    rows, cols, w = rows[order], cols[order], w[order]
+    first = np.ones(len(rows), dtype=bool)
+    first[1:] = (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1])
+    return csr_matrix((w[first], (rows[first], cols[first])), shape=(csr.n_nodes, csr.n_nodes))
+
+
+def csgraph_positions(csr, matrix, reverse=False):
+    # posisi entry matrix.data untuk tiap edge; -1 jika edge tidak ada di matrix (ditutup)
+    matrix.sort_indices()
+    n = csr.n_nodes
+    rows = np.repeat(np.arange(n, dtype=np.int64), np.diff(matrix.indptr))
+    keys = rows * n + matrix.indices
+    u, v = (csr.edge_v, csr.edge_u) if reverse else (csr.edge_u, csr.edge_v)
+    want = u * n + v
+    pos = np.minimum(np.searchsorted(keys, want), len(keys) - 1)
+    return np.where(keys[pos] == want, pos, -1)
+
+
+def nearest_shelter(csr, sources, weight=None):
+    # full recompute: jarak tiap node ke sumber terdekat + node berikutnya ke arah sumber
+    dist, pred, src = dijkstra(to_csgraph(csr, weight, reverse=True), directed=True,
+                               indices=np.asarray(sources), min_only=True, return_predecessors=True)
+    pred = np.where(pred < 0, -1, pred)
+    src = np.where(src < 0, -1, src)
+    return dist, pred, src
+
+
+class DynamicRouter:
+    # shortest-path tree menuju tempat evakuasi terdekat, diperbarui per batch edge
+
+    def __init__(self, csr, shelter_nodes, weight=None):
+        self.csr = csr
+        self.base = np.array(csr.weight if weight is None else weight, dtype=float)
+        self.weight = self.base.copy()
+        self.shelters = np.unique(np.asarray(shelter_nodes, dtype=np.int64))
+        self.recompute()
+
+    def recompute(self):
+        csr = self.csr
+        self.dist, pred, self.source = nearest_shelter(csr, self.shelters, self.weight)
+        # edge tree: u -> pred[u] dengan bobot yang cocok dengan selisih jarak
+        u, v = csr.edge_u, csr.edge_v
+        with np.errstate(invalid="ignore"):
+            ok = (pred[u] == v) & np.isclose(self.dist[v] + np.maximum(self.weight, MIN_WEIGHT), self.dist[u])
+        self.next_edge = np.full(csr.n_nodes, -1, dtype=np.int64)
+        self.next_edge[u[ok]] = np.flatnonzero(ok)
+        self.parent = pred.astype(np.int64)
+        self._reindex_children()
+
+    def _reindex_children(self):
+        has = np.flatnonzero(self.parent >= 0)
+        ptr, order = _ptr(self.parent[has], self.csr.n_nodes)
+        self._kid_ptr, self._kid_idx = ptr, has[order]
+        self._extra = {}
+
+    def _children(self, p):
+        # index CSR bisa basi setelah update: cek parent aktual, anak baru ada di _extra
+        kids = self._kid_idx[self._kid_ptr[p]:self._kid_ptr[p + 1]].tolist()
+        kids += self._extra.get(p, [])
+        return [c for c in kids if self.parent[c] == p]
+
+    def _set_next(self, node, edge):
+        self.next_edge[node] = edge
+        p = self.csr.edge_v[edge] if edge >= 0 else -1
+        self.parent[node] = p
+        if p >= 0:
+            self._extra.setdefault(p, []).append(node)
+
+    def subtree(self, roots):
+        seen = set(roots)
+        stack = list(roots)
+        while stack:
+            for c in self._children(stack.pop()):
+                if c not in seen:
+                    seen.add(c)
+                    stack.append(c)
+        return seen
+
+    def update(self, edges, weights):
+        # weights: bobot baru per edge (np.inf = ditutup); return node yang jaraknya berubah
+        csr = self.csr
+        edges = np.asarray(edges, dtype=np.int64)
+        new = np.broadcast_to(np.asarray(weights, dtype=float), edges.shape)
+        old = self.weight[edges]
+        self.weight[edges] = new
+        u, v = csr.edge_u[edges], csr.edge_v[edges]
+        before = {}
+        heap = []
+
+        # 1) bobot naik pada edge tree -> seluruh subtree di bawah u kehilangan jalurnya
+        up = (new > old) & (self.next_edge[u] == edges)
+        affected = self.subtree(np.unique(u[up]).tolist())
+        if affected:
+            aff = np.fromiter(affected, dtype=np.int64, count=len(affected))
+            before.update(zip(aff.tolist(), self.dist[aff].tolist()))
+            self.dist[aff] = np.inf
+            self.next_edge[aff] = -1
+            self.parent[aff] = -1
+            self.source[aff] = -1
+            # label awal dari tetangga keluar yang tidak terdampak
+            owner, out_edges = _gather(*csr.out_csr, aff)
+            cand = self.dist[csr.edge_v[out_edges]] + np.maximum(self.weight[out_edges], MIN_WEIGHT)
+            order = np.lexsort((cand, owner))
+            owner, out_edges, cand = owner[order], out_edges[order], cand[order]
+            first = np.ones(len(owner), dtype=bool)
+            first[1:] = owner[1:] != owner[:-1]
+            for n, e, d in zip(owner[first].tolist(), out_edges[first].tolist(), cand[first].tolist()):
+                if np.isfinite(d):
+                    self.dist[n] = d
+                    self.source[n] = self.source[csr.edge_v[e]]
+                    self._set_next(n, e)
+                    heapq.heappush(heap, (d, n))
+
+        # 2) bobot turun (ruas dibuka kembali / lebih cepat) -> u bisa dapat jalur lebih pendek
+        for e, a, b in zip(edges[new < old].tolist(), u[new < old].tolist(), v[new < old].tolist()):
+            d = self.dist[b] + max(self.weight[e], MIN_WEIGHT)
+            if d < self.dist[a]:
+                before.setdefault(a, self.dist[a])
+                self.dist[a] = d
+                self.source[a] = self.source[b]
+                self._set_next(a, e)
+                heapq.heappush(heap, (d, a))
+
+        # 3) propagasi Dijkstra di graph terbalik, hanya dari node yang berubah
+        in_ptr, in_order = csr.in_csr
+        while heap:
+            d, n = heapq.heappop(heap)
+            if d > self.dist[n]:
+                continue
+            for e in in_order[in_ptr[n]:in_ptr[n + 1]].tolist():
+                w = csr.edge_u[e]
+                nd = d + max(self.weight[e], MIN_WEIGHT)
+                if nd < self.dist[w]:
+                    before.setdefault(w, self.dist[w])
+                    self.dist[w] = nd
+                    self.source[w] = self.source[n]
+                    self._set_next(w, e)
+                    heapq.heappush(heap, (nd, w))
+
+        if sum(len(k) for k in self._extra.values()) > csr.n_nodes // 10:
+            self._reindex_children()
+        touched = np.fromiter(before, dtype=np.int64, count=len(before))
+        changed = self.dist[touched] != np.fromiter(before.values(), dtype=float, count=len(before))
+        return touched[changed]
+
+    def block(self, edges):
+        return self.update(edges, np.inf)
+
+    def slow(self, edges, factor):
+        edges = np.asarray(edges, dtype=np.int64)
+        return self.update(edges, self.base[edges] * factor)
+
+    def restore(self, edges):
+        edges = np.asarray(edges, dtype=np.int64)
+        return self.update(edges, self.base[edges])
+
+    def route(self, node):
+        # daftar osmid dari node ke tempat evakuasi, [] jika tidak terjangkau
+        if not np.isfinite(self.dist[node]):
+            return []
+        path = [node]
+        while self.next_edge[path[-1]] >= 0 and len(path) <= self.csr.n_nodes:
+            path.append(int(self.csr.edge_v[self.next_edge[path[-1]]]))
+        return self.csr.nodes[path].tolist()
+
+
+def read_closures(path, csr):
+    # CSV laporan jalan: u, v (osmid) dan opsional factor (kosong/inf = ditutup)
+    df = pd.read_csv(path)
+    factor = pd.to_numeric(df.get("factor", pd.Series(np.inf, index=df.index)), errors="coerce")
+    factor = factor.fillna(np.inf).to_numpy()
+    edges, weights = [], []
+    for f in np.unique(factor):
+        rows = df[factor == f]
+        e = csr.edge_index(rows["u"].to_numpy(), rows["v"].to_numpy())
+        edges.append(e)
+        weights.append(csr.weight[e] * f if np.isfinite(f) else np.full(len(e), np.inf))
+    return np.concatenate(edges), np.concatenate(weights)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Routing evakuasi dinamis saat banjir")
+    parser.add_argument("--close-radius", type=float, default=CLOSE_RADIUS_M,
+                        help="tutup ruas jalan dalam radius (meter) dari titik rawan banjir")
+    parser.add_argument("--batches", type=int, default=5,
+                        help="titik banjir diaktifkan bertahap dalam N batch laporan")
+    parser.add_argument("--closures", help="CSV laporan ruas jalan (u, v, factor)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=ROUTING_PATH)
+    parser.add_argument("--raw-graph", action="store_true",
+                        help="pakai road.graphml mentah, bukan graph turunan road_graph.py")
+    args = parser.parse_args()
+
+    with span("load"):
+        csr = load_road_csr(GRAPH_PATH, derived=not args.raw_graph)
+        evac = gpd.read_file(EVAC_PATH)
+        flood = gpd.read_file(FLOOD_PATH)
+        evac_utm = to_utm(np.asarray(evac.geometry.values), evac.crs or "EPSG:4326")
+        flood_utm = to_utm(np.asarray(flood.geometry.values), flood.crs or "EPSG:4326")
+    event(f"🛣️  {csr.n_nodes} node, {csr.n_edges} edge, {len(evac)} tempat evakuasi, {len(flood)} titik banjir")
+
+    shelter_nodes, _ = csr.snap(evac_utm)
+    flood_nodes, flood_snap = csr.snap(flood_utm)
+    with span("init_full", rows=csr.n_edges):
+        router = DynamicRouter(csr, shelter_nodes)
+    dist_before = router.dist[flood_nodes].copy()
+
+    if args.closures:
+        batches = [read_closures(args.closures, csr)]
+    else:
+        # simulasi laporan masuk bertahap: tiap batch = sebagian titik banjir aktif
+        rng = np.random.default_rng(args.seed)
+        groups = np.array_split(rng.permutation(len(flood)), max(args.batches, 1))
+        batches = []
+        for g in groups:
+            e = csr.edges_near(flood_utm[g], args.close_radius)
+            batches.append((e, np.full(len(e), np.inf)))
+
+    timings = []
+    for i, (edges, weights) in enumerate(batches, 1):
+        with span("update", rows=len(edges), batch=i) as s:
+            t0 = time.perf_counter()
+            changed = router.update(edges, weights)
+            t_inc = time.perf_counter() - t0
+            s.set(changed=len(changed))
+        # pembanding: full recompute dengan bobot yang sama
+        t0 = time.perf_counter()
+        full_dist, _, _ = nearest_shelter(csr, router.shelters, router.weight)
+        t_full = time.perf_counter() - t0
+        both = np.isfinite(full_dist) & np.isfinite(router.dist)
+        diff = np.abs(full_dist[both] - router.dist[both]).max(initial=0)
+        mismatch = int((np.isfinite(full_dist) != np.isfinite(router.dist)).sum())
+        timings.append((t_inc, t_full))
+        event(f"🚧 Batch {i}: {len(edges)} edge, {len(changed)} node berubah, "
+              f"incremental {t_inc * 1000:.1f} ms vs full {t_full * 1000:.1f} ms "
+              f"(selisih maks {diff:.2e} m, mismatch {mismatch})",
+              batch=i, edges=len(edges), changed=len(changed),
+              incremental_s=round(t_inc, 6), full_s=round(t_full, 6))
+
+    if timings:
+        inc, full = np.median(np.array(timings), axis=0)
+        event(f"📊 Median update {inc * 1000:.1f} ms vs full recompute {full * 1000:.1f} ms "
+              f"(x{full / max(inc, 1e-9):.1f})")
+
+    # ringkasan per titik banjir: jarak ke tempat evakuasi terdekat sebelum/sesudah penutupan
+    shelter_of = pd.Series(np.arange(len(evac)), index=shelter_nodes).groupby(level=0).first()
+    source = router.source[flood_nodes]
+    table = flood.drop(columns=flood.geometry.name).reset_index(drop=True)
+    table["node"] = csr.nodes[flood_nodes]
+    table["snap_m"] = flood_snap.round(1)
+    table["dist_before_m"] = dist_before.round(1)
+    table["dist_after_m"] = router.dist[flood_nodes].round(1)
+    table["shelter"] = shelter_of.reindex(source).to_numpy()
+    table["reachable"] = np.isfinite(router.dist[flood_nodes])
+    table.to_csv(args.output, index=False)
+    event(f"✅ Saved: {args.output}", path=args.output, rows=len(table))
+    event(f"   Titik banjir tanpa akses ke tempat evakuasi: {int((~table['reachable']).sum())}/{len(table)}")
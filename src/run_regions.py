@@ -0,0 +1,212 @@
+"""
+Jalankan pipeline untuk banyak region (35 kabupaten/kota Jawa Tengah) secara paralel
+Setiap region berjalan di proses terpisah dengan REGION=<slug> (output di data_processed/<slug>/).
+Scheduler memakai budget memory global: region besar tidak dijalankan bersamaan jika
+perkiraan peak memory melebihi budget, region kecil mengisi sisa budget.
+
+Contoh:
+  python src/run_regions.py --regions all --steps boundary,road,building --memory-gb 24
+  python src/run_regions.py --regions cilacap,banyumas,kota_tegal --max-workers 3
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+from datetime import datetime
+
+from region import REGIONS, DATA_PROCESSED
+from instrument import event, load_reports
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+REPORT_DIR = os.path.abspath(os.path.join(DATA_PROCESSED, "runs"))
+
+# Urutan step pipeline per region -> script
+STEPS = {
+    "boundary": "get_boundary.py",
+    "road": "get_road.py",
+    "building": "get_building.py",
+    "kecamatan": "process_kecamatan_bps.py",
+    "filter": "filter_kecamatan_24.py",
+    "flood": "get_floodpoint.py",
+    "evac": "get_evac_point.py",
+    "fgb": "export_fgb.py",
+}
+DEFAULT_STEPS = ["boundary", "road", "building"]
+
+# Perkiraan peak memory (MB) skala Kabupaten Cilacap jika belum ada laporan run sebelumnya
+DEFAULT_PEAK_MB = {
+    "boundary": 400,
+    "road": 2500,
+    "building": 9000,
+    "kecamatan": 1500,
+    "filter": 600,
+    "flood": 400,
+    "evac": 400,
+    "fgb": 3000,
+}
+KOTA_FACTOR = 0.25
+SAFETY = 1.2
+
+
+def total_memory_mb():
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / 1e6
+    except (ValueError, OSError, AttributeError):
+        return 8000.0
+
+
+def load_history(report_dir=REPORT_DIR):
+    # peak RSS per (script, region) dari laporan instrument run sebelumnya
+    history = {}
+    for rep in load_reports(report_dir):
+        key = (rep.get("script"), rep.get("region") or "cilacap")
+        history.setdefault(key, []).append(rep.get("peak_rss_mb", 0))
+    return history
+
+
+def estimate_mb(region, step, history):
+    script = STEPS[step]
+    seen = history.get((script, region.slug))
+    if seen:
+        return max(seen) * SAFETY
+    base = max(history.get((script, "cilacap"), [DEFAULT_PEAK_MB[step]]))
+    return base * SAFETY * (KOTA_FACTOR if region.kind == "Kota" else 1.0)
+
+
+def children_rss_mb(procs):
+    # RSS aktual proses yang sedang berjalan (butuh psutil, opsional)
+    try:
+        import psutil
+    except ImportError:
+        return None
+    total = 0.0
+    for p in procs:
+        try:
+            total += psutil.Process(p.pid).memory_info().rss / 1e6
+        except psutil.Error:
+            continue
+    return total
+
+
+def global_bps_dir():
+    # BPS_DIR tanpa placeholder {slug}/{name} menunjuk satu kabupaten: tidak diteruskan ke region
+    value = os.environ.get("BPS_DIR")
+    return value if value and "{" not in value else None
+
+
+def launch(region, step):
+    log_dir = os.path.join(DATA_PROCESSED, region.slug, "logs")
+    os.makedirs(log_dir, exist_ok=True)
+    log = open(os.path.join(log_dir, f"{step}.log"), "w")
+    env = dict(os.environ, REGION=region.slug, MPLBACKEND="Agg", INSTRUMENT_DIR=REPORT_DIR)
+    if global_bps_dir():
+        env.pop("BPS_DIR")
+    proc = subprocess.Popen([sys.executable, os.path.join(SRC_DIR, STEPS[step])],
+                            stdout=log, stderr=subprocess.STDOUT, env=env)
+    return proc, log
+
+
+def schedule(regions, steps, budget_mb, max_workers, poll_s=1.0):
+    history = load_history()
+    pending = {r.slug: list(steps) for r in regions}
+    running = {}  # slug -> dict(proc, log, step, est, start)
+    results = []
+
+    while pending or running:
+        used_est = sum(j["est"] for j in running.values())
+        actual = children_rss_mb([j["proc"] for j in running.values()])
+        used = max(used_est, actual or 0)
+
+        # region dengan step berikutnya terbesar dijalankan dulu (bin packing greedy)
+        ready = sorted(
+            ((estimate_mb(REGIONS[slug], todo[0], history), slug)
+             for slug, todo in pending.items() if slug not in running),
+            reverse=True,
+        )
+        for est, slug in ready:
+            if len(running) >= max_workers:
+                break
+            if running and used + est > budget_mb:
+                continue
+            step = pending[slug].pop(0)
+            if not pending[slug]:
+                del pending[slug]
+            proc, log = launch(REGIONS[slug], step)
+            running[slug] = dict(proc=proc, log=log, step=step, est=est, start=time.perf_counter())
+            used += est
+            event(f"🚀 {slug}:{step} (perkiraan {est:.0f} MB, terpakai {used:.0f}/{budget_mb:.0f} MB)",
+                  region=slug, step=step, est_mb=round(est))
+
+        time.sleep(poll_s)
+        for slug, job in list(running.items()):
+            rc = job["proc"].poll()
+            if rc is None:
+                continue
+            job["log"].close()
+            wall = time.perf_counter() - job["start"]
+            status = "ok" if rc == 0 else f"exit {rc}"
+            results.append(dict(region=slug, step=job["step"], status=status,
+                                wall_s=round(wall, 2), est_mb=round(job["est"])))
+            del running[slug]
+            if rc == 0:
+                event(f"✅ {slug}:{job['step']} selesai ({wall:.1f}s)", region=slug, step=job["step"])
+            else:
+                # step berikutnya bergantung pada output step ini
+                skipped = pending.pop(slug, [])
+                event(f"❌ {slug}:{job['step']} gagal ({status}), dilewati: {skipped}",
+                      region=slug, step=job["step"], status=status)
+        history = load_history()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pipeline multi-region Jawa Tengah")
+    parser.add_argument("--regions", default="all",
+                        help="'all', 'kabupaten', 'kota', atau daftar slug dipisah koma")
+    parser.add_argument("--steps", default=",".join(DEFAULT_STEPS),
+                        help=f"step dipisah koma, pilihan: {', '.join(STEPS)}")
+    parser.add_argument("--memory-gb", type=float,
+                        help="budget memory global (default 75%% RAM)")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+
+    if args.regions == "all":
+        regions = list(REGIONS.values())
+    elif args.regions in ("kabupaten", "kota"):
+        regions = [r for r in REGIONS.values() if r.kind.lower() == args.regions]
+    else:
+        slugs = [s.strip() for s in args.regions.split(",") if s.strip()]
+        unknown = [s for s in slugs if s not in REGIONS]
+        if unknown:
+            parser.error(f"region tidak dikenal: {unknown}")
+        regions = [REGIONS[s] for s in slugs]
+
+    steps = [s.strip() for s in args.steps.split(",") if s.strip()]
+    unknown = [s for s in steps if s not in STEPS]
+    if unknown:
+        parser.error(f"step tidak dikenal: {unknown}")
+    if global_bps_dir():
+        event(f"⚠️  BPS_DIR={global_bps_dir()} diabaikan (satu folder untuk semua region); "
+              "pakai BPS_DIR_<SLUG> atau BPS_DIR dengan placeholder {slug}")
+
+    budget = args.memory_gb * 1000 if args.memory_gb else total_memory_mb() * 0.75
+    event(f"📋 {len(regions)} region x {len(steps)} step, budget {budget:.0f} MB, "
+          f"max {args.max_workers} proses", regions=len(regions), budget_mb=round(budget))
+
+    results = schedule(regions, steps, budget, args.max_workers)
+
+    os.makedirs(DATA_PROCESSED, exist_ok=True)
+    summary_path = os.path.join(DATA_PROCESSED, f"run_regions-{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(summary_path, "w") as f:
+        json.dump(results, f, indent=2)
+    failed = [r for r in results if r["status"] != "ok"]
+    event(f"\n✅ Selesai: {len(results) - len(failed)} step ok, {len(failed)} gagal")
+    event(f"✅ Saved: {summary_path}", path=summary_path)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,232 @@
+"""
+Simulasi Monte Carlo skenario banjir untuk aksesibilitas evakuasi per kecamatan
+Setiap skenario mengaktifkan titik rawan banjir secara acak, menutup ruas jalan
+dalam radius titik aktif, lalu menghitung bangunan yang kehilangan akses ke tempat
+evakuasi atau waktu tempuhnya melebihi ambang (menit). Waktu tempuh = travel_time graph
+turunan road_graph.py dari node jalan terdekat + jalan kaki bangunan -> node tersebut.
+Graph jalan (CSR) dibagikan read-only ke process pool (fork: copy-on-write), skenario
+dievaluasi per batch secara vektor.
+
+Contoh:
+  python src/simulate_scenarios.py --scenarios 2000 --p-active 0.2 --workers 8
+  python src/simulate_scenarios.py --threshold-min 10 --access-kph 3
+"""
+
+import os
+import time
+import argparse
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import shapely
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+
+from building_metrics import to_utm
+from building_schema import load_buildings
+from routing import CLOSE_RADIUS_M, load_road_csr, to_csgraph, csgraph_positions
+from instrument import span, event
+from region import REGION
+
+N_SCENARIOS = 1000
+BATCH_SIZE = 16
+P_ACTIVE = 0.2
+THRESHOLD_MIN = 15
+ACCESS_KPH = 4.0  # kecepatan jalan kaki dari bangunan ke node jalan terdekat
+OUTSIDE = "(luar kecamatan)"
+
+KECAMATAN_PATH = REGION.path(f"{REGION.kecamatan_name}.geojson")
+SCENARIOS_PATH = REGION.path("scenario_kecamatan.csv")
+SUMMARY_PATH = REGION.path("scenario_summary_kecamatan.csv")
+
+# state read-only untuk worker (di-set sebelum pool dibuat / lewat initializer)
+_STATE = None
+
+
+def assign_kecamatan(points_utm, kecamatan):
+    # index kecamatan per titik; titik di luar semua polygon -> kategori OUTSIDE (index terakhir)
+    names = list(kecamatan["kecamatan"].astype(str)) + [OUTSIDE]
+    polys = to_utm(np.asarray(kecamatan.geometry.values), kecamatan.crs or "EPSG:4326")
+    idx = np.full(len(points_utm), len(names) - 1, dtype=np.int16)
+    pt, poly = shapely.STRtree(polys).query(points_utm, predicate="within")
+    idx[pt] = poly
+    return idx, names
+
+
+def build_state(csr, shelter_nodes, flood_utm, building_utm, building_kec, n_kec,
+                radius_m=CLOSE_RADIUS_M, threshold_min=THRESHOLD_MIN, access_kph=ACCESS_KPH):
+    # bobot graph = travel_time (detik), butuh graph turunan (load_road_csr(..., derived=True))
+    if csr.travel_time is None:
+        raise ValueError("graph jalan tidak punya travel_time: pakai graph turunan road_graph.py")
+    matrix = to_csgraph(csr, weight=csr.travel_time, reverse=True)
+    pos = csgraph_positions(csr, matrix, reverse=True)
+    # ruas yang ditutup tiap titik banjir: satu bulk query, disimpan sebagai CSR titik -> posisi matrix
+    pt, edge = csr.edge_tree.query(shapely.buffer(flood_utm, radius_m), predicate="intersects")
+    p = pos[edge]
+    keep = p >= 0
+    pt, p = pt[keep], p[keep]
+    order = np.argsort(pt, kind="stable")
+    close_ptr = np.zeros(len(flood_utm) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(pt, minlength=len(flood_utm)), out=close_ptr[1:])
+
+    snap_d, snap_idx = csr.node_tree.query(shapely.get_coordinates(building_utm))
+    return dict(
+        data=matrix.data, indices=matrix.indices, indptr=matrix.indptr, n=csr.n_nodes,
+        sources=np.unique(shelter_nodes), close_ptr=close_ptr, close_pos=p[order],
+        b_node=snap_idx.astype(np.int32), b_access_s=(snap_d / (access_kph / 3.6)).astype(np.float32),
+        b_kec=building_kec.astype(np.int64), n_kec=n_kec,
+        n_points=len(flood_utm), threshold_s=threshold_min * 60.0,
+    )
+
+
+def _init(state):
+    global _STATE
+    _STATE = state
+
+
+def nearest_dist(state, closed_pos):
+    data = state["data"].copy()
+    data[closed_pos] = np.inf
+    graph = csr_matrix((data, state["indices"], state["indptr"]), shape=(state["n"], state["n"]))
+    return dijkstra(graph, directed=True, indices=state["sources"], min_only=True)
+
+
+def evaluate(state, active):
+    # active: bool (B x titik) -> lost, over (B x kecamatan), closed edge per skenario
+    B, K = len(active), state["n_kec"]
+    dist = np.empty((B, state["n"]), dtype=np.float32)
+    closed = np.zeros(B, dtype=np.int64)
+    ptr, pos = state["close_ptr"], state["close_pos"]
+    for i, row in enumerate(active):
+        pts = np.flatnonzero(row)
+        cp = np.unique(np.concatenate([pos[ptr[j]:ptr[j + 1]] for j in pts])) if len(pts) else pos[:0]
+        closed[i] = len(cp)
+        dist[i] = nearest_dist(state, cp)
+    # waktu tempuh (detik) per bangunan untuk seluruh batch sekaligus
+    t = dist[:, state["b_node"]] + state["b_access_s"]
+    lost = ~np.isfinite(t)
+    over = np.isfinite(t) & (t > state["threshold_s"])
+    key = (np.arange(B)[:, None] * K + state["b_kec"][None, :]).ravel()
+    lost_k = np.bincount(key, weights=lost.ravel(), minlength=B * K).reshape(B, K)
+    over_k = np.bincount(key, weights=over.ravel(), minlength=B * K).reshape(B, K)
+    return lost_k.astype(np.int64), over_k.astype(np.int64), closed
+
+
+def _run_batch(args):
+    batch, size, seed, p_active = args
+    rng = np.random.default_rng([seed, batch])
+    active = rng.random((size, _STATE["n_points"])) < p_active
+    lost, over, closed = evaluate(_STATE, active)
+    return batch, lost, over, closed, active.sum(axis=1)
+
+
+def run_scenarios(state, n_scenarios=N_SCENARIOS, p_active=P_ACTIVE, seed=0,
+                  workers=None, batch_size=BATCH_SIZE):
+    sizes = [min(batch_size, n_scenarios - i) for i in range(0, n_scenarios, batch_size)]
+    jobs = [(b, size, seed, p_active) for b, size in enumerate(sizes)]
+    workers = workers or os.cpu_count() or 1
+    _init(state)
+    if workers == 1:
+        results = [_run_batch(job) for job in jobs]
+    else:
+        if "fork" in mp.get_all_start_methods():
+            # fork: worker mewarisi _STATE tanpa pickling (copy-on-write)
+            pool = ProcessPoolExecutor(workers, mp_context=mp.get_context("fork"))
+        else:
+            pool = ProcessPoolExecutor(workers, initializer=_init, initargs=(state,))
+        with pool:
+            results = list(pool.map(_run_batch, jobs))
+    results.sort(key=lambda r: r[0])
+    return (np.concatenate([r[1] for r in results]), np.concatenate([r[2] for r in results]),
+            np.concatenate([r[3] for r in results]), np.concatenate([r[4] for r in results]))
+
+
+def summarize(lost, over, names, buildings, baseline_lost):
+    share = (lost + over) / np.maximum(buildings, 1)
+    summary = pd.DataFrame({
+        "kecamatan": names,
+        "buildings": buildings,
+        "baseline_lost": baseline_lost,
+        "lost_mean": lost.mean(axis=0).round(1),
+        "lost_p50": np.percentile(lost, 50, axis=0),
+        "lost_p90": np.percentile(lost, 90, axis=0),
+        "lost_p99": np.percentile(lost, 99, axis=0),
+        "over_time_threshold_mean": over.mean(axis=0).round(1),
+        "p_any_lost": ((lost - baseline_lost) > 0).mean(axis=0).round(3),
+        "fragility": share.mean(axis=0).round(4),
+    })
+    summary = summary[summary["buildings"] > 0].sort_values("fragility", ascending=False)
+    summary["rank"] = np.arange(1, len(summary) + 1)
+    return summary.reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulasi Monte Carlo skenario banjir per kecamatan")
+    parser.add_argument("--scenarios", type=int, default=N_SCENARIOS)
+    parser.add_argument("--p-active", type=float, default=P_ACTIVE,
+                        help="peluang tiap titik rawan banjir aktif dalam satu skenario")
+    parser.add_argument("--radius", type=float, default=CLOSE_RADIUS_M,
+                        help="radius penutupan jalan dari titik aktif (meter)")
+    parser.add_argument("--threshold-min", type=float, default=THRESHOLD_MIN,
+                        help="ambang waktu tempuh ke tempat evakuasi (menit)")
+    parser.add_argument("--access-kph", type=float, default=ACCESS_KPH,
+                        help="kecepatan jalan kaki bangunan -> node jalan terdekat (km/jam)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with span("load"):
+        csr = load_road_csr(REGION.path("road.graphml"), derived=True)
+        evac = gpd.read_file(REGION.path("tempatevakuasinew.geojson"))
+        flood = gpd.read_file(REGION.path(f"{REGION.flood_name}.geojson"))
+        building = load_buildings(REGION.path("building.geojson"), columns=[])
+        kecamatan = gpd.read_file(KECAMATAN_PATH) if os.path.exists(KECAMATAN_PATH) else None
+
+    with span("prepare", rows=len(building)):
+        evac_utm = to_utm(np.asarray(evac.geometry.values), evac.crs or "EPSG:4326")
+        flood_utm = to_utm(np.asarray(flood.geometry.values), flood.crs or "EPSG:4326")
+        building_utm = to_utm(shapely.centroid(np.asarray(building.geometry.values)),
+                              building.crs or "EPSG:4326")
+        if kecamatan is not None:
+            b_kec, names = assign_kecamatan(building_utm, kecamatan)
+        else:
+            event(f"⚠️  {KECAMATAN_PATH} tidak ditemukan, semua bangunan dihitung sebagai satu wilayah")
+            b_kec, names = np.zeros(len(building), dtype=np.int16), [REGION.name]
+        shelter_nodes, _ = csr.snap(evac_utm)
+        state = build_state(csr, shelter_nodes, flood_utm, building_utm, b_kec, len(names),
+                            args.radius, args.threshold_min, args.access_kph)
+    buildings = np.bincount(b_kec, minlength=len(names))
+    event(f"🛣️  {csr.n_nodes} node, {len(building)} bangunan, {len(flood)} titik banjir, "
+          f"{len(names)} kecamatan")
+
+    base_lost, _, _ = evaluate(state, np.zeros((1, len(flood)), dtype=bool))
+    with span("simulate", rows=args.scenarios, workers=args.workers) as s:
+        t0 = time.perf_counter()
+        lost, over, closed, active = run_scenarios(state, args.scenarios, args.p_active, args.seed,
+                                                   args.workers, args.batch_size)
+        rate = args.scenarios / (time.perf_counter() - t0)
+        s.set(scenarios_per_s=round(rate, 2))
+    event(f"⚡ {args.scenarios} skenario, {rate:.1f} skenario/detik ({args.workers} worker)",
+          scenarios=args.scenarios, scenarios_per_s=round(rate, 2))
+
+    with span("write", rows=args.scenarios * len(names)):
+        long = pd.DataFrame({
+            "scenario": np.repeat(np.arange(args.scenarios), len(names)),
+            "kecamatan": np.tile(names, args.scenarios),
+            "buildings": np.tile(buildings, args.scenarios),
+            "lost": lost.ravel(),
+            "over_time_threshold": over.ravel(),
+            "active_points": np.repeat(active, len(names)),
+            "closed_edges": np.repeat(closed, len(names)),
+        })
+        long = long[long["buildings"] > 0]
+        long.to_csv(SCENARIOS_PATH, index=False)
+        summary = summarize(lost, over, names, buildings, base_lost[0])
+        summary.to_csv(SUMMARY_PATH, index=False)
+    event(f"✅ Saved: {SCENARIOS_PATH}", path=SCENARIOS_PATH, rows=len(long))
+    event(f"✅ Saved: {SUMMARY_PATH}", path=SUMMARY_PATH, rows=len(summary))
+    print(summary.head(10).to_string(index=False))
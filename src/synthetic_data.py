@@ -0,0 +1,331 @@
+"""
+Generator data sintetis skala Cilacap (deterministik, tanpa internet)
+Menghasilkan boundary, polygon desa BPS, bangunan, graph jalan, dan file titik
+mentah dengan struktur yang sama seperti input asli pipeline
+"""
+
+import os
+import json
+import argparse
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import networkx as nx
+import shapely
+from region import KECAMATAN_CILACAP
+
+# Kira-kira bounding box Kabupaten Cilacap (lon/lat)
+BBOX = (108.55, -7.80, 109.45, -7.15)
+
+# Preset skala: jumlah desa, bangunan, node jalan, titik banjir, titik evakuasi
+SCALES = {
+    "small":   dict(desa=284, buildings=50_000, road_nodes=10_000, flood=130, evac=321),
+    "cilacap": dict(desa=284, buildings=953_000, road_nodes=60_000, flood=130, evac=321),
+    "1m":      dict(desa=284, buildings=1_000_000, road_nodes=100_000, flood=5_000, evac=2_000),
+    "10m":     dict(desa=2_840, buildings=10_000_000, road_nodes=500_000, flood=50_000, evac=20_000),
+}
+
+BUILDING_TYPES = ["yes", "house", "residential", "school", "mosque", "commercial", "industrial"]
+BUILDING_PROBS = [0.62, 0.25, 0.06, 0.02, 0.02, 0.02, 0.01]
+JENIS_BENCANA = ["Banjir", "Tsunami", "Banjir, Tsunami", "Tanah Longsor", "Gempa Bumi"]
+
+M_PER_DEG = 111_320.0
+
+
+def make_boundary(rng, bbox=BBOX, n_vertices=96):
+    # polygon tidak beraturan di dalam bbox
+    x0, y0, x1, y1 = bbox
+    cx, cy = (x0 + x1) / 2, (y0 + y1) / 2
+    rx, ry = (x1 - x0) / 2, (y1 - y0) / 2
+    t = np.linspace(0, 2 * np.pi, n_vertices, endpoint=False)
+    r = 0.85 + 0.15 * np.clip(np.cumsum(rng.normal(0, 0.08, n_vertices)), -1, 1)
+    xs = cx + rx * r * np.cos(t)
+    ys = cy + ry * r * np.sin(t)
+    poly = shapely.Polygon(np.column_stack([xs, ys]))
+    return gpd.GeoDataFrame({"name": ["Kabupaten Cilacap (synthetic)"]}, geometry=[poly], crs="EPSG:4326")
+
+
+def make_desa(rng, boundary, n_desa, kecamatan_names=KECAMATAN_CILACAP):
+    # Voronoi dari titik acak di dalam boundary -> desa; desa dikelompokkan ke kecamatan terdekat
+    poly = boundary.geometry.iloc[0]
+    x0, y0, x1, y1 = poly.bounds
+    seeds = np.empty((0, 2))
+    while len(seeds) < n_desa:
+        cand = np.column_stack([rng.uniform(x0, x1, n_desa * 2), rng.uniform(y0, y1, n_desa * 2)])
+        cand = cand[shapely.contains_xy(poly, cand[:, 0], cand[:, 1])]
+        seeds = np.vstack([seeds, cand])
+    seeds = seeds[:n_desa]
+
+    cells = shapely.get_parts(shapely.voronoi_polygons(shapely.multipoints(seeds), extend_to=poly))
+    cells = shapely.intersection(cells, poly)
+    pt_idx, cell_idx = shapely.STRtree(cells).query(shapely.points(seeds), predicate="within")
+    seeds, geoms = seeds[pt_idx], cells[cell_idx]
+
+    n_kec = len(kecamatan_names)
+    centers = seeds[rng.choice(len(seeds), n_kec, replace=False)]
+    d2 = ((seeds[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2)
+    kec = np.asarray(kecamatan_names)[d2.argmin(axis=1)]
+
+    return gpd.GeoDataFrame({
+        "NAMOBJ": [f"Desa {i:04d}" for i in range(len(geoms))],
+        "WADMKC": kec,
+        "WADMKK": "Cilacap",
+        "WADMPR": "Jawa Tengah",
+    }, geometry=geoms, crs="EPSG:4326")
+
+
+def make_buildings(rng, desa, n_buildings):
+    # bangunan kotak kecil mengelompok di sekitar pusat desa (mirip permukiman)
+    centers = shapely.get_coordinates(desa.geometry.representative_point().values)
+    which = rng.integers(0, len(centers), n_buildings)
+    spread = rng.uniform(0.003, 0.012, len(centers))[which]
+    cx = centers[which, 0] + rng.normal(0, 1, n_buildings) * spread
+    cy = centers[which, 1] + rng.normal(0, 1, n_buildings) * spread
+    w = rng.uniform(6, 20, n_buildings) / M_PER_DEG
+    h = rng.uniform(6, 20, n_buildings) / M_PER_DEG
+    geoms = shapely.box(cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2)
+
+    def sparse(values, p):
+        out = np.full(n_buildings, None, dtype=object)
+        mask = rng.random(n_buildings) < p
+        out[mask] = rng.choice(values, mask.sum())
+        return out
+
+    data = {
+        "building": rng.choice(BUILDING_TYPES, n_buildings, p=BUILDING_PROBS),
+        "amenity": sparse(["school", "place_of_worship", "clinic", "marketplace"], 0.02),
+        "building:levels": sparse(["1", "2", "3", "2;3"], 0.08),
+        "name": sparse(["Masjid Al-Ikhlas", "SD Negeri 1", "Balai Desa"], 0.01),
+    }
+    # tag sparse lain seperti hasil features_from_place
+    for i in range(40):
+        data[f"addr:extra{i}"] = sparse(["x", "y"], 0.002)
+    index = pd.MultiIndex.from_arrays(
+        [np.full(n_buildings, "way"), np.arange(1, n_buildings + 1, dtype=np.int64)],
+        names=["element", "id"],
+    )
+    return gpd.GeoDataFrame(data, index=index, geometry=geoms, crs="EPSG:4326")
+
+
+def make_road_graph(rng, boundary, n_nodes, drop_ratio=0.1):
+    # grid jalan dengan jitter, hanya node di dalam boundary (MultiDiGraph ala osmnx)
+    poly = boundary.geometry.iloc[0]
+    x0, y0, x1, y1 = poly.bounds
+    fill = poly.area / ((x1 - x0) * (y1 - y0))
+    side = int(np.ceil(np.sqrt(n_nodes / fill)))
+    gx, gy = np.meshgrid(np.linspace(x0, x1, side), np.linspace(y0, y1, side))
+    step = (x1 - x0) / side
+    xs = gx.ravel() + rng.normal(0, step * 0.15, gx.size)
+    ys = gy.ravel() + rng.normal(0, step * 0.15, gy.size)
+    inside = shapely.contains_xy(poly, xs, ys)
+    node_id = np.where(inside, np.arange(1, gx.size + 1), 0)
+
+    G = nx.MultiDiGraph(crs="epsg:4326")
+    G.add_nodes_from((int(n), {"x": float(x), "y": float(y), "street_count": 4})
+                     for n, x, y in zip(node_id[inside], xs[inside], ys[inside]))
+
+    grid = node_id.reshape(side, side)
+    pairs = np.vstack([
+        np.column_stack([grid[:, :-1].ravel(), grid[:, 1:].ravel()]),
+        np.column_stack([grid[:-1, :].ravel(), grid[1:, :].ravel()]),
+    ])
+    pairs = pairs[(pairs > 0).all(axis=1)]
+    pairs = pairs[rng.random(len(pairs)) >= drop_ratio]
+
+    lon = dict(zip(node_id[inside], xs[inside]))
+    lat = dict(zip(node_id[inside], ys[inside]))
+    highway = rng.choice(["residential", "unclassified", "tertiary", "secondary", "primary"],
+                         len(pairs), p=[0.55, 0.2, 0.15, 0.07, 0.03])
+    edges = []
+    for k, (u, v) in enumerate(pairs):
+        dx = (lon[u] - lon[v]) * M_PER_DEG * np.cos(np.radians(lat[u]))
+        dy = (lat[u] - lat[v]) * M_PER_DEG
+        attrs = {"osmid": 10_000_000 + k, "highway": str(highway[k]),
+                 "oneway": False, "length": float(np.hypot(dx, dy))}
+        edges.append((int(u), int(v), 0, dict(attrs, reversed=False)))
+        edges.append((int(v), int(u), 0, dict(attrs, reversed=True)))
+    G.add_edges_from(edges)
+    return G
+
+
+def make_flood_table(rng, desa, n_points, n_invalid=3):
+    # tabel seperti Data_Desa_Rawan_Banjir_di_Cilacap.xlsx (beberapa desimal pakai koma)
+    rows = desa.sample(n_points, replace=n_points > len(desa), random_state=int(rng.integers(1 << 31)))
+    pts = shapely.get_coordinates(rows.geometry.representative_point().values)
+    lat = pts[:, 1].round(6).astype(object)
+    lon = pts[:, 0].round(6).astype(object)
+    comma = rng.random(n_points) < 0.1
+    lat[comma] = [str(v).replace(".", ",") for v in lat[comma]]
+    lon[comma] = [str(v).replace(".", ",") for v in lon[comma]]
+    df = pd.DataFrame({
+        "No": np.arange(1, n_points + 1),
+        "Kecamatan": rows["WADMKC"].values,
+        "Desa": rows["NAMOBJ"].values,
+        "Latitude": lat,
+        "Longitude": lon,
+    })
+    bad = rng.choice(n_points, min(n_invalid, n_points), replace=False)
+    df.loc[bad, "Latitude"] = "-"
+    return df
+
+
+def make_evac_table(rng, boundary, n_points, n_cols=14):
+    # CSV tanpa header seperti tempatevakuasinew.csv (kolom 3 = lat, 4 = lon, 12 = jenis bencana)
+    poly = boundary.geometry.iloc[0]
+    x0, y0, x1, y1 = poly.bounds
+    xs = rng.uniform(x0, x1, n_points)
+    ys = rng.uniform(y0, y1, n_points)
+    df = pd.DataFrame({c: [f"val{c}_{i}" for i in range(n_points)] for c in range(n_cols)})
+    df[0] = np.arange(1, n_points + 1)
+    df[1] = [f"Tempat Evakuasi {i}" for i in range(n_points)]
+    df[3] = ys.round(6).astype(object)
+    df[4] = xs.round(6).astype(object)
+    df[5] = rng.integers(20, 2000, n_points)
+    df[12] = rng.choice(JENIS_BENCANA, n_points)
+    df.loc[0, 3] = "tidak ada"
+    return df
+
+
+def make_changes(rng, buildings, G, n_buildings=200, n_roads=20, first_id=9_000_000_000):
+    # osmChange sintetis: bangunan baru/diubah/dihapus, jalan baru/diubah/dihapus, node jalan digeser
+    changes = {"create": [], "modify": [], "delete": []}
+    next_id = iter(range(first_id, first_id + 10 * (n_buildings + n_roads) + 100))
+
+    def polygon_nodes(geom, action):
+        refs = []
+        for x, y in np.asarray(geom.exterior.coords)[:-1]:
+            refs.append(next(next_id))
+            changes[action].append(("node", refs[-1], 1, {"lon": x, "lat": y}, {}, []))
+        return refs + refs[:1]
+
+    ids = buildings.index.get_level_values("id").to_numpy()
+    picked = rng.choice(len(buildings), 3 * n_buildings, replace=False)
+    new_b, mod_b, del_b = np.array_split(picked, 3)
+    geoms = buildings.geometry.values
+    for i in new_b:
+        geom = shapely.affinity.translate(geoms[i], *rng.normal(0, 60, 2) / M_PER_DEG)
+        changes["create"].append(("way", next(next_id), 1, {}, {"building": "house"},
+                                  polygon_nodes(geom, "create")))
+    for i in mod_b:
+        geom = shapely.affinity.scale(geoms[i], 1.3, 1.3)
+        changes["modify"].append(("way", int(ids[i]), 2, {}, {"building": "yes", "building:levels": "2"},
+                                  polygon_nodes(geom, "create")))
+    for i in del_b:
+        changes["delete"].append(("way", int(ids[i]), 2, {}, {}, []))
+
+    edges = [(u, v, d) for u, v, d in G.edges(data=True) if not d.get("reversed")]
+    picked = rng.choice(len(edges), 3 * n_roads, replace=False)
+    new_r, mod_r, del_r = np.array_split(picked, 3)
+    for i in new_r:
+        # jalan baru dari ujung edge lama ke node baru di dekatnya
+        u, _, _ = edges[i]
+        x, y = G.nodes[u]["x"], G.nodes[u]["y"]
+        mid, end = next(next_id), next(next_id)
+        changes["create"].append(("node", mid, 1, {"lon": x + 0.002, "lat": y + 0.001}, {}, []))
+        changes["create"].append(("node", end, 1, {"lon": x + 0.004, "lat": y + 0.001}, {}, []))
+        changes["create"].append(("way", next(next_id), 1, {}, {"highway": "residential"}, [int(u), mid, end]))
+    for i in mod_r:
+        u, v, d = edges[i]
+        changes["modify"].append(("way", int(d["osmid"]), 2, {}, {"highway": "secondary", "oneway": "yes"},
+                                  [int(u), int(v)]))
+        changes["modify"].append(("node", int(v), 2, {"lon": G.nodes[v]["x"] + 0.0005,
+                                                       "lat": G.nodes[v]["y"]}, {}, []))
+    for i in del_r:
+        changes["delete"].append(("way", int(edges[i][2]["osmid"]), 2, {}, {}, []))
+    # jalan setapak: bukan network drive, harus diabaikan
+    a, b = next(next_id), next(next_id)
+    changes["create"] += [("node", a, 1, {"lon": BBOX[0] + 0.3, "lat": BBOX[1] + 0.3}, {}, []),
+                          ("node", b, 1, {"lon": BBOX[0] + 0.31, "lat": BBOX[1] + 0.3}, {}, []),
+                          ("way", next(next_id), 1, {}, {"highway": "footway"}, [a, b])]
+    return changes
+
+
+def write_osc(changes, path):
+    import xml.etree.ElementTree as ET
+
+    root = ET.Element("osmChange", version="0.6", generator="synthetic_data")
+    for action in ("create", "modify", "delete"):
+        block = ET.SubElement(root, action)
+        for kind, osm_id, version, attrs, tags, refs in changes[action]:
+            el = ET.SubElement(block, kind, id=str(osm_id), version=str(version),
+                               **{k: f"{v:.7f}" for k, v in attrs.items()})
+            for ref in refs:
+                ET.SubElement(el, "nd", ref=str(ref))
+            for k, v in tags.items():
+                ET.SubElement(el, "tag", k=k, v=v)
+    ET.ElementTree(root).write(path, encoding="utf-8", xml_declaration=True)
+    return path
+
+
+def generate_changes(root, n_buildings=200, n_roads=20, seed=0):
+    # fixture osmChange untuk osm_update.py, dari data sintetis yang sudah di-generate
+    import osmnx as ox
+
+    rng = np.random.default_rng(seed)
+    buildings = pd.read_pickle(os.path.join(root, "data_raw", "building_osm.pkl"))
+    G = ox.load_graphml(os.path.join(root, "data_processed", "road.graphml"))
+    path = os.path.join(root, "data_raw", "changes.osc")
+    return write_osc(make_changes(rng, buildings, G, n_buildings, n_roads), path)
+
+
+def generate(root, scale="small", seed=42, overwrite=False):
+    # Tulis semua layer sintetis ke root/ (data_raw + data_processed + raw pickle bangunan)
+    params = dict(SCALES[scale]) if isinstance(scale, str) else dict(scale)
+    marker = os.path.join(root, "synthetic.json")
+    meta = {"scale": scale if isinstance(scale, str) else "custom", "seed": seed, **params}
+    if not overwrite and os.path.exists(marker):
+        with open(marker) as f:
+            if json.load(f) == meta:
+                return meta
+
+    import osmnx as ox
+
+    rng = np.random.default_rng(seed)
+    raw_dir = os.path.join(root, "data_raw")
+    out_dir = os.path.join(root, "data_processed")
+    os.makedirs(raw_dir, exist_ok=True)
+    os.makedirs(out_dir, exist_ok=True)
+
+    boundary = make_boundary(rng)
+    boundary.to_file(os.path.join(out_dir, "boundary.geojson"), driver="GeoJSON")
+
+    desa = make_desa(rng, boundary, params["desa"])
+    desa.to_file(os.path.join(raw_dir, "ADMINISTRASIDESA_AR_25K.shp"))
+
+    buildings = make_buildings(rng, desa, params["buildings"])
+    buildings.to_pickle(os.path.join(raw_dir, "building_osm.pkl"))
+
+    G = make_road_graph(rng, boundary, params["road_nodes"])
+    ox.save_graphml(G, os.path.join(out_dir, "road.graphml"))
+
+    make_flood_table(rng, desa, params["flood"]).to_excel(
+        os.path.join(raw_dir, "Data_Desa_Rawan_Banjir_di_Cilacap.xlsx"), index=False)
+    make_evac_table(rng, boundary, params["evac"]).to_csv(
+        os.path.join(raw_dir, "tempatevakuasinew.csv"), header=False, index=False)
+
+    with open(marker, "w") as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate data sintetis skala Cilacap")
+    parser.add_argument("--out", default="cache/synthetic")
+    parser.add_argument("--scale", default="small", choices=sorted(SCALES))
+    parser.add_argument("--buildings", type=int, help="override jumlah bangunan")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--overwrite", action="store_true")
+    parser.add_argument("--changes", type=int, metavar="N",
+                        help="tulis juga fixture data_raw/changes.osc (N bangunan per aksi)")
+    args = parser.parse_args()
+
+    scale = args.scale
+    if args.buildings:
+        scale = dict(SCALES[args.scale], buildings=args.buildings)
+    print(f"🔄 Generating synthetic data ({args.scale}, seed={args.seed}) -> {args.out}")
+    meta = generate(args.out, scale, seed=args.seed, overwrite=args.overwrite)
+    print(f"✅ Selesai: {meta}")
+    if args.changes:
+        path = generate_changes(args.out, n_buildings=args.changes, n_roads=max(1, args.changes // 10),
+                                seed=args.seed)
+        print(f"✅ Saved: {path}")
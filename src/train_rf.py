@@ -0,0 +1,309 @@
+"""
+Training Random Forest risiko banjir kecamatan dengan spatial CV + pencarian hyperparameter paralel
+Sampel = sel grid raster (raster_grid.py) di dalam kecamatan, label = kelas risiko kecamatannya.
+Fold dibentuk dari geometri kecamatan (KMeans centroid -> blok kecamatan yang berdekatan),
+jadi sel satu kecamatan tidak pernah ada di train dan test sekaligus.
+Matriks fitur dibangun sekali dan di-cache (.npy); worker process pool membukanya sebagai
+memmap read-only (tidak di-pickle ke tiap worker). Semua kombinasi fold x parameter dijalankan
+paralel, parameter terbaik dipilih dari recall kelas Tinggi (tie-break macro F1), lalu model
+di-fit ulang dengan semua data dan disimpan (.pkl joblib) bersama laporan metrik & waktu.
+
+Label: CSV --labels (kolom kecamatan, risk = Rendah/Sedang/Tinggi). Tanpa --labels dipakai label
+proksi dari jumlah titik rawan banjir per kecamatan (tertil); fitur turunan titik banjir
+(flood_kde) otomatis dibuang agar label tidak bocor ke fitur.
+
+Contoh:
+  python src/raster_grid.py && python src/train_rf.py
+  python src/train_rf.py --labels data_raw/risiko_kecamatan.csv --folds 4 --workers 8
+  python src/train_rf.py --max-cells 2000 --grid "n_estimators=200,500;max_depth=None,16"
+"""
+
+import os
+import json
+import time
+import hashlib
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import shapely
+
+from building_metrics import to_utm
+from geofence import fence_paths, KECAMATAN_COLUMN
+from instrument import span, event
+from raster_grid import GRID_DIR, LABEL, load_grid
+from region import REGION
+
+CLASSES = ["Rendah", "Sedang", "Tinggi"]
+TARGET = "Tinggi"
+N_FOLDS = 4
+MAX_CELLS = 500  # sel per kecamatan (sampel acak) agar fit tetap ringan
+LEAKY_FEATURES = ("flood_kde",)  # dibuang jika label diturunkan dari titik banjir
+PARAM_GRID = {
+    "n_estimators": [100, 300],
+    "max_depth": [None, 12],
+    "min_samples_leaf": [1, 5],
+    "class_weight": ["balanced", None],
+}
+CACHE_DIR = REGION.path("model_cache")
+MODEL_DIR = "models"
+MODEL_PATH = os.path.join(MODEL_DIR, f"flood_risk_rf_{REGION.slug}.pkl")
+
+
+def proxy_labels(kecamatan_names):
+    # tertil jumlah titik rawan banjir per kecamatan -> Rendah / Sedang / Tinggi
+    flood = gpd.read_file(REGION.path(f"{REGION.flood_name}.geojson"))
+    col = KECAMATAN_COLUMN if KECAMATAN_COLUMN in flood.columns else "Kecamatan"
+    key = flood[col].astype(str).str.strip().str.upper()
+    counts = key.value_counts().reindex([n.upper() for n in kecamatan_names], fill_value=0).to_numpy()
+    ranks = pd.Series(counts).rank(method="first").to_numpy()
+    return np.minimum((ranks - 1) * 3 // len(counts), 2).astype(np.int8), counts
+
+
+def read_labels(path, kecamatan_names):
+    table = pd.read_csv(path)
+    risk = dict(zip(table["kecamatan"].astype(str).str.strip().str.upper(), table["risk"].astype(str).str.strip()))
+    missing = [n for n in kecamatan_names if n.upper() not in risk]
+    if missing:
+        raise ValueError(f"Label tidak ada untuk kecamatan: {missing}")
+    return np.array([CLASSES.index(risk[n.upper()]) for n in kecamatan_names], dtype=np.int8)
+
+
+def spatial_folds(kecamatan, n_folds=N_FOLDS, seed=0):
+    # KMeans pada centroid kecamatan (UTM) -> fold berisi kecamatan yang bertetangga
+    from sklearn.cluster import KMeans
+
+    polys = to_utm(np.asarray(kecamatan.geometry.values), kecamatan.crs or "EPSG:4326")
+    xy = shapely.get_coordinates(shapely.centroid(polys))
+    return KMeans(n_clusters=n_folds, n_init=10, random_state=seed).fit_predict(xy).astype(np.int8)
+
+
+def cache_key(meta, labels_path, max_cells, seed):
+    h = hashlib.sha1(json.dumps(meta, sort_keys=True).encode())
+    if labels_path:
+        h.update(f"{os.path.abspath(labels_path)}:{os.path.getmtime(labels_path)}".encode())
+    else:
+        flood = REGION.path(f"{REGION.flood_name}.geojson")
+        h.update(f"proxy:{os.path.getmtime(flood)}".encode())
+    h.update(f"{max_cells}:{seed}".encode())
+    return h.hexdigest()[:16]
+
+
+def build_features(labels_path=None, max_cells=MAX_CELLS, seed=0, cache_dir=CACHE_DIR):
+    # matriks fitur (sel x layer) + label + grup kecamatan; di-cache per isi grid & sumber label
+    grid, arrays, meta = load_grid()
+    key = cache_key(meta, labels_path, max_cells, seed)
+    info_path = os.path.join(cache_dir, "features.json")
+    if os.path.exists(info_path):
+        with open(info_path) as f:
+            info = json.load(f)
+        if info.get("key") == key:
+            return info, True
+
+    names = meta["labels"]
+    if labels_path:
+        kec_class = read_labels(labels_path, names)
+        features = list(meta["layers"])
+    else:
+        kec_class, _ = proxy_labels(names)
+        features = [n for n in meta["layers"] if n not in LEAKY_FEATURES]
+
+    label = np.asarray(arrays[LABEL]).ravel()
+    rng = np.random.default_rng(seed)
+    rows = []
+    for k in range(1, len(names) + 1):
+        cells = np.flatnonzero(label == k)
+        if len(cells) > max_cells:
+            cells = rng.choice(cells, max_cells, replace=False)
+        rows.append(np.sort(cells))
+    rows = np.concatenate(rows)
+    X = np.column_stack([np.asarray(arrays[n]).ravel()[rows] for n in features]).astype(np.float32)
+    X = np.nan_to_num(X, nan=0.0, posinf=np.finfo(np.float32).max)  # jarak inf jika tidak ada shelter
+    group = (label[rows] - 1).astype(np.int16)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    np.save(os.path.join(cache_dir, "X.npy"), X)
+    np.save(os.path.join(cache_dir, "y.npy"), kec_class[group])
+    np.save(os.path.join(cache_dir, "group.npy"), group)
+    info = {"key": key, "features": features, "kecamatan": names, "kecamatan_class": kec_class.tolist(),
+            "label_source": labels_path or "proxy:flood_points", "rows": int(len(rows)), "grid_res": meta["res"]}
+    with open(info_path, "w") as f:
+        json.dump(info, f, indent=2)
+    return info, False
+
+
+# data read-only worker: memmap dibuka sekali per process
+_DATA = None
+
+
+def _init(cache_dir):
+    global _DATA
+    _DATA = {n: np.load(os.path.join(cache_dir, f"{n}.npy"), mmap_mode="r") for n in ("X", "y", "group")}
+
+
+def _fit(job):
+    # satu fit (parameter, fold): metrik per sel dan per kecamatan (rata-rata probabilitas sel)
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.metrics import recall_score, f1_score
+
+    p_idx, params, fold, test_kec, seed = job
+    X, y, group = _DATA["X"], _DATA["y"], _DATA["group"]
+    test = np.isin(group, test_kec)
+    t0, c0 = time.perf_counter(), time.process_time()
+    model = RandomForestClassifier(random_state=seed, n_jobs=1, **params).fit(X[~test], y[~test])
+    fit_s, cpu_s = time.perf_counter() - t0, time.process_time() - c0
+    proba = np.zeros((int(test.sum()), len(CLASSES)))
+    proba[:, model.classes_] = model.predict_proba(X[test])
+    pred = proba.argmax(axis=1)
+    truth = np.asarray(y[test])
+    g = np.asarray(group[test])
+    kec = np.unique(g)
+    kec_proba = np.vstack([proba[g == k].mean(axis=0) for k in kec])
+    kec_truth = np.array([truth[g == k][0] for k in kec])
+    labels = list(range(len(CLASSES)))
+    target = CLASSES.index(TARGET)
+    return {
+        "param_id": p_idx, "fold": fold, "fit_s": round(fit_s, 4), "cpu_s": round(cpu_s, 4),
+        "n_train": int((~test).sum()), "n_test": int(test.sum()),
+        "recall_tinggi": recall_score(truth, pred, labels=[target], average="macro", zero_division=np.nan),
+        "f1_macro": f1_score(truth, pred, labels=labels, average="macro", zero_division=0),
+        "kec_pred": kec_proba.argmax(axis=1).tolist(), "kec_truth": kec_truth.tolist(),
+    }
+
+
+def param_combos(grid=PARAM_GRID):
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def parse_grid(text):
+    # "n_estimators=100,300;max_depth=None,12" -> dict
+    def value(v):
+        v = v.strip()
+        if v == "None":
+            return None
+        for cast in (int, float):
+            try:
+                return cast(v)
+            except ValueError:
+                pass
+        return v
+
+    grid = {}
+    for part in text.split(";"):
+        if part.strip():
+            k, vals = part.split("=", 1)
+            grid[k.strip()] = [value(v) for v in vals.split(",")]
+    return grid
+
+
+def run_search(combos, folds, cache_dir=CACHE_DIR, workers=None, seed=0):
+    jobs = [(i, params, f, np.flatnonzero(folds == f), seed)
+            for i, params in enumerate(combos) for f in np.unique(folds)]
+    workers = min(workers or os.cpu_count() or 1, os.cpu_count() or 1)
+    if workers == 1:
+        _init(cache_dir)
+        return [_fit(j) for j in jobs]
+    with ProcessPoolExecutor(workers, initializer=_init, initargs=(cache_dir,)) as pool:
+        return list(pool.map(_fit, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+
+
+def summarize(results, combos):
+    from sklearn.metrics import recall_score
+
+    target = CLASSES.index(TARGET)
+    df = pd.DataFrame(results)
+    rows = []
+    for p_idx, part in df.groupby("param_id"):
+        kec_pred = np.concatenate(part["kec_pred"].map(np.asarray).to_list())
+        kec_truth = np.concatenate(part["kec_truth"].map(np.asarray).to_list())
+        rows.append(dict(
+            param_id=p_idx, **{k: str(v) for k, v in combos[p_idx].items()},
+            recall_tinggi=part["recall_tinggi"].mean(), recall_tinggi_std=part["recall_tinggi"].std(),
+            f1_macro=part["f1_macro"].mean(),
+            kec_recall_tinggi=recall_score(kec_truth, kec_pred, labels=[target], average="macro", zero_division=0),
+            kec_accuracy=float((kec_pred == kec_truth).mean()),
+            fit_s=part["fit_s"].sum(),
+        ))
+    table = pd.DataFrame(rows)
+    return table.sort_values(["recall_tinggi", "f1_macro"], ascending=False, na_position="last").reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Spatial CV + hyperparameter search Random Forest")
+    parser.add_argument("--labels", help="CSV kolom kecamatan,risk (default: label proksi titik banjir)")
+    parser.add_argument("--folds", type=int, default=N_FOLDS)
+    parser.add_argument("--max-cells", type=int, default=MAX_CELLS, help="sampel sel per kecamatan")
+    parser.add_argument("--grid", help='mis. "n_estimators=100,300;max_depth=None,12"')
+    parser.add_argument("--workers", type=int, default=None, help="default (dan maksimum): jumlah core")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=MODEL_PATH)
+    args = parser.parse_args()
+
+    if not os.path.exists(os.path.join(GRID_DIR, "meta.json")):
+        parser.error(f"grid belum ada di {GRID_DIR}, jalankan src/raster_grid.py dulu")
+
+    with span("features") as s:
+        info, cached = build_features(args.labels, args.max_cells, args.seed)
+        s.set(rows=info["rows"], cached=cached)
+    event(f"🧮 {info['rows']} sel x {len(info['features'])} fitur ({', '.join(info['features'])})"
+          f"{' [cache]' if cached else ''}, label: {info['label_source']}", rows=info["rows"], cached=cached)
+
+    with span("folds"):
+        boundary_path, kecamatan_path = fence_paths()
+        kecamatan = gpd.read_file(kecamatan_path)
+        kecamatan = kecamatan.set_index(kecamatan["kecamatan"].astype(str)).loc[info["kecamatan"]]
+        folds = spatial_folds(kecamatan, args.folds, args.seed)
+    for f in range(args.folds):
+        names = [n for n, k in zip(info["kecamatan"], folds) if k == f]
+        classes = sorted({CLASSES[info["kecamatan_class"][info["kecamatan"].index(n)]] for n in names})
+        event(f"   fold {f}: {len(names)} kecamatan ({', '.join(classes)})")
+
+    combos = param_combos(parse_grid(args.grid) if args.grid else PARAM_GRID)
+    workers = min(args.workers or os.cpu_count() or 1, os.cpu_count() or 1)
+    if args.workers and workers < args.workers:
+        event(f"⚠️  --workers {args.workers} dibatasi ke {workers} core", workers=workers)
+    with span("search", fits=len(combos) * args.folds, workers=workers) as s:
+        t0 = time.perf_counter()
+        results = run_search(combos, folds, workers=workers, seed=args.seed)
+        wall = time.perf_counter() - t0
+        s.set(rows=len(results))
+    table = summarize(results, combos)
+    # waktu CPU fit (1 thread per fit) / wall = rata-rata core yang benar-benar terpakai; waktu
+    # wall per fit tidak dipakai karena ikut membengkak saat worker berebut core
+    fit_total = float(pd.DataFrame(results)["fit_s"].sum())
+    cpu_total = float(pd.DataFrame(results)["cpu_s"].sum())
+    event(f"⚡ {len(results)} fit dalam {wall:.1f}s, {workers} worker "
+          f"(CPU fit {cpu_total:.1f}s, rata-rata {cpu_total / max(wall, 1e-9):.1f} core terpakai)",
+          fits=len(results), wall_s=round(wall, 3), fit_s=round(fit_total, 3), cpu_s=round(cpu_total, 3))
+
+    best = combos[int(table.loc[0, "param_id"])]
+    with span("refit", rows=info["rows"]):
+        import joblib
+        from sklearn.ensemble import RandomForestClassifier
+        _init(CACHE_DIR)
+        model = RandomForestClassifier(random_state=args.seed, n_jobs=workers, **best)
+        model.fit(np.asarray(_DATA["X"]), np.asarray(_DATA["y"]))
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        joblib.dump({"model": model, "features": info["features"], "classes": CLASSES, "params": best,
+                     "label_source": info["label_source"], "grid_res": info["grid_res"]}, args.output)
+    event(f"✅ Saved: {args.output} (params {best})", path=args.output)
+
+    base = os.path.splitext(args.output)[0]
+    table.to_csv(base + "_cv.csv", index=False)
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "region": REGION.slug, "label_source": info["label_source"], "features": info["features"],
+        "rows": info["rows"], "folds": args.folds, "fold_of_kecamatan": dict(zip(info["kecamatan"], folds.tolist())),
+        "fits": len(results), "workers": workers, "search_wall_s": round(wall, 3), "fit_s_total": round(fit_total, 3),
+        "fit_cpu_s_total": round(cpu_total, 3), "cores_used": round(cpu_total / max(wall, 1e-9), 2),
+        "best_params": best, "best": table.iloc[0].drop("param_id").to_dict(),
+        "importances": dict(zip(info["features"], model.feature_importances_.round(4).tolist())),
+    }
+    with open(base + "_report.json", "w") as f:
+        json.dump(report, f, indent=2, default=str)
+    event(f"✅ Saved: {base}_cv.csv, {base}_report.json", path=base + "_report.json")
+    print(table.head(5).to_string(index=False))
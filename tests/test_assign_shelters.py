@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+from conftest import run_script
+from assign_shelters import ASSIGNMENT_PATH, LOAD_PATH, solve_assignment
+
+
+def test_solve_assignment_respects_capacity():
+    # 3 node demand, 2 shelter; shelter 0 paling dekat untuk semua tapi hanya muat 4
+    demand = np.array([3.0, 3.0, 2.0])
+    capacity = np.array([4.0, 10.0])
+    pair_d = np.array([0, 0, 1, 1, 2])
+    pair_s = np.array([0, 1, 0, 1, 0])
+    pair_cost = np.array([1.0, 5.0, 1.0, 2.0, 1.0])
+    flow, unassigned, _ = solve_assignment(demand, capacity, pair_d, pair_s, pair_cost)
+    assert np.bincount(pair_s, weights=flow, minlength=2)[0] <= 4
+    # node 2 hanya bisa ke shelter 0: sisa yang tidak muat tercatat unassigned
+    np.testing.assert_array_equal(np.bincount(pair_d, weights=flow, minlength=3) + unassigned, demand)
+    assert flow[4] + unassigned[2] == 2
+
+
+def test_assign_shelters_travel_time(ws_copy):
+    run_script("assign_shelters.py", "--persons", "40")
+    assignment = pd.read_csv(ASSIGNMENT_PATH)
+    load = pd.read_csv(LOAD_PATH)
+    assert {"time_s", "snap_m"} <= set(assignment.columns)
+    assert (load["load"] <= load["capacity"]).all()
+    assigned = assignment["shelter"] >= 0
+    assert load["load"].sum() == assigned.sum() * 40
+    assert assignment.loc[assigned, "time_s"].notna().all()
+
+
+def test_assign_shelters_length_raw_graph(ws_copy):
+    run_script("assign_shelters.py", "--weight", "length", "--raw-graph")
+    assert "dist_m" in pd.read_csv(ASSIGNMENT_PATH).columns
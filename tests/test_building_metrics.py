@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import shapely
+
+from conftest import run_script
+
+
+def test_square_footprint():
+    from building_metrics import footprint_metrics
+
+    square = shapely.box(0, 0, 10, 20)
+    m = footprint_metrics(np.array([square]))
+    assert m["area_m2"][0] == 200
+    assert m["perimeter_m"][0] == 60
+    assert np.isclose(m["compactness"][0], 4 * np.pi * 200 / 60 ** 2)
+    assert (m["centroid_x"][0], m["centroid_y"][0]) == (5, 10)
+
+
+def test_metrics_match_geopandas_and_ignore_chunking(ws):
+    from building_metrics import UTM_CRS, compute_metrics
+    from building_schema import load_buildings
+    from region import REGION
+
+    building = load_buildings(REGION.path("building.geojson"))
+    flood = gpd.read_file(REGION.path(f"{REGION.flood_name}.geojson"))
+    metrics = compute_metrics(building, flood, radii=(250,), workers=2, chunk_size=700)
+    single = compute_metrics(building, flood, radii=(250,), workers=1, chunk_size=10_000)
+    pd.testing.assert_frame_equal(metrics, single)
+
+    utm = building.to_crs(UTM_CRS)
+    np.testing.assert_allclose(metrics["area_m2"], utm.area, rtol=1e-5)
+    np.testing.assert_allclose(metrics["perimeter_m"], utm.length, rtol=1e-5)
+    # jarak ke titik banjir terdekat = brute force semua pasangan
+    flood_utm = np.asarray(flood.to_crs(UTM_CRS).geometry.values)
+    brute = shapely.distance(np.asarray(utm.geometry.values)[:, None], flood_utm[None, :]).min(axis=1)
+    np.testing.assert_allclose(metrics["dist_flood_m"], brute, rtol=1e-5, atol=1e-3)
+    assert (metrics["flood_250m"] == (brute <= 250)).all()
+
+
+def test_cli_writes_keyed_csv(ws):
+    from building_metrics import load_metrics
+
+    run_script("building_metrics.py", "--workers", "1", "--output", "data_processed/metrics_test.csv")
+    metrics = load_metrics("data_processed/metrics_test.csv")
+    assert metrics.index.names == ["element", "id"]
+    assert len(metrics) == len(gpd.read_file("data_processed/building.geojson", columns=[]))
+    assert {"area_m2", "dist_flood_m", "flood_500m"} <= set(metrics.columns)
@@ -0,0 +1,67 @@
+import os
+import sys
+
+import geopandas as gpd
+import pytest
+
+import instrument
+from cilacap import main, script_imports
+from cluster_flood import CLUSTERS_PATH
+from region import REGION
+
+SCRIPT = '''
+import os
+import numpy as np
+try:
+    import rasterio
+except ImportError:
+    rasterio = None
+with open(os.devnull) as f:
+    import matplotlib.pyplot as plt
+if os.environ.get("X"):
+    import osmnx
+
+
+def f():
+    import sklearn
+
+
+if __name__ == "__main__":
+    import argparse
+'''
+
+
+@pytest.fixture
+def isolated(monkeypatch):
+    # run() menulis nama script ke laporan instrument dan mengganti sys.argv
+    monkeypatch.setattr(instrument, "_run", dict(instrument._run))
+    monkeypatch.setattr(sys, "argv", list(sys.argv))
+
+
+def test_script_imports_skip_branches(tmp_path):
+    path = tmp_path / "script.py"
+    path.write_text(SCRIPT)
+    assert script_imports(str(path)) == ["os", "numpy", "rasterio", "argparse"]
+
+
+def test_help_forwarded_to_script(isolated, capsys):
+    assert main(["analyze", "cluster", "--help"]) == 0
+    assert "--incremental" in capsys.readouterr().out
+    # script tanpa argparse tidak dijalankan, hanya docstring
+    assert main(["kecamatan", "filter", "-h"]) == 0
+    assert "Filter hanya" in capsys.readouterr().out
+    with pytest.raises(SystemExit):
+        main(["kecamatan", "-h"])
+    assert "usage: cilacap kecamatan" in capsys.readouterr().out
+
+
+def test_main_runs_subcommand(ws_copy, isolated):
+    path = REGION.path(f"{REGION.kecamatan_name}.geojson")
+    os.remove(path)
+    assert main(["kecamatan", "filter"]) == 0
+    assert instrument._run["command"] == "kecamatan filter"
+    assert len(gpd.read_file(path)) > 0
+
+    assert main(["analyze", "cluster", "--eps", "20000", "--min-samples", "2"]) == 0
+    assert os.path.exists(CLUSTERS_PATH)
+    assert main(["analyze", "cluster", "--method", "kmeans"]) == 2
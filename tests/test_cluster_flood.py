@@ -0,0 +1,68 @@
+import os
+
+import pandas as pd
+import pytest
+
+from conftest import run_script
+from cluster_flood import CLUSTERS_PATH, CORE_PATH, FLOOD_PATH, assign_incremental
+
+
+def test_assign_incremental_stays_in_kecamatan():
+    # core point kecamatan B lebih dekat, tapi titik milik A hanya boleh ikut cluster A
+    cores = pd.DataFrame({"Kecamatan": ["A", "B"], "lat": [-7.700, -7.7001], "lon": [109.000, 109.0030],
+                          "cluster": [0, 1]})
+    new = pd.DataFrame({"Kecamatan": ["A", "B", "C"], "Latitude": [-7.7001] * 3,
+                        "Longitude": [109.0029] * 3})
+    out = assign_incremental(new, cores, eps_m=500)
+    assert out["cluster"].tolist() == [0, 1, -1]
+
+
+def test_same_input_applied_once(ws_copy):
+    run_script("cluster_flood.py", "--eps", "20000", "--min-samples", "2")
+    cores = pd.read_csv(CORE_PATH)
+    assert len(cores) > 0
+    base = len(pd.read_csv(CLUSTERS_PATH))
+
+    # titik baru ~10 m dari core point -> harus masuk cluster core tersebut
+    new = cores.head(5).rename(columns={"lat": "Latitude", "lon": "Longitude"})
+    new = new.assign(Latitude=new["Latitude"] + 1e-4)[["Kecamatan", "Latitude", "Longitude"]]
+    new.to_csv("new_points.csv", index=False)
+    run_script("cluster_flood.py", "--input", "new_points.csv", "--incremental")
+    first = pd.read_csv(CLUSTERS_PATH)
+    assert len(first) == base + len(new)
+    assert first["cluster"].tail(len(new)).tolist() == cores["cluster"].head(5).tolist()
+
+    # file yang sama lagi -> dilewati (sha1 tercatat), tidak ada yang ditulis
+    mtime = os.stat(CLUSTERS_PATH).st_mtime_ns
+    run_script("cluster_flood.py", "--input", "new_points.csv", "--incremental")
+    assert os.stat(CLUSTERS_PATH).st_mtime_ns == mtime
+    assert len(pd.read_csv(CLUSTERS_PATH)) == len(first)
+    # dan input clustering penuh juga dianggap sudah diterapkan
+    run_script("cluster_flood.py", "--input", FLOOD_PATH, "--incremental")
+    assert len(pd.read_csv(CLUSTERS_PATH)) == len(first)
+
+
+def test_incremental_keeps_repeat_incident(ws_copy):
+    run_script("cluster_flood.py", "--eps", "20000", "--min-samples", "2")
+    cores = pd.read_csv(CORE_PATH)
+    point = cores.head(1).rename(columns={"lat": "Latitude", "lon": "Longitude"})[["Kecamatan", "Latitude", "Longitude"]]
+    point.to_csv("banjir_2023.csv", index=False)
+    run_script("cluster_flood.py", "--input", "banjir_2023.csv", "--incremental")
+    first = pd.read_csv(CLUSTERS_PATH)
+
+    # log tahun berikutnya: kejadian berulang di titik desa yang sama (baris identik, file beda)
+    pd.concat([point, point.assign(Latitude=point["Latitude"] + 1e-4)]).to_csv("banjir_2024.csv", index=False)
+    run_script("cluster_flood.py", "--input", "banjir_2024.csv", "--incremental")
+    second = pd.read_csv(CLUSTERS_PATH)
+    assert len(second) == len(first) + 2
+    same = (second["Latitude"].round(5) == round(point["Latitude"].iloc[0], 5)) & \
+        (second["Longitude"].round(5) == round(point["Longitude"].iloc[0], 5))
+    assert same.sum() == (first["Latitude"].round(5) == round(point["Latitude"].iloc[0], 5)).sum() + 1
+    assert second["cluster"].tail(2).tolist() == [cores["cluster"].iloc[0]] * 2
+
+
+def test_incremental_rejects_hdbscan(ws_copy):
+    run_script("cluster_flood.py", "--method", "hdbscan", "--min-samples", "2")
+    with pytest.raises(SystemExit) as e:
+        run_script("cluster_flood.py", "--incremental")
+    assert e.value.code == 1
@@ -0,0 +1,51 @@
+import json
+
+import numpy as np
+import geopandas as gpd
+import shapely
+from shapely.geometry import Polygon, MultiPolygon
+
+from export_topojson import encode, decode, read_topojson, topojson_path
+from region import REGION
+
+
+def _arc_ids(obj):
+    # {index arc: arah} untuk semua ring objek; ~i = arc i dibalik
+    polys = [obj["arcs"]] if obj["type"] == "Polygon" else obj["arcs"]
+    return {(i if i >= 0 else ~i): i >= 0 for rings in polys for ring in rings for i in ring}
+
+
+def test_shared_border_stored_once():
+    # dua persegi bersebelahan (sisi x=1 bersama), yang kanan punya lubang, plus multipolygon
+    left = Polygon([(0, 0), (1, 0), (1, 1), (0, 1)])
+    right = Polygon([(1, 0), (2, 0), (2, 1), (1, 1)], [[(1.4, 0.4), (1.6, 0.4), (1.6, 0.6), (1.4, 0.6)]])
+    multi = MultiPolygon([Polygon([(3, 0), (4, 0), (4, 1), (3, 1)]), Polygon([(5, 0), (6, 0), (6, 1)])])
+    gdf = gpd.GeoDataFrame({"name": ["a", "b", "c"], "n": [1, 2, 3]},
+                           geometry=[left, right, multi], crs="EPSG:4326")
+    # extent 6 x 1, kuantisasi 601 -> langkah 0.01 pas di semua koordinat
+    topo = json.loads(json.dumps(encode(gdf, "kec", quantization=601)))
+    left_ids, right_ids = (_arc_ids(g) for g in topo["objects"]["kec"]["geometries"][:2])
+    # sisi bersama = satu arc, dipakai kedua polygon dengan arah berlawanan
+    shared = left_ids.keys() & right_ids.keys()
+    assert len(shared) == 1
+    assert all(left_ids[i] != right_ids[i] for i in shared)
+
+    out = decode(topo)
+    assert out["name"].tolist() == ["a", "b", "c"]
+    assert out["n"].tolist() == [1, 2, 3]
+    assert [g.geom_type for g in out.geometry] == ["Polygon", "Polygon", "MultiPolygon"]
+    for a, b in zip(gdf.geometry, out.geometry):
+        assert b.is_valid
+        assert a.symmetric_difference(b).area < 1e-9
+
+
+def test_kecamatan_roundtrip(ws):
+    src = REGION.path(f"{REGION.kecamatan_name}.geojson")
+    gdf = gpd.read_file(src)
+    out = read_topojson(topojson_path(src))
+    assert len(out) == len(gdf)
+    assert out["kecamatan"].tolist() == gdf["kecamatan"].tolist()
+    # kuantisasi 1e5 -> error posisi di bawah ~1 m
+    tol = max(np.ptp(gdf.total_bounds[[0, 2]]), np.ptp(gdf.total_bounds[[1, 3]])) / 1e5
+    dist = shapely.hausdorff_distance(np.asarray(gdf.geometry.values), np.asarray(out.geometry.values))
+    assert (dist <= 2 * tol).all()
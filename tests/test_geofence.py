@@ -0,0 +1,42 @@
+import numpy as np
+import geopandas as gpd
+import shapely
+from shapely.geometry import box
+
+from geofence import KECAMATAN_COLUMN, load_fence, validate_points
+
+
+def _fence():
+    # dua kecamatan bersebelahan di sekitar Cilacap, batas kabupaten = gabungannya
+    kecamatan = gpd.GeoDataFrame({"kecamatan": ["Barat", "Timur"]},
+                                 geometry=[box(108.8, -7.8, 109.0, -7.6), box(109.0, -7.8, 109.2, -7.6)],
+                                 crs="EPSG:4326")
+    boundary = shapely.union_all(kecamatan.geometry.values)
+    shapely.prepare(boundary)
+    return boundary, kecamatan
+
+
+def test_statuses_and_kecamatan():
+    lon = [108.9, -7.7, 109.1, 200.0, np.nan, 110.5, 109.2005]
+    lat = [-7.7, 109.1, -7.7, -7.7, -7.7, -7.7, -7.7]
+    out = validate_points(lon, lat, *_fence(), tolerance_m=200)
+    assert out["geofence"].tolist() == ["ok", "swapped", "ok", "out_of_range", "out_of_range",
+                                        "outside_boundary", "ok"]
+    # titik tertukar dibetulkan lalu ikut ditandai kecamatannya
+    assert (out.loc[1, "lon"], out.loc[1, "lat"]) == (109.1, -7.7)
+    # ~55 m di luar batas timur masih dalam toleransi -> kecamatan terdekat
+    assert out[KECAMATAN_COLUMN].fillna("-").tolist() == ["Barat", "Timur", "Timur", "-", "-", "-", "Timur"]
+
+
+def test_tolerance_zero_rejects_edge_point():
+    out = validate_points([109.2005], [-7.7], *_fence(), tolerance_m=0)
+    assert out["geofence"].tolist() == ["outside_boundary"]
+
+
+def test_workspace_kecamatan_tagging(ws):
+    boundary, kecamatan = load_fence()
+    assert boundary is not None and kecamatan is not None
+    inner = shapely.point_on_surface(kecamatan.geometry.values)
+    out = validate_points(shapely.get_x(inner), shapely.get_y(inner), boundary, kecamatan)
+    assert (out["geofence"] == "ok").all()
+    assert out[KECAMATAN_COLUMN].tolist() == kecamatan["kecamatan"].astype(str).tolist()
@@ -0,0 +1,77 @@
+import numpy as np
+
+from conftest import run_script
+from hex_grid import (CELLS_PATH, METRICS, HexBackend, aggregate, edge_m, hex_cells, hex_centers,
+                      load_cells, query, rollup)
+
+
+def _points(n=5_000, seed=0):
+    # titik acak UTM 49S sekitar Cilacap + metrik acak
+    rng = np.random.default_rng(seed)
+    x = rng.uniform(250_000, 300_000, n)
+    y = rng.uniform(9_130_000, 9_170_000, n)
+    values = np.zeros((n, len(METRICS)))
+    values[:, 0] = 1
+    values[:, 1] = rng.uniform(20, 200, n)
+    return x, y, values
+
+
+def test_point_within_own_hex():
+    x, y, _ = _points()
+    for res in (1, 2, 3, 4):
+        cells = hex_cells(x, y, res)
+        _, cx, cy = hex_centers(cells)
+        # jarak ke pusat <= edge (jari-jari luar), dan pusat sel kembali ke sel yang sama
+        assert (np.hypot(x - cx, y - cy) <= edge_m(res) * (1 + 1e-9)).all()
+        np.testing.assert_array_equal(hex_cells(cx, cy, res), cells)
+
+
+def test_child_center_strictly_inside_parent():
+    x, y, _ = _points()
+    backend = HexBackend()
+    for res in (2, 3, 4):
+        child = np.unique(hex_cells(x, y, res))
+        _, px, py = hex_centers(backend.parents(child, res - 1))
+        _, cx, cy = hex_centers(child)
+        # aperture 7: pusat anak <= edge_anak * sqrt(3) dari pusat induk, di dalam jari-jari dalam induk
+        d = np.hypot(cx - px, cy - py)
+        assert (d <= edge_m(res) * np.sqrt(3) * (1 + 1e-9)).all()
+        assert (d < edge_m(res - 1) * np.sqrt(3) / 2).all()
+
+
+def test_aggregate_totals_and_rollup():
+    x, y, values = _points()
+    cells = aggregate(x, y, values, [1, 2, 3, 4], HexBackend())
+    totals = values.sum(axis=0)
+    for res in (1, 2, 3, 4):
+        part = cells[cells["res"] == res]
+        np.testing.assert_allclose(part[list(METRICS)].to_numpy(dtype=float).sum(axis=0), totals, rtol=1e-4)
+        assert part["cell"].is_unique
+    rolled = rollup(cells, 4, 1)
+    assert rolled["building_count"].sum() == len(x)
+    direct = cells[cells["res"] == 1].set_index("cell")["building_count"]
+    moved = rolled.set_index("cell")["building_count"].sub(direct, fill_value=0).abs().sum() / 2
+    assert moved / len(x) < 0.05
+    # kolom parent = sel res 1 yang memuat pusat sel res 2 (bisa tanpa titik sendiri di tabel res 1)
+    res2 = cells[cells["res"] == 2]
+    np.testing.assert_array_equal(res2["parent"], HexBackend().parents(res2["cell"].to_numpy(), 1))
+
+
+def test_query_bbox():
+    x, y, values = _points()
+    cells = aggregate(x, y, values, [2, 3], HexBackend())
+    full = query(cells, 3)
+    assert (full["res"] == 3).all()
+    bbox = (float(full["lon"].median()), float(full["lat"].median()), 180.0, 90.0)
+    part = query(cells, 3, bbox)
+    assert 0 < len(part) < len(full)
+    assert (part["lon"] >= bbox[0]).all() and (part["lat"] >= bbox[1]).all()
+    assert part["risk_tinggi_mean"].isna().all()  # tanpa sel risiko
+
+
+def test_hex_cli(ws_copy):
+    run_script("hex_grid.py", "--res", "2,3")
+    cells = load_cells(CELLS_PATH)
+    assert cells.attrs["resolutions"] == [2, 3]
+    n_buildings = int(cells.loc[cells["res"] == 3, "building_count"].sum())
+    assert n_buildings == int(cells.loc[cells["res"] == 2, "building_count"].sum()) > 0
@@ -0,0 +1,79 @@
+import os
+import json
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+
+from conftest import FIXTURE_DIR, run_script
+from building_schema import BUILDING_PATH
+from geofence import load_fence
+from osm_update import DIRTY_PATH, ROAD_PATH, kecamatan_for, parse_osm, patch_buildings, tiles_for
+
+# dibuat dari workspace conftest (SCALE, SEED) dengan synthetic_data.generate_changes(n_buildings=6, n_roads=3, seed=7)
+OSC = os.path.join(FIXTURE_DIR, "changes.osc")
+
+
+def _keys(gdf):
+    return set(zip(gdf["element"].astype(str), gdf["id"].astype(np.int64)))
+
+
+def test_patch_without_new_rows_keeps_schema(ws):
+    building = gpd.read_file(BUILDING_PATH)
+    patched, _, old = patch_buildings(building, set(), building.iloc[:0])
+    assert list(patched.columns) == list(building.columns)
+    assert len(patched) == len(building) and len(old) == 0
+
+
+def test_apply_osc(ws_copy):
+    before = gpd.read_file(BUILDING_PATH)
+    _, ways, _ = parse_osm(OSC)
+    buildings = ways[ways["tags"].map(lambda t: "building" in t) | (ways["action"] == "delete")]
+    deleted = set(ways.loc[ways["action"] == "delete", "id"]) & {i for e, i in _keys(before) if e == "way"}
+    modified = set(buildings.loc[buildings["action"] == "modify", "id"])
+    created = set(buildings.loc[buildings["action"] == "create", "id"])
+
+    run_script("osm_update.py", "--osc", OSC)
+    after = gpd.read_file(BUILDING_PATH)
+    with open(DIRTY_PATH) as f:
+        dirty = json.load(f)
+    counts = dirty["updates"][-1]["buildings"]
+    assert counts["upserted"] == len(modified) + len(created)
+    assert counts["removed"] == len(modified) + len(deleted)
+    assert counts["unresolved"] == 0
+    assert len(after) == len(before) - len(deleted) + len(created) == counts["total"]
+
+    # schema tidak berubah (tidak ada kolom index tambahan), key unik
+    assert list(after.columns) == list(before.columns)
+    assert not after[["element", "id"]].duplicated().any()
+    keys = _keys(after)
+    assert not {("way", i) for i in deleted} & keys
+    assert {("way", i) for i in modified | created} <= keys
+
+    roads = dirty["updates"][-1]["roads"]
+    assert roads["edges_removed"] > 0 and roads["edges_added"] > 0
+    # jalan setapak di osc bukan network drive
+    import osmnx as ox
+    edges = ox.graph_to_gdfs(ox.load_graphml(ROAD_PATH), nodes=False)
+    assert not (edges["highway"].astype(str) == "footway").any()
+
+    # bangunan baru/diubah tercatat di tile dan kecamatan dirty
+    changed = after[after["id"].isin(modified | created)].geometry.values
+    assert tiles_for(changed) <= set(dirty["tiles"])
+    _, kecamatan = load_fence()
+    assert kecamatan_for(changed, kecamatan) <= set(dirty["kecamatan"])
+    assert set(dirty["kecamatan"]) <= set(kecamatan["kecamatan"].astype(str))
+
+
+def test_second_apply_is_noop(ws_copy):
+    run_script("osm_update.py", "--osc", OSC)
+    stamps = {p: os.stat(p).st_mtime_ns for p in (BUILDING_PATH, ROAD_PATH, DIRTY_PATH)}
+    with open(DIRTY_PATH) as f:
+        dirty = json.load(f)
+
+    run_script("osm_update.py", "--osc", OSC)
+    assert {p: os.stat(p).st_mtime_ns for p in stamps} == stamps
+    with open(DIRTY_PATH) as f:
+        assert json.load(f) == dirty
+    assert len(dirty["updates"]) == 1
+    assert pd.read_pickle("data_processed/osm_snapshot.pkl")["updated"] is not None
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import run_script
+from raster_grid import GRID_DIR, LABEL, ZONAL_PATH, Grid, load_grid, point_kde, zonal_stats
+
+
+def test_kde_mass_equals_point_count():
+    grid = Grid(0, 10_000, 100, (100, 100))
+    rng = np.random.default_rng(0)
+    # titik jauh dari tepi agar kernel tidak terpotong batas grid
+    xy = rng.uniform(3_000, 7_000, (250, 2))
+    kde = point_kde(grid, xy, bandwidth_m=300)
+    assert kde.sum() * grid.cell_area_km2 == pytest.approx(len(xy), rel=1e-6)
+
+
+def test_zonal_stats_matches_groupby():
+    rng = np.random.default_rng(1)
+    labels = rng.integers(0, 5, (40, 30)).astype(np.int16)
+    values = rng.normal(10, 3, labels.shape)
+    values[rng.random(labels.shape) < 0.1] = np.nan
+    names = ["a", "b", "c", "d", "e"]  # label 5 tidak ada -> baris kosong
+    table = zonal_stats(labels, {"v": values}, names).set_index("kecamatan")
+
+    df = pd.DataFrame({"label": labels.ravel(), "v": values.ravel()})
+    g = df[df["label"] > 0].groupby("label")["v"]
+    expect = pd.DataFrame({"cells": g.size(), "v_mean": g.mean(), "v_std": g.std(ddof=0),
+                           "v_min": g.min(), "v_max": g.max(), "v_sum": g.sum()})
+    expect.index = [names[i - 1] for i in expect.index]
+    got = table.loc[expect.index, expect.columns]
+    np.testing.assert_allclose(got.to_numpy(dtype=float), expect.to_numpy(dtype=float), rtol=1e-9)
+    assert table.loc["e", "cells"] == 0 and np.isnan(table.loc["e", "v_mean"])
+
+
+def test_grid_cli_reuses_memmap(ws_copy):
+    run_script("raster_grid.py", "--res", "500")
+    first = pd.read_csv(ZONAL_PATH)
+    grid, arrays, meta = load_grid(GRID_DIR)
+    assert meta["res"] == 500 and isinstance(arrays["flood_kde"], np.memmap)
+    assert len(first) == len(meta["labels"])
+    # jumlah sel per kecamatan = jumlah label di raster
+    np.testing.assert_array_equal(first["cells"], np.bincount(arrays[LABEL].ravel(),
+                                                              minlength=len(first) + 1)[1:])
+
+    run_script("raster_grid.py", "--res", "500")
+    pd.testing.assert_frame_equal(pd.read_csv(ZONAL_PATH), first)
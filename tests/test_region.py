@@ -0,0 +1,22 @@
+from region import REGIONS
+from run_regions import global_bps_dir
+
+
+def test_bps_dir_scoped_per_region(monkeypatch):
+    cilacap, tegal = REGIONS["cilacap"], REGIONS["kota_tegal"]
+    monkeypatch.delenv("BPS_DIR", raising=False)
+    monkeypatch.delenv("BPS_DIR_CILACAP", raising=False)
+    monkeypatch.delenv("BPS_DIR_KOTA_TEGAL", raising=False)
+    assert cilacap.bps_dir.endswith("KAB. CILACAP") and tegal.bps_dir.endswith("KOTA TEGAL")
+
+    monkeypatch.setenv("BPS_DIR", "/data/bps/{slug}")
+    assert (cilacap.bps_dir, tegal.bps_dir) == ("/data/bps/cilacap", "/data/bps/kota_tegal")
+    assert global_bps_dir() is None
+
+    monkeypatch.setenv("BPS_DIR_KOTA_TEGAL", "/mnt/tegal")
+    assert (cilacap.bps_dir, tegal.bps_dir) == ("/data/bps/cilacap", "/mnt/tegal")
+
+    # BPS_DIR polos: dipakai run satu region, tapi tidak diteruskan run_regions.py
+    monkeypatch.setenv("BPS_DIR", "/data/KAB. CILACAP")
+    assert cilacap.bps_dir == "/data/KAB. CILACAP"
+    assert global_bps_dir() == "/data/KAB. CILACAP"
@@ -0,0 +1,57 @@
+import os
+import json
+import glob
+
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+from conftest import run_script
+from road_graph import CACHE_DIR, GRAPH_PATH, csr_from_arrays, derive_graph, load_derived
+
+
+def test_derive_graph_counts(ws):
+    import osmnx as ox
+
+    G = ox.load_graphml(GRAPH_PATH)
+    C, counts = derive_graph(G)
+    assert counts["raw"] == (len(G), G.number_of_edges())
+    assert counts["raw"][0] >= counts["consolidated"][0] >= counts["scc"][0] == len(C) > 0
+    assert all(d["travel_time"] > 0 for _, _, d in C.edges(data=True))
+
+
+def test_load_derived_cache(ws_copy, tmp_path):
+    cache = str(tmp_path / "cache")
+    arrays, meta, cached = load_derived(GRAPH_PATH, cache_dir=cache)
+    assert not cached
+    again, meta2, cached = load_derived(GRAPH_PATH, cache_dir=cache)
+    assert cached and meta2["key"] == meta["key"]
+    np.testing.assert_array_equal(again["travel_time"], arrays["travel_time"])
+
+    # hanya SCC terbesar: semua node saling terjangkau
+    n = len(arrays["nodes"])
+    assert n == meta["counts"]["scc"]["nodes"] and len(arrays["edge_u"]) == meta["counts"]["scc"]["edges"]
+    adj = coo_matrix((np.ones(len(arrays["edge_u"])), (arrays["edge_u"], arrays["edge_v"])), shape=(n, n))
+    assert connected_components(adj, directed=True, connection="strong")[0] == 1
+    # travel_time positif dan konsisten dengan panjang / kecepatan
+    assert (arrays["travel_time"] > 0).all()
+    np.testing.assert_allclose(arrays["travel_time"], arrays["length"] / (arrays["speed_kph"] / 3.6), rtol=1e-2)
+    csr = csr_from_arrays(arrays, "travel_time")
+    assert csr.n_nodes == n and (csr.weight == arrays["travel_time"]).all()
+
+    # isi graph sumber berubah -> key baru, dibangun ulang, cache lama dihapus
+    with open(GRAPH_PATH, "a") as f:
+        f.write("<!-- osm_update -->\n")
+    _, meta3, cached = load_derived(GRAPH_PATH, cache_dir=cache)
+    assert not cached and meta3["key"] != meta["key"]
+    assert sorted(os.listdir(cache)) == [f"road_{meta3['key']}.json", f"road_{meta3['key']}.npz"]
+
+
+def test_bench_times_cached_load(ws_copy):
+    run_script("road_graph.py", "--bench", "1")
+    (path,) = glob.glob(os.path.join(CACHE_DIR, "road_*.json"))
+    with open(path) as f:
+        bench = json.load(f)["bench"]
+    # load dari cache (tanpa konsolidasi) harus lebih cepat dari parse GraphML
+    assert 0 < bench["cache_load_s"] < bench["raw_load_s"]
+    assert bench["derived"]["reachable"] > 0
@@ -0,0 +1,50 @@
+import numpy as np
+import geopandas as gpd
+import pytest
+
+from building_metrics import to_utm
+from routing import EVAC_PATH, FLOOD_PATH, GRAPH_PATH, DynamicRouter, load_road_csr, nearest_shelter
+
+
+def _points_utm(path):
+    gdf = gpd.read_file(path)
+    return to_utm(np.asarray(gdf.geometry.values), gdf.crs or "EPSG:4326")
+
+
+@pytest.fixture
+def router(ws):
+    csr = load_road_csr(GRAPH_PATH, derived=False)
+    shelters, _ = csr.snap(_points_utm(EVAC_PATH))
+    return DynamicRouter(csr, shelters)
+
+
+def _assert_matches_full(router):
+    dist, _, _ = nearest_shelter(router.csr, router.shelters, router.weight)
+    np.testing.assert_allclose(router.dist, dist, rtol=1e-9)
+    # next_edge konsisten dengan jarak: dist[u] = dist[v] + w(u, v)
+    has = np.flatnonzero(router.next_edge >= 0)
+    e = router.next_edge[has]
+    np.testing.assert_allclose(router.dist[has], router.dist[router.csr.edge_v[e]]
+                               + np.maximum(router.weight[e], 1e-6), rtol=1e-9)
+
+
+def test_update_matches_full_recompute(router):
+    csr = router.csr
+    batches = np.array_split(csr.edges_near(_points_utm(FLOOD_PATH), 250), 4)
+    assert sum(len(b) for b in batches) > 0
+    for i, edges in enumerate(batches):
+        router.block(edges) if i % 2 == 0 else router.slow(edges, 5.0)
+        _assert_matches_full(router)
+    for edges in batches:
+        router.restore(edges)
+        _assert_matches_full(router)
+    np.testing.assert_allclose(router.dist, nearest_shelter(csr, router.shelters)[0], rtol=1e-9)
+
+
+def test_route_ends_at_shelter(router):
+    reachable = np.flatnonzero(np.isfinite(router.dist))[:50]
+    shelter_osmid = set(router.csr.nodes[router.shelters].tolist())
+    for node in reachable.tolist():
+        path = router.route(node)
+        assert path[0] == router.csr.nodes[node]
+        assert path[-1] in shelter_osmid
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import shapely
+import pytest
+from scipy.sparse.csgraph import dijkstra
+
+from conftest import run_script
+from building_metrics import to_utm
+from building_schema import BUILDING_PATH, load_buildings
+from routing import EVAC_PATH, FLOOD_PATH, GRAPH_PATH, load_road_csr, to_csgraph
+from simulate_scenarios import (ACCESS_KPH, KECAMATAN_PATH, SCENARIOS_PATH, SUMMARY_PATH,
+                                assign_kecamatan, build_state, evaluate)
+
+# data sintetis renggang: median bangunan ~23 menit (jalan kaki ke node + travel_time)
+THRESHOLD_MIN = 25
+RADIUS_M = 800
+
+
+def _utm(gdf):
+    return to_utm(np.asarray(gdf.geometry.values), gdf.crs or "EPSG:4326")
+
+
+@pytest.fixture
+def setup(ws_copy):
+    # ws_copy: graph turunan ditulis ke road_cache workspace
+    csr = load_road_csr(GRAPH_PATH, derived=True)
+    shelters, _ = csr.snap(_utm(gpd.read_file(EVAC_PATH)))
+    flood_utm = _utm(gpd.read_file(FLOOD_PATH))
+    building = load_buildings(BUILDING_PATH, columns=[])
+    building_utm = shapely.centroid(_utm(building))
+    b_kec, names = assign_kecamatan(building_utm, gpd.read_file(KECAMATAN_PATH))
+    state = build_state(csr, shelters, flood_utm, building_utm, b_kec, len(names),
+                        radius_m=RADIUS_M, threshold_min=THRESHOLD_MIN)
+    return csr, shelters, flood_utm, building_utm, b_kec, names, state
+
+
+def _manual(csr, shelters, building_utm, b_kec, n_kec, closed_edges=()):
+    # dijkstra langsung dari travel_time, edge tertutup = inf
+    w = csr.travel_time.copy()
+    w[np.asarray(closed_edges, dtype=np.int64)] = np.inf
+    dist = dijkstra(to_csgraph(csr, weight=w, reverse=True), directed=True,
+                    indices=np.unique(shelters), min_only=True)
+    snap_d, snap_idx = csr.node_tree.query(shapely.get_coordinates(building_utm))
+    t = dist[snap_idx] + snap_d / (ACCESS_KPH / 3.6)
+    lost = np.bincount(b_kec, weights=~np.isfinite(t), minlength=n_kec)
+    over = np.bincount(b_kec, weights=np.isfinite(t) & (t > THRESHOLD_MIN * 60), minlength=n_kec)
+    return lost, over
+
+
+def test_no_active_points_is_baseline(setup):
+    csr, shelters, flood_utm, building_utm, b_kec, names, state = setup
+    assert np.isfinite(csr.travel_time).all() and (csr.travel_time > 0).all()
+    lost, over, closed = evaluate(state, np.zeros((3, len(flood_utm)), dtype=bool))
+    assert (closed == 0).all() and (lost == lost[0]).all() and (over == over[0]).all()
+    exp_lost, exp_over = _manual(csr, shelters, building_utm, b_kec, len(names))
+    np.testing.assert_array_equal(lost[0], exp_lost)
+    np.testing.assert_array_equal(over[0], exp_over)
+    assert 0 < over[0].sum() < len(b_kec)
+
+
+def test_single_point_matches_dijkstra(setup):
+    csr, shelters, flood_utm, building_utm, b_kec, names, state = setup
+    # satu skenario per titik: pilih titik yang benar-benar memutus bangunan
+    lost, over, closed = evaluate(state, np.eye(len(flood_utm), dtype=bool))
+    i = int(np.argmax(lost.sum(axis=1)))
+    assert lost[i].sum() > 0 and closed[i] > 0
+    exp_lost, exp_over = _manual(csr, shelters, building_utm, b_kec, len(names),
+                                 csr.edges_near(flood_utm[i:i + 1], RADIUS_M))
+    np.testing.assert_array_equal(lost[i], exp_lost)
+    np.testing.assert_array_equal(over[i], exp_over)
+
+
+def test_simulate_cli(setup):
+    names = setup[5]
+    run_script("simulate_scenarios.py", "--scenarios", "6", "--workers", "1", "--batch-size", "4",
+               "--threshold-min", str(THRESHOLD_MIN), "--radius", str(RADIUS_M), "--p-active", "0.5")
+    long = pd.read_csv(SCENARIOS_PATH)
+    summary = pd.read_csv(SUMMARY_PATH)
+    assert {"over_time_threshold"} <= set(long.columns)
+    assert "over_time_threshold_mean" in summary.columns
+    assert long["scenario"].nunique() == 6 and set(long["kecamatan"]) <= set(names)
+    # tiap bangunan terhitung paling banyak sekali per skenario dan kecamatan
+    assert (long["lost"] + long["over_time_threshold"] <= long["buildings"]).all()
+    assert long.groupby("scenario")["buildings"].sum().eq(len(setup[4])).all()